@@ -0,0 +1,327 @@
+import os
+import time
+import heapq
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from cover_fetch import CoverFetcher
+from cover_normalizer import CoverNormalizer
+from scan_scheduler import ResourceLimiter, get_resource_limiter
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Lower values are downloaded first
+PRIORITY_VISIBLE = 0
+PRIORITY_NORMAL = 10
+
+
+class ArtworkService:
+    """
+    Background cover downloads shared by all scanners.
+
+    Scanners enqueue (game, URL) pairs and return immediately; a small pool of
+    worker threads downloads the images into the media directory and links them
+    to their games. Each URL is fetched once, however many games ask for it
+    (regional variants and several accounts often share covers): games that
+    ask for a URL already queued or downloading are attached to that request.
+    Each host is limited through the resource limiter's "host:" keys, so covers
+    from one CDN don't open more connections than a scan of its service would.
+
+    The queue is stored in data/artwork_queue.sqlite, so downloads interrupted
+    by quitting are picked up on the next start. Games currently shown in the
+    grid can be moved to the front with prioritize().
+    """
+
+    DB_FILENAME = "artwork_queue.sqlite"
+
+    # Failed downloads are retried on later starts until this many attempts
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, data_handler, max_workers: int = 4, limiter: Optional[ResourceLimiter] = None,
+                 normalizer: Optional[CoverNormalizer] = None):
+        """
+        Initialize the service and load downloads left over from the last run
+
+        Args:
+            data_handler: The data handler for the media directory and game links
+            max_workers: Maximum number of concurrent downloads
+            limiter: Resource limiter for per-host limits, defaults to the global one
+            normalizer: Cover normalization settings, defaults to CoverNormalizer()
+        """
+        self.data_handler = data_handler
+        self.max_workers = max(1, max_workers)
+        self.limiter = limiter or get_resource_limiter()
+        self.fetcher = CoverFetcher(data_handler, normalizer=normalizer)
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._wakeup = threading.Condition(self._lock)
+        # URL -> games waiting for it, while queued or downloading
+        self._waiting: Dict[str, Set[str]] = {}
+        self._priority: Dict[str, int] = {}
+        self._source_names: Dict[str, str] = {}
+        self._game_urls: Dict[str, str] = {}
+        self._inflight: Set[str] = set()
+        self._heap: List[Tuple[int, int, str]] = []
+        self._seq = 0
+        self._worker_count = 0
+        self._listeners: List[Callable[[str, bool], None]] = []
+
+        db_path = Path(data_handler.data_dir) / self.DB_FILENAME
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            game_id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            source_name TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            queued_at REAL NOT NULL
+        )''')
+        self.conn.commit()
+        self._restore()
+
+    def _restore(self):
+        """Queue the downloads stored by a previous run"""
+        rows = self.conn.execute(
+            "SELECT game_id, url, source_name FROM jobs WHERE attempts < ? ORDER BY queued_at",
+            (self.MAX_ATTEMPTS,)).fetchall()
+        if not rows:
+            return
+        logger.info(f"Resuming {len(rows)} queued cover downloads")
+        with self._lock:
+            for game_id, url, source_name in rows:
+                self._queue(game_id, url, source_name, PRIORITY_NORMAL)
+            self._start_workers()
+
+    def add_listener(self, callback: Callable[[str, bool], None]):
+        """
+        Register a callback for finished downloads
+
+        Args:
+            callback: Called with (game_id, success) from a worker thread
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, bool], None]):
+        """Unregister a callback added with add_listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def enqueue(self, game_id: str, url: str, source_name: Optional[str] = None,
+                priority: int = PRIORITY_NORMAL):
+        """
+        Queue the cover of a game for download
+
+        Args:
+            game_id: ID of the game
+            url: URL of the cover image
+            source_name: Optional name of the source (for logging)
+            priority: PRIORITY_VISIBLE or PRIORITY_NORMAL
+        """
+        self.enqueue_many([(game_id, url)], source_name, priority)
+
+    def enqueue_many(self, covers: Iterable[Tuple[str, str]], source_name: Optional[str] = None,
+                     priority: int = PRIORITY_NORMAL):
+        """
+        Queue several covers for download in one database transaction
+
+        Args:
+            covers: (game_id, url) pairs; a game queued again gets the new URL
+            source_name: Optional name of the source (for logging)
+            priority: PRIORITY_VISIBLE or PRIORITY_NORMAL
+        """
+        covers = [(game_id, url) for game_id, url in covers if game_id and url]
+        if not covers:
+            return
+
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO jobs (game_id, url, source_name, attempts, queued_at) "
+                "VALUES (?, ?, ?, 0, ?)",
+                [(game_id, url, source_name, now) for game_id, url in covers])
+            self.conn.commit()
+            for game_id, url in covers:
+                self._queue(game_id, url, source_name, priority)
+            self._start_workers()
+
+    def prioritize(self, game_ids: Iterable[str]):
+        """
+        Download the covers of the given games before the rest of the queue
+
+        Args:
+            game_ids: IDs of games, e.g. those currently visible in the grid
+        """
+        with self._lock:
+            for game_id in game_ids:
+                url = self._game_urls.get(game_id)
+                if url is None or url in self._inflight:
+                    continue
+                if self._priority.get(url, PRIORITY_NORMAL) > PRIORITY_VISIBLE:
+                    # The old heap entry is skipped when it comes up
+                    self._push(url, PRIORITY_VISIBLE)
+                    self._wakeup.notify()
+
+    def pending_count(self) -> int:
+        """Get the number of games waiting for a cover"""
+        with self._lock:
+            return len(self._game_urls)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the queue is empty
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if every queued download finished, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._game_urls:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def _queue(self, game_id: str, url: str, source_name: Optional[str], priority: int):
+        """Attach a game to its URL's request (called with the lock held)"""
+        old_url = self._game_urls.get(game_id)
+        if old_url and old_url != url and old_url in self._waiting:
+            self._waiting[old_url].discard(game_id)
+        self._game_urls[game_id] = url
+        self._waiting.setdefault(url, set()).add(game_id)
+        if source_name:
+            self._source_names.setdefault(url, source_name)
+        if url not in self._inflight and priority < self._priority.get(url, PRIORITY_NORMAL + 1):
+            self._push(url, priority)
+            self._wakeup.notify()
+
+    def _push(self, url: str, priority: int):
+        self._priority[url] = priority
+        self._seq += 1
+        heapq.heappush(self._heap, (priority, self._seq, url))
+
+    def _start_workers(self):
+        """Start worker threads up to max_workers (called with the lock held)"""
+        while self._worker_count < min(self.max_workers, len(self._heap)):
+            self._worker_count += 1
+            threading.Thread(target=self._worker, name=f"artwork-{self._worker_count}", daemon=True).start()
+
+    def _next_url(self) -> Optional[str]:
+        """Take the next URL to download, or None once the queue stays empty and the worker should exit"""
+        with self._lock:
+            while True:
+                while self._heap:
+                    priority, _, url = heapq.heappop(self._heap)
+                    # Skip entries superseded by prioritize() or already handled
+                    if self._priority.get(url) != priority or url in self._inflight or not self._waiting.get(url):
+                        continue
+                    del self._priority[url]
+                    self._inflight.add(url)
+                    return url
+                if not self._wakeup.wait(timeout=5.0) and not self._heap:
+                    # Counted down under the lock, so enqueue starts a new worker if needed
+                    self._worker_count -= 1
+                    return None
+
+    def _worker(self):
+        while True:
+            url = self._next_url()
+            if url is None:
+                return
+            try:
+                self._download(url)
+            except Exception as e:
+                logger.error(f"Error downloading cover from {url}: {e}", exc_info=True)
+                self._finish(url, None)
+
+    def _download(self, url: str):
+        """Fetch one URL and link it to every game waiting for it"""
+        media_path = self.fetcher.media_store.lookup_url(url)
+        if media_path is None:
+            with self._lock:
+                source_name = self._source_names.get(url)
+            with self.limiter.hold(f"host:{urlparse(url).netloc}"):
+                success, temp_path, error = self.fetcher.fetch_to_temp(url, source_name)
+            if success:
+                media_path = self.fetcher.save_temp_to_store(temp_path, url)
+            else:
+                logger.warning(f"Failed to download cover image from {url}: {error}")
+        self._finish(url, media_path)
+
+    def _finish(self, url: str, media_path: Optional[Path]):
+        """Link (or, without media_path, give up on) the games waiting for url and update the queue"""
+        # Games attached while the download ran are taken here too
+        with self._lock:
+            self._inflight.discard(url)
+            game_ids = self._waiting.pop(url, set())
+            self._source_names.pop(url, None)
+            listeners = list(self._listeners)
+
+        results = []
+        for game_id in game_ids:
+            linked = media_path is not None
+            if linked:
+                linked, error = self.fetcher.link_cover(game_id, media_path)
+                if not linked:
+                    logger.warning(f"Failed to link cover for game {game_id}: {error}")
+            results.append((game_id, linked))
+
+        for game_id, linked in results:
+            for listener in listeners:
+                try:
+                    listener(game_id, linked)
+                except Exception as e:
+                    logger.error(f"Error with artwork listener: {e}")
+
+        with self._lock:
+            requeued = self._waiting.get(url, set())
+            for game_id, linked in results:
+                # A game queued again meanwhile keeps its new job
+                if self._game_urls.get(game_id) != url or game_id in requeued:
+                    continue
+                del self._game_urls[game_id]
+                if linked:
+                    self.conn.execute("DELETE FROM jobs WHERE game_id = ? AND url = ?", (game_id, url))
+                else:
+                    self.conn.execute("UPDATE jobs SET attempts = attempts + 1 WHERE game_id = ? AND url = ?",
+                                      (game_id, url))
+            self.conn.commit()
+            if not self._game_urls:
+                self._idle.notify_all()
+
+
+# One service per data directory, shared by all scanners in the process
+_services: Dict[str, ArtworkService] = {}
+_services_lock = threading.Lock()
+
+
+def get_artwork_service(data_handler, normalizer: Optional[CoverNormalizer] = None) -> ArtworkService:
+    """
+    Get the artwork service of a data handler's library
+
+    Args:
+        data_handler: The data handler instance
+        normalizer: Cover normalization settings, only used when the service is created
+
+    Returns:
+        The shared service, created (and its saved queue resumed) on first use
+    """
+    key = os.path.abspath(str(data_handler.data_dir))
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = ArtworkService(data_handler, normalizer=normalizer)
+        return service
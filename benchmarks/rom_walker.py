@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Compare ways of finding ROM files in a large, deep directory tree.
+
+Builds a synthetic ROM tree in a temporary directory (nested folders holding
+ROMs alongside saves, screenshots and other files the scan doesn't want) and
+times each approach, reporting files matched, wall time and peak Python memory:
+
+* glob:   the previous recursive glob, with a stat of every file and the
+          matches collected in a list before grouping
+* walker: the streaming scandir walker, filtering names before any stat
+* cached: the walker over the file state cache, cold and then warm
+
+Usage:
+    python benchmarks/rom_walker.py [--depth 4] [--fanout 6] [--roms 3] [--junk 10]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from sources.rom_walker import RomWalker  # noqa: E402
+from sources.file_state_cache import FileStateCache  # noqa: E402
+
+EXTENSIONS = ["sfc", "smc", "zip"]
+JUNK_EXTENSIONS = ["srm", "png", "txt", "state", "cfg"]
+
+
+def build_tree(root: str, depth: int, fanout: int, roms: int, junk: int) -> int:
+    """
+    Create a synthetic ROM tree
+
+    Args:
+        root: Directory to create the tree in
+        depth: Levels of nested folders
+        fanout: Subfolders per folder
+        roms: ROM files per folder
+        junk: Non-ROM files per folder
+
+    Returns:
+        Number of directories created
+    """
+    count = 0
+    pending = [(root, 0)]
+    while pending:
+        path, level = pending.pop()
+        os.makedirs(path, exist_ok=True)
+        count += 1
+        for i in range(roms):
+            with open(os.path.join(path, f"Game {i}.{EXTENSIONS[i % len(EXTENSIONS)]}"), "wb") as f:
+                f.write(b"\0" * (i + 1))
+        for i in range(junk):
+            open(os.path.join(path, f"file {i}.{JUNK_EXTENSIONS[i % len(JUNK_EXTENSIONS)]}"), "wb").close()
+        if level < depth:
+            pending.extend((os.path.join(path, f"dir {i}"), level + 1) for i in range(fanout))
+    return count
+
+
+def scan_glob(root: str) -> int:
+    """Previous approach: glob everything, stat every file, sort the collected matches"""
+    extensions = [f".{ext}" for ext in EXTENSIONS]
+    matched = []
+    for file_path in Path(root).glob("**/*"):
+        if file_path.is_file() and file_path.suffix.lower() in extensions:
+            matched.append((file_path, file_path.stat().st_size))
+    matched.sort(key=lambda item: item[0].parts)
+    return len(matched)
+
+
+def scan_walker(root: str) -> int:
+    return sum(1 for _ in RomWalker(root, EXTENSIONS).walk())
+
+
+def scan_cached(root: str, cache: FileStateCache) -> int:
+    count = sum(1 for _ in RomWalker(root, EXTENSIONS, file_cache=cache).walk())
+    cache.commit()
+    return count
+
+
+def measure(func: Callable[[], int]) -> Tuple[int, float, int]:
+    """Run func, returning (result, seconds, peak traced bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ROM directory walking.")
+    parser.add_argument("--depth", type=int, default=4, help="Levels of nested folders (default 4)")
+    parser.add_argument("--fanout", type=int, default=6, help="Subfolders per folder (default 6)")
+    parser.add_argument("--roms", type=int, default=3, help="ROM files per folder (default 3)")
+    parser.add_argument("--junk", type=int, default=10, help="Non-ROM files per folder (default 10)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated tree")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gameshelf-walk-")
+    root = os.path.join(workdir, "roms")
+    try:
+        dirs = build_tree(root, args.depth, args.fanout, args.roms, args.junk)
+        print(f"Tree: {dirs} folders, {dirs * (args.roms + args.junk)} files in {root}")
+
+        cache = FileStateCache(os.path.join(workdir, FileStateCache.DB_FILENAME))
+        runs = [
+            ("glob", lambda: scan_glob(root)),
+            ("walker", lambda: scan_walker(root)),
+            ("cached (cold)", lambda: scan_cached(root, cache)),
+        ]
+
+        print(f"{'approach':<16}{'matched':>10}{'seconds':>10}{'peak KiB':>12}")
+        for name, func in runs:
+            matched, elapsed, peak = measure(func)
+            print(f"{name:<16}{matched:>10}{elapsed:>10.3f}{peak / 1024:>12.0f}")
+
+        # Listings are only trusted once the directory is older than the racy window
+        cache.conn.execute("UPDATE dirs SET scanned_at = scanned_at + 60")
+        matched, elapsed, peak = measure(lambda: scan_cached(root, cache))
+        print(f"{'cached (warm)':<16}{matched:>10}{elapsed:>10.3f}{peak / 1024:>12.0f}")
+        cache.close()
+    finally:
+        if args.keep:
+            print(f"Kept {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Report which modules GameShelf imports on a cold start and what they cost.
+
+Runs a fresh interpreter with `-X importtime`, imports the modules the first
+screen needs and prints the slowest imports by cumulative time. Modules that
+should load lazily (source clients, metadata providers, dialogs) are flagged
+if they show up on the startup path.
+
+With --headless the GTK-free core (storage, scanning, metadata) is imported
+instead, and any GObject introspection import is flagged.
+
+Usage:
+    python benchmarks/startup_imports.py [--top 25] [--module main] [--headless]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from typing import List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by main.py before the window is shown
+DEFAULT_MODULES = ["main"]
+
+# The core used by importers and command line tools
+HEADLESS_MODULES = [
+    "data_handler",
+    "source_handler",
+    "importers.json_importer",
+    "providers.metadata_provider",
+]
+
+# Modules the headless core must never import
+GUI_MODULES = ["gi", "gi.repository.Gtk", "gi.repository.Gdk", "gi.repository.GLib"]
+
+# Modules that must not be imported until the user needs them
+LAZY_MODULES = [
+    "requests",
+    "vdf",
+    "isodate",
+    "sources.directory_scanner",
+    "sources.xbox_client",
+    "sources.psn_client",
+    "sources.gog_library_client",
+    "sources.epic_library_client",
+    "sources.steam_client",
+    "cover_fetch",
+    "providers.launchbox_client",
+    "providers.opencritic_client",
+    "controllers.game_dialog_controller",
+    "controllers.runners_manager_controller",
+    "controllers.metadata_search_dialog_controller",
+]
+
+
+def run_importtime(modules: List[str]) -> List[Tuple[int, int, str]]:
+    """
+    Import modules in a fresh interpreter and collect -X importtime output
+
+    Args:
+        modules: Names of the modules to import
+
+    Returns:
+        List of (self_us, cumulative_us, module) tuples in import order. Nested
+        imports keep the leading indentation -X importtime gives them.
+    """
+    code = "; ".join(f"import {name}" for name in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        # The import-time lines are still useful up to the failure point
+        print(f"warning: import exited with status {proc.returncode}", file=sys.stderr)
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:"):
+                print(f"  {line}", file=sys.stderr)
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # Header line
+        entries.append((self_us, cumulative_us, parts[2].rstrip()[1:]))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report GameShelf startup import times.")
+    parser.add_argument("--module", "-m", action="append",
+                        help="Module to import (may be repeated, defaults to 'main')")
+    parser.add_argument("--top", "-t", type=int, default=25,
+                        help="Number of slowest imports to show (defaults to 25)")
+    parser.add_argument("--headless", action="store_true",
+                        help="Import the GTK-free core and check that GI is not loaded")
+    args = parser.parse_args()
+
+    if args.headless:
+        modules = args.module or HEADLESS_MODULES
+        forbidden = GUI_MODULES
+    else:
+        modules = args.module or DEFAULT_MODULES
+        forbidden = LAZY_MODULES
+    entries = run_importtime(modules)
+    if not entries:
+        print("No import-time data collected")
+        return 1
+
+    imported = {name.strip() for _, _, name in entries}
+    top_level = [entry for entry in entries if not entry[2].startswith(" ")]
+    total_us = sum(cumulative for _, cumulative, _ in top_level)
+
+    print(f"Imported {len(entries)} modules for {', '.join(modules)} in {total_us / 1000:.1f} ms")
+    print()
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for self_us, cumulative_us, name in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>9.1f} ms {self_us / 1000:>7.1f} ms  {name.strip()}")
+
+    eager = [name for name in forbidden if name in imported]
+    print()
+    if eager:
+        print("Imported but should not be:")
+        for name in eager:
+            print(f"  {name}")
+        return 1
+
+    print("No unexpected modules were imported")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Headless command line interface for GameShelf.
+
+Drives the same core APIs as the application (DataHandler, SourceHandler)
+without GTK, so library syncs and maintenance can run from cron.
+
+Examples:
+    gameshelf-cli scan --concurrency 4
+    gameshelf-cli query --platform "Microsoft Xbox" --sort play_time --desc --format csv
+    gameshelf-cli stats
+    gameshelf-cli refresh-metadata --format json
+"""
+
+import sys
+import csv
+import json
+import time
+import argparse
+import logging
+import xml.etree.ElementTree as ET
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+from data import Game
+from data_handler import DataHandler
+from data_mapping import CompletionStatus, Platforms, Genres, Features, AgeRatings, Regions
+from grid_snapshot import load_grid_snapshot, save_grid_snapshot
+from source_handler import SourceHandler
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+QUERY_FIELDS = [
+    "id", "title", "platforms", "genres", "source", "completion_status",
+    "play_count", "play_time", "last_played", "created", "hidden",
+]
+
+SORT_KEYS = {
+    "title": lambda g: g.title.lower(),
+    "play_time": lambda g: g.play_time or 0,
+    "play_count": lambda g: g.play_count or 0,
+    "last_played": lambda g: g.last_played or 0,
+    "date_added": lambda g: g.created or 0,
+}
+
+# Facets that can be filtered on or counted with --count-by
+FACETS = {
+    "platform": lambda g: [p.value for p in g.platforms],
+    "genre": lambda g: [x.value for x in g.genres],
+    "feature": lambda g: [x.value for x in g.features],
+    "age_rating": lambda g: [x.value for x in g.age_ratings],
+    "region": lambda g: [x.value for x in g.regions],
+    "completion_status": lambda g: [g.completion_status.value],
+    "source": lambda g: [g.source] if g.source else [],
+}
+
+FACET_ENUMS = {
+    "platform": Platforms,
+    "genre": Genres,
+    "feature": Features,
+    "age_rating": AgeRatings,
+    "region": Regions,
+    "completion_status": CompletionStatus,
+}
+
+
+def game_to_row(game: Game) -> Dict[str, Any]:
+    """Convert a game to a flat dict of the query fields"""
+    return {
+        "id": game.id,
+        "title": game.title,
+        "platforms": [p.value for p in game.platforms],
+        "genres": [g.value for g in game.genres],
+        "source": game.source,
+        "completion_status": game.completion_status.value,
+        "play_count": game.play_count or 0,
+        "play_time": game.play_time or 0,
+        "last_played": game.last_played,
+        "created": game.created,
+        "hidden": bool(game.hidden),
+    }
+
+
+def filter_games(games: List[Game], args) -> List[Game]:
+    """Apply the search, hidden and facet filters from the query arguments"""
+    if args.search:
+        search_text = args.search.lower()
+        games = [g for g in games if search_text in g.title.lower()]
+
+    if args.hidden == "only":
+        games = [g for g in games if g.hidden]
+    elif args.hidden == "exclude":
+        games = [g for g in games if not g.hidden]
+
+    for facet, get_values in FACETS.items():
+        wanted = getattr(args, facet, None)
+        if not wanted:
+            continue
+
+        enum_class = FACET_ENUMS.get(facet)
+        if enum_class:
+            value = enum_class.try_from_string(wanted)
+            if value is None:
+                raise ValueError(f"Unknown {facet.replace('_', ' ')}: {wanted}")
+            wanted = value.value
+
+        games = [g for g in games if wanted in get_values(g)]
+
+    return games
+
+
+def write_rows(rows: List[Dict[str, Any]], fields: List[str], output_format: str, out=sys.stdout):
+    """Write query rows as a table, JSON or CSV"""
+    if output_format == "json":
+        json.dump([{f: row[f] for f in fields} for row in rows], out, indent=2)
+        out.write("\n")
+        return
+
+    def cell(value):
+        return "; ".join(str(v) for v in value) if isinstance(value, list) else ("" if value is None else value)
+
+    if output_format == "csv":
+        writer = csv.writer(out)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([cell(row[f]) for f in fields])
+        return
+
+    for row in rows:
+        out.write("\t".join(str(cell(row[f])) for f in fields) + "\n")
+
+
+def cmd_scan(args, data_handler: DataHandler) -> int:
+    """Scan one, several or all active sources"""
+    # Only scans need these; other commands start without them
+    from artwork_service import get_artwork_service
+    from install_size_service import get_install_size_service
+    from cover_normalizer import CoverNormalizer, parse_cover_size
+    from scan_scheduler import ScanScheduler
+
+    source_handler = SourceHandler(data_handler)
+    sources = source_handler.load_sources()
+
+    if args.source:
+        wanted = {s.lower() for s in args.source}
+        sources = [s for s in sources if s.id in wanted or s.name.lower() in wanted]
+        missing = wanted - {s.id for s in sources} - {s.name.lower() for s in sources}
+        if missing:
+            logger.error(f"Unknown sources: {', '.join(sorted(missing))}")
+            return 1
+    else:
+        sources = [s for s in sources if s.active]
+
+    if not sources:
+        logger.info("No sources to scan")
+        return 0
+
+    # Covers are downloaded by the artwork service; set up how they are stored before any scan queues one
+    try:
+        max_width, max_height = (parse_cover_size(args.cover_size) if args.cover_size
+                                 else (CoverNormalizer.MAX_WIDTH, CoverNormalizer.MAX_HEIGHT))
+    except ValueError:
+        logger.error(f"Invalid --cover-size {args.cover_size}, expected WIDTHxHEIGHT")
+        return 1
+    normalizer = CoverNormalizer(max_width, max_height, keep_original=args.keep_original_covers)
+    artwork_service = get_artwork_service(data_handler, normalizer)
+
+    def source_finished(result):
+        logger.info(f"{result.source.name}: {result.changed} games added or updated in {result.elapsed:.1f}s")
+        for error in result.errors:
+            logger.warning(f"{result.source.name}: {error}")
+
+    def progress(current, total, message):
+        logger.debug(f"{current}/{total} {message}")
+
+    start = time.monotonic()
+    scheduler = ScanScheduler(source_handler, max_workers=args.concurrency)
+    results = scheduler.run(sources, progress, source_finished)
+    total_changed = sum(result.changed for result in results)
+    failed = any(result.errors for result in results)
+
+    # Covers download in the background; finish them before exiting
+    if artwork_service.pending_count():
+        logger.info(f"Downloading {artwork_service.pending_count()} covers")
+        artwork_service.wait()
+
+    # Game folder sizes are measured in the background too
+    install_size_service = get_install_size_service(data_handler)
+    if install_size_service.pending_count():
+        logger.info(f"Measuring {install_size_service.pending_count()} game folders")
+        install_size_service.wait()
+
+    logger.info(f"Scanned {len(sources)} sources in {time.monotonic() - start:.1f}s, {total_changed} games changed")
+    return 2 if failed else 0
+
+
+def cmd_query(args, data_handler: DataHandler) -> int:
+    """Filter, sort and print games"""
+    games = data_handler.load_games()
+    try:
+        games = filter_games(games, args)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+    if args.count_by:
+        counts = Counter(value for g in games for value in FACETS[args.count_by](g))
+        rows = [{"value": value, "count": count} for value, count in counts.most_common()]
+        write_rows(rows, ["value", "count"], args.format)
+        return 0
+
+    games.sort(key=SORT_KEYS[args.sort], reverse=args.desc)
+    if args.limit:
+        games = games[:args.limit]
+
+    fields = args.fields.split(",") if args.fields else QUERY_FIELDS
+    unknown = [f for f in fields if f not in QUERY_FIELDS]
+    if unknown:
+        logger.error(f"Unknown fields: {', '.join(unknown)}")
+        return 1
+
+    write_rows([game_to_row(g) for g in games], fields, args.format)
+    return 0
+
+
+def cmd_reindex(args, data_handler: DataHandler) -> int:
+    """Check the library for inconsistencies and rebuild derived data"""
+    games = data_handler.load_games()
+    game_ids = {g.id for g in games}
+    problems = 0
+
+    # Cover links whose media file is gone
+    for game in games:
+        cover_path = Path(game.get_cover_path(data_handler.data_dir))
+        if cover_path.is_symlink() and not cover_path.exists():
+            problems += 1
+            logger.warning(f"Game {game.id} ({game.title}) has a dangling cover link")
+            if not args.dry_run:
+                data_handler.remove_game_image(game.id)
+
+    # Games imported twice from the same launcher
+    launcher_keys = Counter(
+        (g.source, g.launcher_type, g.launcher_id) for g in games if g.launcher_id
+    )
+    for (source, launcher_type, launcher_id), count in launcher_keys.items():
+        if count > 1:
+            problems += 1
+            logger.warning(f"{count} games share {launcher_type} ID {launcher_id} in source {source}")
+
+    # The startup snapshot must not show games that no longer exist
+    snapshot = load_grid_snapshot(str(data_handler.data_dir))
+    if snapshot:
+        kept = [e for e in snapshot.entries if e.game_id in game_ids]
+        if len(kept) != len(snapshot.entries):
+            logger.info(f"Dropping {len(snapshot.entries) - len(kept)} removed games from the grid snapshot")
+            if not args.dry_run:
+                snapshot.total -= len(snapshot.entries) - len(kept)
+                snapshot.entries = kept
+                save_grid_snapshot(snapshot, str(data_handler.data_dir))
+
+    logger.info(f"Checked {len(games)} games, {problems} problems found")
+    return 0
+
+
+def cmd_gc_media(args, data_handler: DataHandler) -> int:
+    """Move old media into the content-addressed store and remove media that no game links to"""
+    media_store = data_handler.media_store
+
+    # Covers still pointing at flat, URL-named files from before the store
+    links = {
+        str(data_handler._get_game_dir_from_id(game_id) / "cover.jpg"): key
+        for game_id, key in data_handler.load_cover_links().items()
+    }
+    moved = media_store.migrate_legacy(links, dry_run=args.dry_run)
+    if moved:
+        action = "Would move" if args.dry_run else "Moved"
+        logger.info(f"{action} {len(moved)} media files into the content-addressed store")
+        data_handler.library_index.invalidate()
+
+    # Mark: every media file a cover links to, from the library index's reference counts
+    referenced = data_handler.library_index.get_referenced_media()
+
+    # Sweep: everything else in the media store
+    removed, reclaimed = media_store.collect_garbage(set(referenced), min_age=args.min_age * 3600,
+                                                     dry_run=args.dry_run)
+
+    action = "Would remove" if args.dry_run else "Removed"
+    logger.info(f"{action} {removed} unreferenced media files ({reclaimed / (1024 * 1024):.1f} MB), "
+                f"{len(referenced)} in use")
+    return 0
+
+
+def cmd_import_dat(args, data_handler: DataHandler) -> int:
+    """Import DAT files used to identify ROMs by hash"""
+    from providers.dat_index import DatIndex
+
+    dat_index = DatIndex(str(data_handler.data_dir))
+    failed = 0
+    for dat_path in args.files:
+        try:
+            name, count = dat_index.import_dat(dat_path)
+            print(f"{name}: {count} ROMs")
+        except (OSError, ET.ParseError) as e:
+            logger.error(f"Error importing {dat_path}: {e}")
+            failed += 1
+
+    if not args.files:
+        for name, version, count in dat_index.list_dats():
+            print(f"{name} ({version or 'no version'}): {count} ROMs")
+    return 1 if failed else 0
+
+
+def cmd_refresh_metadata(args, data_handler: DataHandler) -> int:
+    """Update the LaunchBox metadata and print the games whose metadata changed"""
+    # The metadata provider brings in the HTTP stack
+    from providers.launchbox_client import LaunchBoxMetadata
+    from providers.match_cache import get_match_key
+
+    # Progress goes to the log; stdout only carries the rows
+    def progress(message):
+        logger.debug(message)
+
+    metadata = LaunchBoxMetadata(str(data_handler.data_dir))
+    try:
+        refresh = metadata.refresh_database(progress_callback=progress)
+    finally:
+        metadata.close()
+    if refresh is None:
+        return 1
+
+    # Scans match games by (title, platform); a game identified by a DAT is
+    # matched by the dump name instead and isn't found here
+    games = [
+        g for g in data_handler.load_games()
+        if any(get_match_key(g.title, p.value) in refresh.affected_pairs for p in g.platforms)
+    ]
+    games.sort(key=SORT_KEYS["title"])
+    write_rows([game_to_row(g) for g in games], ["id", "title", "platforms", "source"], args.format)
+    return 0
+
+
+def cmd_stats(args, data_handler: DataHandler) -> int:
+    """Print library statistics"""
+    games = data_handler.load_games()
+    sources = SourceHandler(data_handler).load_sources()
+    source_names = {s.id: s.name for s in sources}
+
+    media_count = 0
+    media_size = 0
+    for media_file in data_handler.media_store.iter_files():
+        media_count += 1
+        media_size += media_file.size
+
+    stats = {
+        "games": len(games),
+        "hidden": sum(1 for g in games if g.hidden),
+        "sources": len(sources),
+        "runners": len(data_handler.load_runners()),
+        "play_time_hours": round(sum(g.play_time or 0 for g in games) / 3600, 1),
+        "media_files": media_count,
+        "media_mb": round(media_size / (1024 * 1024), 1),
+        "by_source": dict(Counter(source_names.get(g.source, g.source or "manual") for g in games).most_common()),
+        "by_platform": dict(Counter(p.value for g in games for p in g.platforms).most_common()),
+        "by_completion_status": dict(Counter(g.completion_status.value for g in games).most_common()),
+    }
+
+    if args.format == "json":
+        json.dump(stats, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for name, count in value.items():
+                print(f"  {name}: {count}")
+        else:
+            print(f"{key}: {value}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Manage a GameShelf library without the GUI.")
+    # The application keeps its data next to its code, wherever the CLI is run from
+    parser.add_argument("--data-dir", "-d", default=str(Path(__file__).resolve().parent / "data"),
+                        help="Path to GameShelf data directory (defaults to the application's 'data' directory)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable debug logging")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scan = subparsers.add_parser("scan", help="Scan sources for new and changed games")
+    scan.add_argument("--source", "-s", action="append",
+                      help="Source ID or name to scan (may be repeated, defaults to all active sources)")
+    scan.add_argument("--concurrency", "-j", type=int, default=4,
+                      help="Number of sources scanned at the same time (defaults to 4); sources on "
+                           "the same disk or service still take turns")
+    scan.add_argument("--cover-size",
+                      help="Scale downloaded covers down to fit WIDTHxHEIGHT (defaults to the size "
+                           "the application stores covers at)")
+    scan.add_argument("--keep-original-covers", action="store_true",
+                      help="Store downloaded covers as they are, without scaling or re-encoding")
+    scan.set_defaults(func=cmd_scan)
+
+    query = subparsers.add_parser("query", help="List games matching filters")
+    query.add_argument("--search", help="Only games whose title contains this text")
+    for facet in FACETS:
+        query.add_argument(f"--{facet.replace('_', '-')}", dest=facet, help=f"Only games with this {facet.replace('_', ' ')}")
+    query.add_argument("--hidden", choices=["include", "exclude", "only"], default="exclude",
+                       help="How to treat hidden games (defaults to exclude)")
+    query.add_argument("--sort", choices=list(SORT_KEYS), default="title", help="Sort field (defaults to title)")
+    query.add_argument("--desc", action="store_true", help="Sort descending")
+    query.add_argument("--limit", "-l", type=int, help="Maximum number of games to print")
+    query.add_argument("--fields", help=f"Comma-separated fields to print (from {','.join(QUERY_FIELDS)})")
+    query.add_argument("--count-by", choices=list(FACETS), help="Print counts per facet value instead of games")
+    query.add_argument("--format", "-f", choices=["table", "json", "csv"], default="table",
+                       help="Output format (defaults to table)")
+    query.set_defaults(func=cmd_query)
+
+    reindex = subparsers.add_parser("reindex", help="Check the library and rebuild derived data")
+    reindex.add_argument("--dry-run", "-n", action="store_true", help="Report problems without fixing them")
+    reindex.set_defaults(func=cmd_reindex)
+
+    gc_media = subparsers.add_parser("gc-media", help="Move media into the content-addressed store and remove files no game links to")
+    gc_media.add_argument("--dry-run", "-n", action="store_true", help="Report what would be removed")
+    gc_media.add_argument("--min-age", type=float, default=1.0,
+                          help="Keep unreferenced files younger than this many hours (default 1)")
+    gc_media.set_defaults(func=cmd_gc_media)
+
+    import_dat = subparsers.add_parser("import-dat", help="Import No-Intro/Redump DAT files to identify ROMs by hash")
+    import_dat.add_argument("files", nargs="*", help="Logiqx XML DAT files; lists the imported DATs if none are given")
+    import_dat.set_defaults(func=cmd_import_dat)
+
+    refresh_metadata = subparsers.add_parser(
+        "refresh-metadata", help="Update the LaunchBox metadata with only the changed games and list the "
+                                 "games whose metadata changed")
+    refresh_metadata.add_argument("--format", "-f", choices=["table", "json", "csv"], default="table",
+                                  help="Output format (defaults to table)")
+    refresh_metadata.set_defaults(func=cmd_refresh_metadata)
+
+    stats = subparsers.add_parser("stats", help="Print library statistics")
+    stats.add_argument("--format", "-f", choices=["table", "json"], default="table",
+                       help="Output format (defaults to table)")
+    stats.set_defaults(func=cmd_stats)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # Log to stderr so query output can be piped
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        stream=sys.stderr)
+
+    data_handler = DataHandler(args.data_dir)
+    try:
+        return args.func(args, data_handler)
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,21 @@ from controllers.game_grid_controller import GameGridController
 from controllers.sidebar_controller import SidebarController
 from controllers.title_bar_controller import TitleBarController
 from controllers.details_controller import DetailsController, GameDetailsContent
-from controllers.game_dialog_controller import GameDialog
 from controllers.game_context_menu_controller import GameContextMenu
-from controllers.runners_manager_controller import RunnersManagerDialog, RunnerDialog, RunnerListRow
-from controllers.splash_screen_controller import SplashScreen
\ No newline at end of file
+from controllers.splash_screen_controller import SplashScreen
+from lazy_loader import LazyRegistry
+
+# Dialogs are only needed once the user opens them; importing their modules
+# builds the Gtk templates and pulls in the metadata providers, so defer it
+_LAZY_DIALOGS = LazyRegistry("dialog", {
+    "GameDialog": "controllers.game_dialog_controller:GameDialog",
+    "RunnersManagerDialog": "controllers.runners_manager_controller:RunnersManagerDialog",
+    "RunnerDialog": "controllers.runners_manager_controller:RunnerDialog",
+    "RunnerListRow": "controllers.runners_manager_controller:RunnerListRow",
+})
+
+
+def __getattr__(name):
+    if name in _LAZY_DIALOGS:
+        return _LAZY_DIALOGS.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -66,6 +66,24 @@ def get_template_path(filename: str) -> str:
     """
     return os.path.join(os.path.dirname(os.path.dirname(__file__)), "layout", filename)
 
+def get_cover_color(pixbuf: GdkPixbuf.Pixbuf) -> Optional[str]:
+    """
+    Get the average colour of a cover image.
+
+    Args:
+        pixbuf: The cover image
+
+    Returns:
+        The colour as "#rrggbb", or None if it could not be computed
+    """
+    try:
+        # Scaling down to a single pixel averages the whole image
+        pixel = pixbuf.scale_simple(1, 1, GdkPixbuf.InterpType.BILINEAR)
+        r, g, b = pixel.get_pixels()[:3]
+        return f"#{r:02x}{g:02x}{b:02x}"
+    except Exception:
+        return None
+
 def show_image_chooser_dialog(parent_window, callback, title="Select Image"):
     """
     Shows a file chooser dialog for selecting images.
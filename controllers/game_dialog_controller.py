@@ -15,7 +15,6 @@ from data_mapping import (
     InvalidPlatformError, InvalidAgeRatingError, InvalidFeatureError, InvalidGenreError, InvalidRegionError
 )
 from controllers.common import get_template_path, show_image_chooser_dialog
-from controllers.metadata_search_dialog_controller import MetadataSearchDialog
 from controllers.metadata_selection_dialog import MetadataSelectionDialog
 
 
@@ -911,6 +910,7 @@ class GameDialog(Adw.Window):
         search_text = self.title_entry.get_text().strip()
 
         # Show the search dialog
+        from controllers.metadata_search_dialog_controller import MetadataSearchDialog
         metadata_dialog = MetadataSearchDialog(self, self.controller)
         if search_text:
             # Pre-fill the search entry if we have a title
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Set
+from typing import Any, Callable, List, Optional, Dict, Set
 import threading
 import time
 import logging
@@ -9,10 +9,11 @@ from gi.repository import Gtk, Gio, Gdk, GObject, GLib
 logger = logging.getLogger(__name__)
 
 from controllers.sidebar_controller import SidebarItem
-from controllers.common import get_template_path
+from controllers.common import get_template_path, get_cover_color
 from controllers.progress_dialog_controller import ProgressDialog
 from progress_manager import ProgressManager, ProgressType
 from data import Game, Runner
+from grid_snapshot import GridSnapshot, SnapshotEntry, MAX_SNAPSHOT_ENTRIES, view_key_from_app_state
 
 
 # Create a GObject-based wrapper for Game objects to use in ListStore
@@ -50,11 +51,15 @@ class GameGridController:
         self.main_controller = main_controller
         self.games_model = None
         self.last_selected_position = -1  # Track the last selected position for range selection
-        self.image_cache = {}  # Cache for game cover images
+        # Cache for game cover images, seeded with covers decoded during startup
+        self.image_cache = dict(getattr(main_controller, 'initial_cover_cache', {}))
+        # Average cover colours, used for the placeholder tiles of the grid snapshot
+        self.cover_colors = dict(getattr(main_controller, 'initial_cover_colors', {}))
         self.is_scrolling = False
         self.scroll_timeout_id = None
         self.last_scroll_time = 0
         self.pending_image_loads = []  # Queue of image loads to process when scrolling stops
+        self.bound_boxes = {}  # Game ID -> grid item currently showing the game
 
     def bind_gridview(self, grid_view: Gtk.GridView):
         # Store GameObject wrappers that hold Game objects
@@ -161,6 +166,7 @@ class GameGridController:
             box.game = game
             box.game_id = game.id
             box.position = position
+            self.bound_boxes[game.id] = box
 
             # Add selected style based on selection state
             selection = self.selection_model.get_selection()
@@ -178,6 +184,11 @@ class GameGridController:
                 icon_paintable = self.main_controller.data_handler.get_default_icon_paintable("applications-games-symbolic")
                 box.image.set_paintable(icon_paintable)
 
+                # If the cover is still queued for download, fetch it ahead of games out of view
+                artwork_service = getattr(self.main_controller, 'artwork_service', None)
+                if artwork_service:
+                    artwork_service.prioritize([game.id])
+
                 # If we're not scrolling, load the image immediately
                 # Otherwise, queue it to load when scrolling stops
                 if not self.is_scrolling:
@@ -226,10 +237,20 @@ class GameGridController:
         # Remove from pending loads if it's in the queue
         box = list_item.get_child()
         if box and hasattr(box, 'game'):
+            if self.bound_boxes.get(box.game_id) is box:
+                del self.bound_boxes[box.game_id]
             # Remove from pending loads if it exists
             self.pending_image_loads = [(b, g) for b, g in self.pending_image_loads
                                       if b != box]
 
+    def refresh_game_cover(self, game_id: str):
+        """Reload a game's cover after it changed on disk (called in main thread)"""
+        self.image_cache.pop(game_id, None)
+        box = self.bound_boxes.get(game_id)
+        if box and getattr(box, 'game_id', None) == game_id:
+            self._load_game_image(box, box.game)
+        return False  # Remove from idle queue
+
     def _on_scroll_start(self, controller, dx, dy):
         """Called when scrolling starts or continues"""
         self.is_scrolling = True
@@ -286,6 +307,8 @@ class GameGridController:
             if pixbuf:
                 # Create paintable from pixbuf
                 paintable = Gdk.Texture.new_for_pixbuf(pixbuf)
+                if game.id not in self.cover_colors:
+                    self.cover_colors[game.id] = get_cover_color(pixbuf)
 
                 # Limit cache size to 200 images to prevent memory issues
                 if len(self.image_cache) > 200:
@@ -453,6 +476,61 @@ class GameGridController:
             games = filtered_games
             logger.debug(f"Populating games grid with {len(games)} pre-filtered games...")
 
+        games = self._apply_view_filters(games, search_text)
+
+        # Sort the games if sort parameters are set
+        if hasattr(self.main_controller, 'sort_field') and hasattr(self.main_controller, 'sort_ascending'):
+            games = self.sort_games(games, self.main_controller.sort_field, self.main_controller.sort_ascending)
+        else:
+            # Default sorting by title ascending
+            games = sorted(games, key=lambda g: g.title.lower())
+
+        # Wrap each Game in a GameObject before adding to the model
+        # Widgets will be created on-demand when the items become visible
+        for game in games:
+            self.games_model.append(GameObject(game))
+
+        logger.debug(f"Grid populated with {self.games_model.get_n_items()} games")
+
+    def insert_games(self, games: List[Game], search_text: str = ""):
+        """
+        Add games to the grid at their sorted positions, without repopulating it
+
+        The items already in the grid, the selection and the scroll position
+        are left as they are, so this can run often, e.g. while a scan adds games.
+
+        Args:
+            games: Games that aren't in the grid yet
+            search_text: Text to search in game titles
+        """
+        if hasattr(self.main_controller, 'sidebar_controller') and self.main_controller.sidebar_controller:
+            games = self.main_controller.sidebar_controller.apply_filters_to_games(games)
+        games = self._apply_view_filters(games, search_text)
+        if not games:
+            return
+
+        sort_field = getattr(self.main_controller, 'sort_field', "title")
+        ascending = getattr(self.main_controller, 'sort_ascending', True)
+        sort_key = self.get_sort_key(sort_field)
+        for game in games:
+            # Binary search for the position after every game that sorts before or with it
+            key = sort_key(game)
+            low, high = 0, self.games_model.get_n_items()
+            while low < high:
+                middle = (low + high) // 2
+                middle_key = sort_key(self.games_model.get_item(middle).game)
+                if (middle_key <= key) if ascending else (middle_key >= key):
+                    low = middle + 1
+                else:
+                    high = middle
+            self.games_model.insert(low, GameObject(game))
+            if 0 <= low <= self.last_selected_position:
+                self.last_selected_position += 1
+
+        logger.debug(f"Inserted {len(games)} games into the grid, now {self.games_model.get_n_items()}")
+
+    def _apply_view_filters(self, games: List[Game], search_text: str) -> List[Game]:
+        """Keep the games matching the search text and the hidden games setting"""
         # Apply search filter if search text is provided
         if search_text:
             games = [g for g in games if search_text.lower() in g.title.lower()]
@@ -468,20 +546,52 @@ class GameGridController:
                 # When show_hidden is False, only show non-hidden games
                 games = [g for g in games if not g.hidden]
                 logger.debug(f"After hidden filter (showing only non-hidden games): {len(games)} games")
+        return games
 
-        # Sort the games if sort parameters are set
-        if hasattr(self.main_controller, 'sort_field') and hasattr(self.main_controller, 'sort_ascending'):
-            games = self.sort_games(games, self.main_controller.sort_field, self.main_controller.sort_ascending)
-        else:
-            # Default sorting by title ascending
-            games = sorted(games, key=lambda g: g.title.lower())
+    def get_grid_game_ids(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Get the IDs of the games in the grid, in display order
 
-        # Wrap each Game in a GameObject before adding to the model
-        # Widgets will be created on-demand when the items become visible
-        for game in games:
-            self.games_model.append(GameObject(game))
+        Args:
+            limit: Optional maximum number of IDs to return
 
-        logger.debug(f"Grid populated with {self.games_model.get_n_items()} games")
+        Returns:
+            List of game IDs
+        """
+        if not self.games_model:
+            return []
+        count = self.games_model.get_n_items()
+        if limit is not None:
+            count = min(count, limit)
+        return [self.games_model.get_item(i).game.id for i in range(count)]
+
+    def build_snapshot(self, previous: Optional[GridSnapshot] = None) -> Optional[GridSnapshot]:
+        """
+        Capture the current grid so the next startup can paint it immediately
+
+        Args:
+            previous: The previous snapshot, used for covers not loaded in this session
+
+        Returns:
+            The snapshot, or None if the grid hasn't been populated
+        """
+        if not self.games_model:
+            return None
+
+        previous_colors = {e.game_id: e.color for e in previous.entries} if previous else {}
+        total = self.games_model.get_n_items()
+        entries = []
+        for i in range(min(total, MAX_SNAPSHOT_ENTRIES)):
+            game = self.games_model.get_item(i).game
+            color = self.cover_colors.get(game.id) or previous_colors.get(game.id)
+            entries.append(SnapshotEntry(game.id, game.title, color))
+
+        return GridSnapshot(
+            view_key=view_key_from_app_state(self.main_controller.app_state_manager),
+            entries=entries,
+            total=total,
+            created=time.time()
+        )
 
     def sort_games(self, games: List[Game], sort_field: str, ascending: bool) -> List[Game]:
         """
@@ -495,35 +605,45 @@ class GameGridController:
         Returns:
             Sorted list of games
         """
-        reverse = not ascending
+        return sorted(games, key=self.get_sort_key(sort_field), reverse=not ascending)
 
+    def get_sort_key(self, sort_field: str) -> Callable[[Game], Any]:
+        """
+        Get the key function games are sorted by for a sort field
+
+        Args:
+            sort_field: Field to sort by
+
+        Returns:
+            Function returning the sort key of a game
+        """
         if sort_field == "title":
-            return sorted(games, key=lambda g: g.title.lower(), reverse=reverse)
+            return lambda g: g.title.lower()
         elif sort_field == "last_played":
             # Sort by last played time (None values at the end)
             def get_last_played(game):
                 time = game.get_last_played_time(self.main_controller.data_handler.data_dir)
                 # Use a very old timestamp for games never played
                 return time if time is not None else 0
-            return sorted(games, key=get_last_played, reverse=reverse)
+            return get_last_played
         elif sort_field == "play_time":
-            return sorted(games, key=lambda g: g.play_time if g.play_time is not None else 0, reverse=reverse)
+            return lambda g: g.play_time if g.play_time is not None else 0
         elif sort_field == "play_count":
-            return sorted(games, key=lambda g: g.play_count if g.play_count is not None else 0, reverse=reverse)
+            return lambda g: g.play_count if g.play_count is not None else 0
         elif sort_field == "date_added":
             # Sort by created timestamp
             def get_created(game):
                 return game.created if game.created is not None else 0
-            return sorted(games, key=get_created, reverse=reverse)
+            return get_created
         elif sort_field == "date_modified":
             # Sort by modified time
             def get_modified(game):
                 time = game.get_modified_time(self.main_controller.data_handler.data_dir)
                 return time if time is not None else 0
-            return sorted(games, key=get_modified, reverse=reverse)
+            return get_modified
         else:
             # Default to title
-            return sorted(games, key=lambda g: g.title.lower(), reverse=reverse)
+            return lambda g: g.title.lower()
 
 
     def _on_key_pressed(self, controller, keyval, keycode, state):
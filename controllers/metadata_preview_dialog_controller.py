@@ -10,9 +10,7 @@ logger = logging.getLogger(__name__)
 from gi.repository import Gtk, Adw, GObject, GdkPixbuf, Gdk, GLib
 
 from controllers.common import get_template_path
-from providers.opencritic_client import OpenCriticClient
-from providers.launchbox_client import LaunchBoxMetadata
-from providers.metadata_provider import Game as MetadataGame
+from providers.metadata_provider import Game as MetadataGame, get_metadata_provider_class
 
 
 @Gtk.Template(filename=get_template_path("metadata_preview_dialog.ui"))
@@ -51,7 +49,7 @@ class MetadataPreviewDialog(Adw.Window):
         self.provider_name = provider_name
 
         # Use provided metadata client or initialize OpenCritic client by default
-        self.metadata_client = metadata_client or OpenCriticClient()
+        self.metadata_client = metadata_client or get_metadata_provider_class("OpenCritic")()
 
         # Set the window title to include the game name and provider
         self.dialog_title.set_title(f"Preview: {game_name} ({provider_name})")
@@ -7,8 +7,7 @@ from gi.repository import Gtk, Adw, Gio, GObject, GLib
 logger = logging.getLogger(__name__)
 
 from controllers.common import get_template_path
-from providers.opencritic_client import OpenCriticClient
-from providers.launchbox_client import LaunchBoxMetadata
+from providers.metadata_provider import get_metadata_provider_class
 
 
 @Gtk.Template(filename=get_template_path("metadata_search_dialog.ui"))
@@ -53,7 +52,7 @@ class MetadataSearchDialog(Adw.Window):
 
         # Initialize the selected metadata client (default to LaunchBox)
         self.selected_provider = "LaunchBox"
-        self.metadata_client = LaunchBoxMetadata()
+        self.metadata_client = get_metadata_provider_class("LaunchBox")()
 
         # Check if LaunchBox database needs initialization
         self.launchbox_metadata = None
@@ -69,6 +68,19 @@ class MetadataSearchDialog(Adw.Window):
         # Update button state
         self.search_button.set_sensitive(False)
 
+        # Release database connections when the dialog goes away
+        self.connect("close-request", self._on_close_request)
+
+    def _on_close_request(self, window):
+        """Close the metadata clients' database connections"""
+        if self.current_search_thread and self.current_search_thread.is_alive():
+            # The search still uses them; its thread's connection goes with the thread
+            return False
+        for client in (self.metadata_client, self.launchbox_metadata):
+            if client and hasattr(client, 'close'):
+                client.close()
+        return False
+
     def _add_separator_between_rows(self, row, before):
         """Add separators between rows in the results list"""
         if before is not None:
@@ -262,7 +274,7 @@ class MetadataSearchDialog(Adw.Window):
                 if not self.launchbox_metadata:
                     # Data directory from the controller
                     data_dir = self.controller.data_handler.data_dir
-                    self.launchbox_metadata = LaunchBoxMetadata(str(data_dir))
+                    self.launchbox_metadata = get_metadata_provider_class("LaunchBox")(str(data_dir))
                 self.metadata_client = self.launchbox_metadata
 
                 # Check if database initialization is required
@@ -271,7 +283,7 @@ class MetadataSearchDialog(Adw.Window):
                     # Return early - we'll handle the search after initialization
                     return
             elif provider_name == "OpenCritic":
-                self.metadata_client = OpenCriticClient()
+                self.metadata_client = get_metadata_provider_class("OpenCritic")()
 
         # Clear existing results when changing provider
         self._clear_results()
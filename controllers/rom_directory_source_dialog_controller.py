@@ -20,6 +20,8 @@ class RomDirectorySourceDialog(Gtk.Dialog):
     name_entry = Gtk.Template.Child()
     platform_dropdown = Gtk.Template.Child()
     active_switch = Gtk.Template.Child()
+    watch_switch = Gtk.Template.Child()
+    hash_switch = Gtk.Template.Child()
     paths_container = Gtk.Template.Child()
     add_path_button = Gtk.Template.Child()
     cancel_button = Gtk.Template.Child()
@@ -54,6 +56,10 @@ class RomDirectorySourceDialog(Gtk.Dialog):
             # Set active state
             self.active_switch.set_active(source.active)
 
+            # Set watch and hashing state
+            self.watch_switch.set_active(bool(source.config and source.config.get("watch", False)))
+            self.hash_switch.set_active(bool(source.config and source.config.get("hash_roms", False)))
+
             # Set platform if it exists in the source config
             if source.config and "platform" in source.config:
                 platform_value = source.config["platform"]
@@ -209,6 +215,8 @@ class RomDirectorySourceDialog(Gtk.Dialog):
 
         # Get active state
         active = self.active_switch.get_active()
+        watch = self.watch_switch.get_active()
+        hash_roms = self.hash_switch.get_active()
 
         # Create or update the source
         if self.editing:
@@ -217,10 +225,12 @@ class RomDirectorySourceDialog(Gtk.Dialog):
             self.source.active = active
             self.source.rom_paths = rom_paths
 
-            # Update config with platform
+            # Update config with platform, watch mode and hashing
             if not self.source.config:
                 self.source.config = {}
             self.source.config["platform"] = platform.value
+            self.source.config["watch"] = watch
+            self.source.config["hash_roms"] = hash_roms
         else:
             # Create new source with ROM_DIRECTORY type
             self.source = Source(
@@ -230,7 +240,9 @@ class RomDirectorySourceDialog(Gtk.Dialog):
                 active=active,
                 rom_paths=rom_paths,
                 config={
-                    "platform": platform.value
+                    "platform": platform.value,
+                    "watch": watch,
+                    "hash_roms": hash_roms
                 }
             )
 
@@ -18,6 +18,7 @@ class RomPathItem(Gtk.Box):
     path_entry = Gtk.Template.Child()
     extensions_entry = Gtk.Template.Child()
     name_regex_entry = Gtk.Template.Child()
+    ignore_entry = Gtk.Template.Child()
     browse_button = Gtk.Template.Child()
     remove_button = Gtk.Template.Child()
 
@@ -37,6 +38,9 @@ class RomPathItem(Gtk.Box):
             if rom_path.file_extensions:
                 self.extensions_entry.set_text(", ".join(rom_path.file_extensions))
 
+            if rom_path.ignore_patterns:
+                self.ignore_entry.set_text(", ".join(rom_path.ignore_patterns))
+
             if rom_path.name_regex:
                 self.name_regex_entry.set_text(rom_path.name_regex)
             else:
@@ -71,6 +75,10 @@ class RomPathItem(Gtk.Box):
         if extensions_text:
             extensions = [ext.strip() for ext in extensions_text.split(",") if ext.strip()]
 
+        # Process ignore patterns
+        ignore_text = self.ignore_entry.get_text().strip()
+        ignore_patterns = [p.strip() for p in ignore_text.split(",") if p.strip()] if ignore_text else []
+
         # Get name regex
         name_regex = self.name_regex_entry.get_text().strip()
         if not name_regex:
@@ -80,7 +88,8 @@ class RomPathItem(Gtk.Box):
         return RomPath(
             path=path,
             file_extensions=extensions,
-            name_regex=name_regex
+            name_regex=name_regex,
+            ignore_patterns=ignore_patterns
         )
 
     def _on_browse_clicked(self, button):
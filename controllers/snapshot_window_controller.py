@@ -0,0 +1,90 @@
+import logging
+from gi.repository import Gtk, Adw, Gdk, Pango
+
+from grid_snapshot import GridSnapshot, SnapshotEntry
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Same size as the cover images in the real grid
+TILE_WIDTH = 180
+TILE_HEIGHT = 240
+DEFAULT_TILE_COLOR = "#3d3846"
+
+
+class SnapshotWindow(Adw.ApplicationWindow):
+    """
+    Placeholder window that shows the grid as it was when GameShelf last closed.
+
+    It is displayed instead of the splash screen while the library loads, then
+    replaced by the real main window. Tiles are coloured with the average colour
+    of each cover, so nothing has to be decoded before the first frame.
+    """
+
+    def __init__(self, snapshot: GridSnapshot, width: int = 1200, height: int = 800,
+                 maximized: bool = False, application=None):
+        super().__init__(title="GameShelf", application=application)
+        self.snapshot = snapshot
+        self.set_default_size(width, height)
+        if maximized:
+            self.maximize()
+
+        header_bar = Adw.HeaderBar()
+        spinner = Gtk.Spinner()
+        spinner.start()
+        header_bar.pack_end(spinner)
+
+        # Nothing in here is interactive until the real window replaces it
+        flow_box = Gtk.FlowBox()
+        flow_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        flow_box.set_homogeneous(True)
+        flow_box.set_max_children_per_line(30)
+        flow_box.set_valign(Gtk.Align.START)
+        flow_box.set_sensitive(False)
+
+        for entry in snapshot.entries:
+            flow_box.append(self._create_tile(entry))
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(flow_box)
+
+        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        content.append(header_bar)
+        content.append(scrolled)
+        self.set_content(content)
+
+        logger.debug(f"Snapshot window showing {len(snapshot.entries)} of {snapshot.total} games")
+
+    def _create_tile(self, entry: SnapshotEntry) -> Gtk.Widget:
+        """Create a placeholder tile for a snapshot entry"""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        box.add_css_class("game-item-container")
+
+        rgba = Gdk.RGBA()
+        if not entry.color or not rgba.parse(entry.color):
+            rgba.parse(DEFAULT_TILE_COLOR)
+
+        cover = Gtk.DrawingArea()
+        cover.set_content_width(TILE_WIDTH)
+        cover.set_content_height(TILE_HEIGHT)
+        cover.set_draw_func(self._draw_cover, rgba)
+        box.append(cover)
+
+        label = Gtk.Label(label=entry.title)
+        label.set_ellipsize(Pango.EllipsizeMode.END)
+        label.set_max_width_chars(20)
+        label.set_lines(2)
+        label.set_wrap(True)
+        box.append(label)
+
+        return box
+
+    def _draw_cover(self, area, cr, width, height, rgba):
+        cr.set_source_rgb(rgba.red, rgba.green, rgba.blue)
+        cr.paint()
+
+    def finish(self):
+        """Close the snapshot window once the real main window is up"""
+        logger.debug("Snapshot window finished")
+        self.destroy()
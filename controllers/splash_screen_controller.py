@@ -69,6 +69,9 @@ class SplashScreen(Adw.Window):
     def _on_timeout_callback(self) -> bool:
         """Handle timeout, close splash screen and call the callback"""
         logger.debug("Splash screen timeout triggered")
+        # The source is removed by returning False below
+        if hasattr(self, 'timeout_id'):
+            del self.timeout_id
 
         if hasattr(self, 'on_timeout_callback') and self.on_timeout_callback is not None:
             # Call the callback first, then close
@@ -80,6 +83,14 @@ class SplashScreen(Adw.Window):
         self.destroy()
         return False  # Don't repeat the timeout
 
+    def finish(self):
+        """Close the splash screen as soon as the application is ready"""
+        logger.debug("Splash screen finished")
+        if hasattr(self, 'timeout_id'):
+            GLib.source_remove(self.timeout_id)
+            del self.timeout_id
+        self.destroy()
+
     def _on_destroyed(self, window):
         """Handle window destroy event"""
         logger.debug("Splash screen destroyed")
@@ -6,14 +6,13 @@ from gi.repository import Gtk, Adw, Gio, GdkPixbuf, GLib
 from data_handler import DataHandler, Game, Runner
 from process_tracking import ProcessTracker
 from app_state_manager import AppStateManager
+from install_size_service import get_install_size_service
 from controllers.common import get_template_path
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
 from controllers.details_controller import GameDetailsContent, DetailsController
-from controllers.game_dialog_controller import GameDialog
-from controllers.runners_manager_controller import RunnersManagerDialog
 from controllers.game_grid_controller import GameGridController
 from controllers.sidebar_controller import SidebarController
 from controllers.title_bar_controller import TitleBarController
@@ -24,17 +23,33 @@ class GameShelfController:
     Main controller class for the GameShelf application.
     Handles data management, game/runner operations, and UI coordination.
     """
-    def __init__(self, data_handler: DataHandler, app_state_manager: AppStateManager):
+    def __init__(self, data_handler: DataHandler, app_state_manager: AppStateManager,
+                 games: Optional[List[Game]] = None, runners: Optional[List[Runner]] = None):
         self.data_handler = data_handler
         self.app_state_manager = app_state_manager
-        self.games = self.data_handler.load_games()
-        self.runners = {runner.id: runner for runner in self.data_handler.load_runners()}
+        # Games and runners may already have been loaded by the startup pipeline
+        self.games = games if games is not None else self.data_handler.load_games()
+        if runners is None:
+            runners = self.data_handler.load_runners()
+        self.runners = {runner.id: runner for runner in runners}
         self.window = None
         self.actions = {}
+        # Cover textures and their average colours decoded ahead of time, keyed by game ID
+        self.initial_cover_cache = {}
+        self.initial_cover_colors = {}
 
         # Initialize process tracker
         self.process_tracker = ProcessTracker(data_handler)
 
+        # Cover downloads run in the background; the service pulls in the HTTP stack
+        # and opens its queue, so it starts once the window is up
+        self.artwork_service = None
+        GLib.idle_add(self._start_artwork_service)
+
+        # Folder sizes of directory-based games are measured in the background as well
+        self.install_size_service = get_install_size_service(data_handler)
+        self.install_size_service.add_listener(self._on_install_size_updated)
+
         # Load app state
         self.current_filter = self.app_state_manager.get_current_filter()
         self.sort_field, self.sort_ascending = self.app_state_manager.get_sort_state()
@@ -87,6 +102,42 @@ class GameShelfController:
             self.reload_data(refresh_sidebar=True)
         return result
 
+    def add_scanned_games(self, games: List[Game]):
+        """Show games a running scan has just saved, without reloading the library
+
+        Args:
+            games: The new games
+        """
+        known_ids = {game.id for game in self.games}
+        new_games = [game for game in games if game.id not in known_ids]
+        self.games.extend(new_games)
+
+        # Only the new games are added to the grid, so the selection and scroll position stay
+        if hasattr(self, 'game_grid_controller') and self.game_grid_controller:
+            self.game_grid_controller.insert_games(new_games, search_text=self.get_search_text())
+
+    def _start_artwork_service(self):
+        """Start the cover download service, which resumes downloads left from the last run"""
+        from artwork_service import get_artwork_service
+        self.artwork_service = get_artwork_service(self.data_handler)
+        self.artwork_service.add_listener(self._on_cover_downloaded)
+        return False  # Don't repeat
+
+    def _on_cover_downloaded(self, game_id: str, success: bool):
+        """Show a cover the artwork service has just downloaded (called from a worker thread)"""
+        if success and self.game_grid_controller:
+            GLib.idle_add(self.game_grid_controller.refresh_game_cover, game_id)
+
+    def _on_install_size_updated(self, game_id: str, size: int):
+        """Update the shown game once its installation size is known (called from a worker thread)"""
+        def update():
+            for game in self.games:
+                if game.id == game_id:
+                    game.installation_size = size
+                    break
+            return False
+        GLib.idle_add(update)
+
     def remove_game(self, game: Game) -> bool:
         """Remove a game"""
         return self.data_handler.remove_game(game)
@@ -242,6 +293,38 @@ class GameShelfWindow(Adw.ApplicationWindow):
         # Initialize sub-controllers
         self._init_controllers()
 
+        # Import games copied into watched ROM directory sources while the app runs;
+        # sources are loaded once the window is up
+        self.source_watcher = None
+        GLib.idle_add(self._init_source_watcher)
+
+    def _init_source_watcher(self):
+        """Start watching the ROM directory sources that have watch mode enabled"""
+        from source_handler import SourceHandler
+
+        source_handler = SourceHandler(self.controller.data_handler)
+        self._sync_source_watcher(source_handler, source_handler.load_sources())
+        return False  # Don't repeat
+
+    def _sync_source_watcher(self, source_handler, sources):
+        """Watch the sources that ask for it; the watcher and its scanner are only loaded once one does"""
+        if self.source_watcher is None:
+            if not any(source.is_watched() for source in sources):
+                return
+            from source_watcher import SourceWatcher
+            self.source_watcher = SourceWatcher(
+                source_handler,
+                finished_callback=self._on_watched_source_imported
+            )
+        self.source_watcher.sync(sources)
+
+    def _on_watched_source_imported(self, source, added, errors):
+        """Handle an import of new files in a watched source"""
+        for error in errors:
+            logger.warning(f"Error importing changes of {source.name}: {error}")
+        if added > 0:
+            self._on_games_added_from_source(None, added)
+
     def _init_controllers(self):
         """Initialize all the sub-controllers and connect them to UI elements"""
         logger.info("Initializing controllers...")
@@ -327,6 +410,7 @@ class GameShelfWindow(Adw.ApplicationWindow):
     @Gtk.Template.Callback()
     def on_add_game_clicked(self, button):
         # Create a new game dialog in add mode
+        from controllers.game_dialog_controller import GameDialog
         dialog = GameDialog(self, self.controller, edit_mode=False)
         dialog.set_transient_for(self)
 
@@ -337,6 +421,7 @@ class GameShelfWindow(Adw.ApplicationWindow):
     @Gtk.Template.Callback()
     def on_manage_runners_clicked(self, button):
         # Open the runners manager dialog
+        from controllers.runners_manager_controller import RunnersManagerDialog
         dialog = RunnersManagerDialog(self, self.controller, self)
         dialog.set_transient_for(self)
         dialog.show()
@@ -378,8 +463,16 @@ class GameShelfWindow(Adw.ApplicationWindow):
         source_manager.connect("games-added", self._on_games_added_from_source)
         source_manager.connect("source-removed", self._on_source_removed)
 
+        # Sources may have been added, edited or removed; watch the current set
+        dialog.connect("close-request", self._on_source_manager_closed, source_handler)
+
         dialog.show()
 
+    def _on_source_manager_closed(self, dialog, source_handler):
+        """Update the watched sources after the source manager closes"""
+        self._sync_source_watcher(source_handler, source_handler.load_sources())
+        return False
+
     @Gtk.Template.Callback()
     def on_sync_sources_clicked(self, button):
         """Handle sync sources button click - triggers sync on all enabled sources"""
@@ -437,91 +530,93 @@ class GameShelfWindow(Adw.ApplicationWindow):
             else:
                 self._show_notification("Sync complete - no changes")
 
-        def update_progress(source_name, current, total):
-            """Update the progress label with current source"""
-            progress_text = f"Syncing {source_name} ({current}/{total})"
-            if progress_label:
-                GLib.idle_add(lambda: progress_label.set_text(progress_text))
+        def update_progress(current, total, message):
+            """Show the combined sync progress"""
+            if total:
+                progress_text = f"{message} {current * 100 // total}%"
             else:
-                # Fallback to notification if no progress label
-                self._show_notification(progress_text)
+                progress_text = message
+            if progress_label:
+                progress_label.set_text(progress_text)
 
         # Trigger sync for all enabled sources
         self._sync_all_sources(enabled_sources, sync_completed, update_progress)
 
     def _sync_all_sources(self, sources, callback, progress_callback):
-        """Sync all provided sources and call callback with total count"""
+        """
+        Sync all provided sources concurrently and call callback with total count
+
+        Sources are scanned by a ScanScheduler on a background thread. Their progress
+        is combined into a single operation of the progress manager, which calls
+        progress_callback(current, total, message) on the main thread.
+        """
         from gi.repository import GLib
         import threading
+        from source_handler import SourceHandler
+        from scan_scheduler import ScanScheduler
+        from progress_manager import get_progress_manager
 
-        total_changes = 0
-        sources_completed = 0
-        total_sources = len(sources)
-
-        def source_completed(count):
-            nonlocal total_changes, sources_completed
-            total_changes += count
-            sources_completed += 1
-
-            if sources_completed == total_sources:
-                # All sources complete, call the callback on main thread
-                GLib.idle_add(lambda: callback(total_changes))
-
-        # Sync sources sequentially to show proper progress
-        def sync_next_source(index):
-            if index >= len(sources):
-                return
-
-            source = sources[index]
-
-            # Update progress
-            progress_callback(source.name, index + 1, total_sources)
-
-            def sync_source():
-                try:
-                    # Use the same sync logic as the source manager
-                    from source_handler import SourceHandler
-                    source_handler = SourceHandler(self.controller.data_handler)
-
-                    # Get the scanner for this source type
-                    scanner = source_handler.get_scanner(source.source_type, source.id)
-
-                    # Perform the scan with a dummy progress callback
-                    def dummy_progress_callback(current, total, message):
-                        pass  # We don't need detailed progress, just source-level progress
-
-                    added_count, errors = scanner.scan(source, dummy_progress_callback)
-
-                    # Handle different return formats
-                    if isinstance(added_count, tuple):
-                        # PSN returns (added_count, updated_count)
-                        actual_added, updated_count = added_count
-                        changes = actual_added + updated_count
-                    else:
-                        changes = added_count or 0
-
-                    source_completed(changes)
-
-                    # Refresh UI if there were changes from this source
-                    if changes > 0:
-                        GLib.idle_add(lambda: self.controller.reload_data(refresh_sidebar=True))
-
-                    # Start next source
-                    GLib.idle_add(lambda: sync_next_source(index + 1))
-
-                except Exception as e:
-                    logger.error(f"Error syncing source {source.name}: {e}")
-                    source_completed(0)
+        progress_manager = get_progress_manager()
+        operation_id = "sync-all-sources"
+        operation_progress = progress_manager.start_operation(
+            operation_id, "Syncing sources", total=len(sources) * ScanScheduler.PROGRESS_UNITS
+        )
 
-                    # Start next source even if this one failed
-                    GLib.idle_add(lambda: sync_next_source(index + 1))
+        def on_operation_updated(manager, updated_id):
+            if updated_id == operation_id:
+                state = manager.get_operation_state(operation_id)
+                if state:
+                    progress_callback(state.current, state.total, state.message)
+
+        handler_id = progress_manager.connect("operation-updated", on_operation_updated)
+
+        # Games saved by running scans are shown at most once a second
+        pending_games = []
+        pending_lock = threading.Lock()
+
+        def flush_games():
+            with pending_lock:
+                games = pending_games[:]
+                pending_games.clear()
+            if games:
+                self.controller.add_scanned_games(games)
+            return False
+
+        def games_saved(games):
+            with pending_lock:
+                schedule = not pending_games
+                pending_games.extend(games)
+            if schedule:
+                GLib.timeout_add(1000, flush_games)
+
+        def source_finished(result):
+            # Refresh UI as soon as a source with changes finishes
+            if result.changed > 0:
+                GLib.idle_add(lambda: self.controller.reload_data(refresh_sidebar=True))
+
+        def finish(total_changes):
+            progress_manager.disconnect(handler_id)
+            progress_manager.remove_operation(operation_id)
+            callback(total_changes)
+            return False
+
+        def sync_sources():
+            total_changes = 0
+            try:
+                scheduler = ScanScheduler(SourceHandler(self.controller.data_handler),
+                                          max_workers=len(sources))
+                results = scheduler.run(sources, operation_progress, source_finished, games_saved)
+                total_changes = sum(result.changed for result in results)
+                operation_progress.complete(f"Synced {len(sources)} sources")
+            except Exception as e:
+                logger.error(f"Error syncing sources: {e}")
+                operation_progress.error(str(e))
 
-            thread = threading.Thread(target=sync_source)
-            thread.daemon = True
-            thread.start()
+            GLib.idle_add(finish, total_changes)
 
-        # Start with the first source
-        sync_next_source(0)
+        thread = threading.Thread(target=sync_sources)
+        thread.daemon = True
+        thread.start()
 
     def _setup_notification_system(self):
         """Set up the custom log handler to capture warnings and errors"""
@@ -837,4 +932,6 @@ class GameShelfWindow(Adw.ApplicationWindow):
 
         # Allow the window to close normally
         logger.info("Window will close normally")
+        if self.source_watcher:
+            self.source_watcher.stop()
         return False
@@ -2,11 +2,10 @@ import os
 import tempfile
 import logging
 import requests
-import shutil
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any, Union
 
-from data_handler import get_media_filename_for_url
+from cover_normalizer import CoverNormalizer
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -21,11 +20,12 @@ class CoverFetcher:
     3. Moving them to the correct game directory
     4. Cleaning up temporary files
 
-    Each source can instantiate its own CoverFetcher when needed,
-    making it thread-safe for concurrent downloads.
+    Scanners don't use it directly; they queue covers with the artwork
+    service (see artwork_service), which downloads them with a CoverFetcher.
     """
 
-    def __init__(self, data_handler, timeout: int = 10, max_retries: int = 2):
+    def __init__(self, data_handler, timeout: int = 10, max_retries: int = 2,
+                 normalizer: Optional[CoverNormalizer] = None):
         """
         Initialize the cover fetcher
 
@@ -33,10 +33,12 @@ class CoverFetcher:
             data_handler: The data handler for saving game images
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
+            normalizer: Shrinks downloads before they are stored, defaults to CoverNormalizer()
         """
         self.timeout = timeout
         self.max_retries = max_retries
         self.data_handler = data_handler
+        self.normalizer = normalizer or CoverNormalizer()
         self.session = requests.Session()
 
         # Configure session for retries
@@ -44,9 +46,8 @@ class CoverFetcher:
         self.session.mount('http://', adapter)
         self.session.mount('https://', adapter)
 
-        # Set up media directory
-        self.media_dir = Path(data_handler.data_dir) / "media"
-        self.media_dir.mkdir(parents=True, exist_ok=True)
+        # Downloaded images go into the data handler's content-addressed media store
+        self.media_store = data_handler.media_store
 
     def fetch_to_temp(self, url: str, source_name: str = None,
                    headers: Dict[str, str] = None) -> Tuple[bool, Optional[str], Optional[str]]:
@@ -104,7 +105,7 @@ class CoverFetcher:
     def fetch_and_save_for_game(self, game_id: str, url: str, source_name: str = None,
                                headers: Dict[str, str] = None) -> Tuple[bool, Optional[str]]:
         """
-        Fetch a cover image and save it to the centralized media directory,
+        Fetch a cover image and save it to the media store,
         then create a symlink in the game's directory
 
         Args:
@@ -118,13 +119,13 @@ class CoverFetcher:
             - success: True if download and save was successful, False otherwise
             - error_message: Error message if failed, or None if successful
         """
-        # Check if we already have this image in the media directory
-        media_path = self._get_media_path_for_url(url)
+        # Check if we already downloaded this URL
+        media_path = self.media_store.lookup_url(url)
 
-        if media_path.exists():
-            logger.debug(f"Cover image already exists in media directory: {media_path}")
+        if media_path:
+            logger.debug(f"Cover image already exists in media store: {media_path}")
             # Create symlink to existing image
-            return self._create_game_symlink(game_id, media_path)
+            return self.link_cover(game_id, media_path)
 
         # First fetch to a temporary file
         success, temp_path, error = self.fetch_to_temp(url, source_name, headers)
@@ -132,21 +133,36 @@ class CoverFetcher:
         if not success or not temp_path:
             return False, error
 
-        try:
-            # Move the image to the media directory
-            shutil.move(temp_path, media_path)
-            logger.debug(f"Cover image saved to media directory: {media_path}")
-
-            # Create symlink in game directory
-            return self._create_game_symlink(game_id, media_path)
-
-        except Exception as e:
-            # Clean up the temporary file if we have an exception
-            self.cleanup_temp_file(temp_path)
-            error_msg = f"Error saving cover image for game ID {game_id}: {str(e)}"
+        media_path = self.save_temp_to_store(temp_path, url)
+        if media_path is None:
+            error_msg = f"Error saving cover image for game ID {game_id}"
             logger.error(error_msg)
             return False, error_msg
 
+        # Create symlink in game directory
+        return self.link_cover(game_id, media_path)
+
+    def save_temp_to_store(self, temp_path: str, url: str) -> Optional[Path]:
+        """
+        Normalize a downloaded image (see CoverNormalizer) and move it into the media store
+
+        Args:
+            temp_path: Temporary file from fetch_to_temp
+            url: URL the image was downloaded from
+
+        Returns:
+            Path of the stored image, or None if it couldn't be stored
+        """
+        self.normalizer.normalize(temp_path)
+        media_path = self.media_store.add_file(temp_path, move=True, url=url)
+        if media_path is None:
+            # Clean up the temporary file if it couldn't be moved
+            if os.path.exists(temp_path):
+                self.cleanup_temp_file(temp_path)
+            return None
+        logger.debug(f"Cover image saved to media store: {media_path}")
+        return media_path
+
     def cleanup_temp_file(self, file_path: str) -> bool:
         """
         Clean up a temporary file
@@ -168,21 +184,9 @@ class CoverFetcher:
             logger.warning(f"Failed to delete temporary image file: {e}")
             return False
 
-    def _get_media_path_for_url(self, url: str) -> Path:
-        """
-        Generate a media file path for a given URL using URL hash
-
-        Args:
-            url: The URL to generate a path for
-
-        Returns:
-            Path to the media file
+    def link_cover(self, game_id: str, media_path: Path) -> Tuple[bool, Optional[str]]:
         """
-        return self.media_dir / get_media_filename_for_url(url)
-
-    def _create_game_symlink(self, game_id: str, media_path: Path) -> Tuple[bool, Optional[str]]:
-        """
-        Create a symlink from the game directory to the media file
+        Make a media file the cover of a game, by a symlink from the game directory
 
         Args:
             game_id: The ID of the game
@@ -191,25 +195,6 @@ class CoverFetcher:
         Returns:
             Tuple of (success, error_message)
         """
-        try:
-            game_dir = self.data_handler._get_game_dir_from_id(game_id)
-            game_dir.mkdir(parents=True, exist_ok=True)
-
-            cover_symlink = game_dir / "cover.jpg"
-
-            # Remove existing cover file/symlink if it exists
-            if cover_symlink.exists() or cover_symlink.is_symlink():
-                cover_symlink.unlink()
-
-            # Create relative symlink to media file
-            # Calculate relative path from game directory to media file
-            relative_media_path = os.path.relpath(media_path, game_dir)
-            cover_symlink.symlink_to(relative_media_path)
-
-            logger.debug(f"Created symlink for game {game_id}: {cover_symlink} -> {relative_media_path}")
+        if self.data_handler.set_game_cover(game_id, media_path):
             return True, None
-
-        except Exception as e:
-            error_msg = f"Error creating symlink for game {game_id}: {str(e)}"
-            logger.error(error_msg)
-            return False, error_msg
+        return False, f"Error creating symlink for game {game_id}"
@@ -0,0 +1,252 @@
+import os
+import logging
+import tempfile
+from typing import Optional, Tuple
+
+# Pillow is optional; without it covers are normalized with GdkPixbuf when available
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# JPEG segments that only carry metadata: EXIF and XMP (APP1), ICC profiles
+# (APP2), IPTC (APP13) and comments
+JPEG_METADATA_MARKERS = {0xE1, 0xE2, 0xED, 0xFE}
+# JPEG markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xD8))
+JPEG_START_OF_SCAN = 0xDA
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def _get_gdk_pixbuf():
+    """Import GdkPixbuf, or return None outside a GObject environment"""
+    try:
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf
+        return GdkPixbuf
+    except (ImportError, ValueError):
+        return None
+
+
+def strip_jpeg_metadata(path: str, temp_path: str) -> bool:
+    """
+    Copy a JPEG without its metadata segments, leaving the image data as it is
+
+    Args:
+        path: JPEG file
+        temp_path: File to write the stripped copy to
+
+    Returns:
+        True if metadata was dropped and the copy written, False if the file
+        has no metadata segments or isn't a JPEG
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(b"\xff\xd8"):
+        return False
+
+    kept = [data[:2]]
+    stripped = False
+    pos = 2
+    while pos < len(data):
+        if data[pos] != 0xFF:
+            return False
+        # Markers may be preceded by any number of fill bytes
+        while pos + 1 < len(data) and data[pos + 1] == 0xFF:
+            pos += 1
+        if pos + 1 >= len(data):
+            return False
+        marker = data[pos + 1]
+        if marker == JPEG_START_OF_SCAN:
+            # Entropy-coded data and everything after it is kept as is
+            kept.append(data[pos:])
+            break
+        if marker in JPEG_STANDALONE_MARKERS:
+            kept.append(data[pos:pos + 2])
+            pos += 2
+            continue
+        end = pos + 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+        if end > len(data):
+            return False
+        if marker in JPEG_METADATA_MARKERS:
+            stripped = True
+        else:
+            kept.append(data[pos:end])
+        pos = end
+
+    if not stripped:
+        return False
+    with open(temp_path, "wb") as f:
+        f.write(b"".join(kept))
+    return True
+
+
+def parse_cover_size(value: str) -> Tuple[int, int]:
+    """
+    Parse a cover size given as WIDTHxHEIGHT (e.g. "600x800")
+
+    Args:
+        value: The size string
+
+    Returns:
+        Tuple of (width, height)
+
+    Raises:
+        ValueError: If the string isn't two positive integers separated by "x"
+    """
+    width, _, height = value.lower().partition("x")
+    size = (int(width), int(height))
+    if size[0] <= 0 or size[1] <= 0:
+        raise ValueError(f"Invalid cover size: {value}")
+    return size
+
+
+class CoverNormalizer:
+    """
+    Shrinks downloaded covers before they are stored.
+
+    Stores and CDNs often serve covers of several megapixels, while the grid
+    shows them at 200x260; every decode of an oversized cover wastes time and
+    memory, and the media directory fills with images nobody sees at full size.
+    Covers larger than max_width x max_height are scaled down to fit, EXIF
+    orientation is applied and metadata (EXIF, ICC profiles, text chunks) is
+    dropped, and the result is re-encoded as JPEG. Transparent areas are
+    flattened onto a neutral grey background, so dark artwork with transparent
+    edges keeps its outline.
+
+    Covers already within the bounds and stored as JPEG only lose their
+    metadata segments, copied without re-compressing the image, unless their
+    EXIF orientation has to be applied first. Other formats (PNG, WebP, ...)
+    are re-encoded when that makes the file smaller.
+
+    Pillow is used when installed; otherwise GdkPixbuf, and without either the
+    covers are stored as downloaded. keep_original=True disables normalization.
+    """
+
+    MAX_WIDTH = 600
+    MAX_HEIGHT = 800
+    QUALITY = 85
+    BACKGROUND = (128, 128, 128)
+
+    def __init__(self, max_width: int = MAX_WIDTH, max_height: int = MAX_HEIGHT,
+                 quality: int = QUALITY, keep_original: bool = False,
+                 background: Tuple[int, int, int] = BACKGROUND):
+        """
+        Initialize the normalizer
+
+        Args:
+            max_width: Maximum width of a stored cover in pixels
+            max_height: Maximum height of a stored cover in pixels
+            quality: JPEG quality (1-95) of re-encoded covers
+            keep_original: Store covers exactly as downloaded
+            background: RGB colour transparent areas are flattened onto
+        """
+        self.max_width = max(1, max_width)
+        self.max_height = max(1, max_height)
+        self.quality = min(max(quality, 1), 95)
+        self.keep_original = keep_original
+        self.background = tuple(min(max(channel, 0), 255) for channel in background)
+
+    def normalize(self, path: str) -> bool:
+        """
+        Normalize an image file in place
+
+        Args:
+            path: Image file, e.g. a finished download
+
+        Returns:
+            True if the file was rewritten, False if it was kept as it was
+            (already small without metadata, normalization disabled or unavailable, or unreadable)
+        """
+        if self.keep_original:
+            return False
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".jpg")
+        os.close(fd)
+        try:
+            if Image is not None:
+                written = self._normalize_with_pillow(path, temp_path)
+            else:
+                written = self._normalize_with_pixbuf(path, temp_path)
+            if not written:
+                return False
+
+            original_size = os.path.getsize(path)
+            new_size = os.path.getsize(temp_path)
+            if written == "reencoded" and new_size >= original_size:
+                # Same dimensions and no smaller; the original is the better copy
+                return False
+
+            os.replace(temp_path, path)
+            logger.debug(f"Normalized cover {path}: {original_size} -> {new_size} bytes")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Could not normalize cover {path}: {e}")
+            return False
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def _fits(self, width: int, height: int) -> bool:
+        return width <= self.max_width and height <= self.max_height
+
+    def _normalize_with_pillow(self, path: str, temp_path: str) -> Optional[str]:
+        """Write the normalized image to temp_path; returns "resized", "reencoded", "stripped" or None"""
+        with Image.open(path) as image:
+            if (image.format == "JPEG" and self._fits(*image.size)
+                    and image.getexif().get(EXIF_ORIENTATION_TAG, 1) in (0, 1)):
+                return "stripped" if strip_jpeg_metadata(path, temp_path) else None
+            resized = not self._fits(*image.size)
+
+            # Let the JPEG decoder skip detail we are going to throw away
+            image.draft("RGB", (self.max_width, self.max_height))
+            image = ImageOps.exif_transpose(image)
+            if resized:
+                image.thumbnail((self.max_width, self.max_height), Image.LANCZOS)
+
+            if image.mode in ("RGBA", "LA", "P"):
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, self.background)
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+
+            # A new image carries no EXIF, ICC or text metadata unless passed explicitly
+            image.save(temp_path, "JPEG", quality=self.quality, optimize=True, progressive=True)
+        return "resized" if resized else "reencoded"
+
+    def _normalize_with_pixbuf(self, path: str, temp_path: str) -> Optional[str]:
+        """GdkPixbuf version of _normalize_with_pillow"""
+        GdkPixbuf = _get_gdk_pixbuf()
+        if GdkPixbuf is None:
+            return None
+
+        info, width, height = GdkPixbuf.Pixbuf.get_file_info(path)
+        if info is None:
+            return None
+        resized = not self._fits(width, height)
+
+        if resized:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(path, self.max_width, self.max_height, True)
+        else:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(path)
+            if info.get_name() == "jpeg" and pixbuf.get_option("orientation") in (None, "0", "1"):
+                return "stripped" if strip_jpeg_metadata(path, temp_path) else None
+        pixbuf = pixbuf.apply_embedded_orientation() or pixbuf
+        if pixbuf.get_has_alpha():
+            flat = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, False, 8, pixbuf.get_width(), pixbuf.get_height())
+            red, green, blue = self.background
+            flat.fill((red << 24) | (green << 16) | (blue << 8) | 0xff)
+            pixbuf.composite(flat, 0, 0, pixbuf.get_width(), pixbuf.get_height(), 0, 0, 1, 1,
+                             GdkPixbuf.InterpType.BILINEAR, 255)
+            pixbuf = flat
+
+        pixbuf.savev(temp_path, "jpeg", ["quality"], [str(self.quality)])
+        return "resized" if resized else "reencoded"
@@ -35,11 +35,14 @@ class SourceType(Enum):
 
 @dataclass
 class RomPath:
-    def __init__(self, path: str, file_extensions: Optional[List[str]] = None, name_regex: Optional[str] = None):
+    def __init__(self, path: str, file_extensions: Optional[List[str]] = None, name_regex: Optional[str] = None,
+                 ignore_patterns: Optional[List[str]] = None):
         self.path = path
         self.file_extensions = file_extensions or []
         # Default regex that strips file extension
         self.name_regex = name_regex or r"^(.+?)(\.[^.]+)?$"
+        # Glob patterns for file and folder names to skip while scanning (e.g. ".*", "BIOS")
+        self.ignore_patterns = ignore_patterns or []
 
 @dataclass
 class Source:
@@ -60,6 +63,11 @@ class Source:
         """Get the path to the source's configuration file"""
         return data_dir / "sources" / f"{self.id}.yaml"
 
+    def is_watched(self) -> bool:
+        """Check whether the source asks to have new files imported as they appear (see SourceWatcher)"""
+        return (self.source_type == SourceType.ROM_DIRECTORY and self.active
+                and bool(self.config and self.config.get("watch")))
+
 
 @dataclass
 class Runner:
@@ -4,17 +4,14 @@ import time
 import shutil
 import enum
 import logging
-import hashlib
+import threading
 from pathlib import Path
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any, Tuple, Union
 
-import gi
-gi.require_version('Gtk', '4.0')
-gi.require_version('Gdk', '4.0')
-from gi.repository import Gtk, Gdk
-
 from data import Game, Runner, Source, SourceType, RomPath
+from library_index import LibraryIndex
+from media_store import MediaStore, get_media_filename_for_url  # noqa: F401 (re-exported)
 from data_mapping import (
     CompletionStatus, InvalidCompletionStatusError,
     Platforms, InvalidPlatformError,
@@ -24,28 +21,10 @@ from data_mapping import (
     Regions, InvalidRegionError
 )
 
-import gi
-gi.require_version('GdkPixbuf', '2.0')
-from gi.repository import GdkPixbuf
-
 # Set up logger
 logger = logging.getLogger(__name__)
 
 
-def get_media_filename_for_url(url: str) -> str:
-    """
-    Generate a media filename for a given URL using SHA256 hash
-
-    Args:
-        url: The URL to generate a filename for
-
-    Returns:
-        Filename with .jpg extension
-    """
-    url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
-    return f"{url_hash}.jpg"
-
-
 class DataHandler:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
@@ -57,6 +36,18 @@ class DataHandler:
         # Get the project root directory for finding media directory
         self.project_root = Path(__file__).parent
 
+        # Scanners may save new games from several threads at once; IDs are
+        # handed out under a lock and remembered until their game.yaml exists
+        self._id_lock = threading.Lock()
+        self._last_allocated_id = -1
+
+        # Existing games by source, launcher ID and install path for scanners.
+        # Parsed from disk on first use and kept current by save_game/remove_game.
+        self.library_index = LibraryIndex(self.load_games, self.load_cover_links)
+
+        # Cover images, stored by content hash and linked from each game's cover.jpg
+        self.media_store = MediaStore(self.media_dir)
+
         # Runner icon mapping
         self.runner_icon_map = {
             "steam": "steam-symbolic",
@@ -349,6 +340,7 @@ class DataHandler:
             game_file = game_dir / "game.yaml"
             with open(game_file, "w") as f:
                 yaml.dump(game_data, f)
+            self.library_index.update(game)
             return True
         except Exception as e:
             logger.error(f"Error saving game {game.id}: {e}")
@@ -388,13 +380,13 @@ class DataHandler:
 
     def save_game_image(self, source_path: str, game_id: str, url: str = None) -> bool:
         """
-        Save a game image to the centralized media directory and create a symlink
-        in the game's directory. If url is provided, uses URL-based naming.
+        Save a game image to the media store and create a symlink in the game's
+        directory. Images with the same content are stored only once.
 
         Args:
             source_path: Path to the source image
             game_id: ID of the game
-            url: Optional URL of the image for hash-based naming
+            url: Optional URL the image was downloaded from
 
         Returns:
             True if the image was successfully saved, False otherwise
@@ -402,47 +394,50 @@ class DataHandler:
         if not source_path or not os.path.exists(source_path):
             return False
 
-        try:
-            # Create game directory if it doesn't exist
-            game_dir = self._get_game_dir_from_id(game_id)
-            game_dir.mkdir(parents=True, exist_ok=True)
-
-            # Determine media file name
-            if url:
-                media_filename = get_media_filename_for_url(url)
-            else:
-                # Fallback to game-specific naming for manually added images
-                media_filename = f"game_{game_id}.jpg"
+        media_path = self.media_store.add_file(source_path, url=url)
+        if media_path is None:
+            return False
+        logger.debug(f"Saved image to media store: {media_path}")
+        return self.set_game_cover(game_id, media_path)
 
-            media_path = self.media_dir / media_filename
+    def set_game_cover(self, game_id: str, media_path: Path) -> bool:
+        """
+        Point a game's cover symlink at a media file
 
-            # Only copy if the media file doesn't already exist
-            if not media_path.exists():
-                shutil.copy2(source_path, media_path)
-                logger.debug(f"Saved image to media directory: {media_path}")
+        Args:
+            game_id: ID of the game
+            media_path: Path of the file in the media store
 
-            # Create symlink in game directory
+        Returns:
+            True if the symlink was created, False otherwise
+        """
+        try:
+            game_dir = self._get_game_dir_from_id(game_id)
+            game_dir.mkdir(parents=True, exist_ok=True)
             cover_symlink = game_dir / "cover.jpg"
 
-            # Remove existing cover file/symlink if it exists
-            if cover_symlink.exists() or cover_symlink.is_symlink():
-                cover_symlink.unlink()
-
-            # Create relative symlink to media file
+            # Create the new relative symlink next to the old cover and swap it in,
+            # so the cover never disappears while it is replaced
             relative_media_path = os.path.relpath(media_path, game_dir)
-            cover_symlink.symlink_to(relative_media_path)
+            temp_symlink = game_dir / "cover.jpg.tmp"
+            if temp_symlink.exists() or temp_symlink.is_symlink():
+                temp_symlink.unlink()
+            temp_symlink.symlink_to(relative_media_path)
+            os.replace(temp_symlink, cover_symlink)
 
+            self.library_index.set_cover(game_id, self.media_store.get_key(media_path))
             logger.debug(f"Created symlink for game {game_id}: {cover_symlink} -> {relative_media_path}")
             return True
 
         except Exception as e:
-            logger.error(f"Error saving image: {e}")
+            logger.error(f"Error creating cover symlink for game {game_id}: {e}")
             return False
 
     def remove_game_image(self, game_id: str) -> bool:
         """
         Remove a game's cover symlink if it exists.
-        Note: This does NOT remove the media file to allow reuse.
+        Note: This does NOT remove the media file; unreferenced media is
+        reclaimed by the media garbage collector.
 
         Args:
             game_id: ID of the game
@@ -456,11 +451,29 @@ class DataHandler:
 
             if cover_path.exists() or cover_path.is_symlink():
                 cover_path.unlink()
+            self.library_index.set_cover(game_id, None)
             return True
         except Exception as e:
             logger.error(f"Error removing cover symlink for game {game_id}: {e}")
             return False
 
+    def load_cover_links(self) -> Dict[str, str]:
+        """
+        Read the cover link of every game
+
+        Returns:
+            Dictionary of game ID to the key of the media file its cover links to
+            (see MediaStore.get_key); games without a cover link are left out
+        """
+        covers = {}
+        for cover_path in self.games_dir.glob("*/*/*/cover.jpg"):
+            if not cover_path.is_symlink():
+                continue
+            key = self.media_store.get_key(cover_path)
+            if key:
+                covers[self._extract_game_id_from_path(cover_path.parent)] = key
+        return covers
+
     def create_game_with_image(self, title: str, image_path: Optional[str] = None) -> Game:
         """
         Create a new game object with an image, handling ID generation and image copying.
@@ -509,11 +522,8 @@ class DataHandler:
             # Check if image field contains an icon name (not a file path)
             if not runner.image.startswith('/'):
                 # Looks like an icon name, verify it exists
-                display = Gdk.Display.get_default()
-                if display:
-                    icon_theme = Gtk.IconTheme.get_for_display(display)
-                    if icon_theme.has_icon(runner.image):
-                        return runner.image
+                if self.has_icon(runner.image):
+                    return runner.image
 
         # Fall back to detecting icon from command
         if runner and runner.command:
@@ -529,6 +539,21 @@ class DataHandler:
         # Default icon for unknown runners
         return "application-x-executable-symbolic"
 
+    def has_icon(self, icon_name: str) -> bool:
+        """
+        Check whether an icon is available in the icon theme.
+
+        The core data handler has no display to look icons up on, so this
+        always returns False. GtkDataHandler overrides it.
+
+        Args:
+            icon_name: The name of the icon
+
+        Returns:
+            True if the icon exists, False otherwise
+        """
+        return False
+
     def _get_runner_by_id(self, runner_id: str) -> Optional[Runner]:
         """Get a runner object by ID"""
         try:
@@ -560,19 +585,13 @@ class DataHandler:
         if not command:
             return None
 
-        display = Gdk.Display.get_default()
-        if not display:
-            return None
-
-        icon_theme = Gtk.IconTheme.get_for_display(display)
-
         # Handle Flatpak commands: "flatpak run org.flycast.Flycast ..."
         if command.startswith("flatpak run "):
             parts = command.split()
             if len(parts) >= 3:
                 app_id = parts[2]
                 # Check if this app ID exists as an icon
-                if icon_theme.has_icon(app_id):
+                if self.has_icon(app_id):
                     return app_id
 
         # Handle xdg-open protocol commands: "xdg-open steam://run/"
@@ -592,7 +611,7 @@ class DataHandler:
                     ]
 
                     for candidate in icon_candidates:
-                        if icon_theme.has_icon(candidate):
+                        if self.has_icon(candidate):
                             return candidate
 
         return None
@@ -677,44 +696,6 @@ class DataHandler:
         compatible_runners = self.get_compatible_runners(game, all_runners)
         return compatible_runners[0] if compatible_runners else None
 
-    def load_game_image(self, game: Game, width: int = 200, height: int = 260) -> Optional[GdkPixbuf.Pixbuf]:
-        """
-        Load a game's image as a pixbuf, scaled to the specified dimensions.
-
-        Args:
-            game: The game to load the image for
-            width: The desired width of the image
-            height: The desired height of the image
-
-        Returns:
-            A pixbuf containing the game's image, or None if no image is available
-        """
-        try:
-            cover_path = game.get_cover_path(self.data_dir)
-            if not os.path.exists(cover_path):
-                return None
-            return GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                cover_path, width, height, True)
-        except Exception as e:
-            logger.error(f"Error loading image for {game.title}: {e}")
-            return None
-
-    def get_default_icon_paintable(self, icon_name: str, size: int = 128) -> 'Gdk.Paintable':
-        """
-        Get a default icon as a paintable for use with GtkPicture widgets.
-
-        Args:
-            icon_name: The name of the icon to get
-            size: The size of the icon
-
-        Returns:
-            A paintable that can be used with GtkPicture widgets
-        """
-        display = Gdk.Display.get_default()
-        icon_theme = Gtk.IconTheme.get_for_display(display)
-        # The empty list is for icon sizes, 1 is scale factor, Gtk.TextDirection.LTR is text direction
-        return icon_theme.lookup_icon(icon_name, [], size, 1, Gtk.TextDirection.LTR, 0)
-
     def _get_game_dir_from_id(self, game_id: str) -> Path:
         """
         Get the game directory path from a game ID using the new structured format.
@@ -772,53 +753,39 @@ class DataHandler:
         Get the next available game ID by finding the highest existing numeric ID
         and incrementing it by 1.
 
+        The returned ID is reserved, so concurrent callers never get the same ID
+        even if the first game hasn't been written to disk yet.
+
         Returns:
             The next available numeric ID for a game
         """
-        try:
-            # Look for the highest existing ID across all game directories
-            highest_id = -1
-
-            # Recursively search through all directories that might contain games
-            for game_yaml in self.games_dir.glob("*/*/*/game.yaml"):
-                try:
-                    # Extract the ID from the path, which handles removing leading zeros
-                    game_id = self._extract_game_id_from_path(game_yaml)
-
-                    # Convert to integer for comparison
-                    if game_id.isdigit():
-                        id_int = int(game_id)
-                        highest_id = max(highest_id, id_int)
-                except Exception as inner_e:
-                    logger.error(f"Error parsing game ID from {game_yaml}: {inner_e}")
-                    continue
-
-            # Start from the next ID after the highest found, or 0 if no numeric IDs exist
-            return highest_id + 1
-        except Exception as e:
-            logger.error(f"Error getting next game ID: {e}")
-            return 0
+        with self._id_lock:
+            try:
+                # Look for the highest existing ID across all game directories
+                highest_id = -1
 
-    def load_runner_image(self, runner: Runner, width: int = 64, height: int = 64) -> Optional[GdkPixbuf.Pixbuf]:
-        """
-        Load a runner's image as a pixbuf, scaled to the specified dimensions.
+                # Recursively search through all directories that might contain games
+                for game_yaml in self.games_dir.glob("*/*/*/game.yaml"):
+                    try:
+                        # Extract the ID from the path, which handles removing leading zeros
+                        game_id = self._extract_game_id_from_path(game_yaml)
+
+                        # Convert to integer for comparison
+                        if game_id.isdigit():
+                            id_int = int(game_id)
+                            highest_id = max(highest_id, id_int)
+                    except Exception as inner_e:
+                        logger.error(f"Error parsing game ID from {game_yaml}: {inner_e}")
+                        continue
 
-        Args:
-            runner: The runner to load the image for
-            width: The desired width of the image
-            height: The desired height of the image
+                # Start from the next ID after the highest found (or handed out), or 0 if none exist
+                next_id = max(highest_id, self._last_allocated_id) + 1
+            except Exception as e:
+                logger.error(f"Error getting next game ID: {e}")
+                next_id = self._last_allocated_id + 1
 
-        Returns:
-            A pixbuf containing the runner's image, or None if no image is available
-        """
-        try:
-            if not runner.image or not os.path.exists(runner.image):
-                return None
-            return GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                runner.image, width, height, True)
-        except Exception as e:
-            logger.error(f"Error loading image for {runner.title}: {e}")
-            return None
+            self._last_allocated_id = next_id
+            return next_id
 
     def _update_completion_status_based_on_activity(self, game: Game) -> bool:
         """
@@ -1325,7 +1292,8 @@ class DataHandler:
     def remove_game(self, game: Game) -> bool:
         """
         Remove a game from the games directory.
-        Note: This preserves media files in the centralized media directory.
+        Note: This preserves media files in the media store; unreferenced media
+        is reclaimed by the media garbage collector.
 
         Args:
             game: The game to remove
@@ -1350,6 +1318,7 @@ class DataHandler:
                     if grandparent.exists() and not any(grandparent.iterdir()):
                         grandparent.rmdir()
 
+                self.library_index.remove(game.id)
                 return True
             else:
                 logger.warning(f"Game directory {game_dir} not found")
@@ -1430,10 +1399,15 @@ class DataHandler:
                                 if isinstance(file_extensions, str):
                                     file_extensions = [ext.strip() for ext in file_extensions.split(",") if ext.strip()]
 
+                                ignore_patterns = path_data.get("ignore_patterns", [])
+                                if isinstance(ignore_patterns, str):
+                                    ignore_patterns = [p.strip() for p in ignore_patterns.split(",") if p.strip()]
+
                                 rom_paths.append(RomPath(
                                     path=path_data.get("path", ""),
                                     file_extensions=file_extensions,
-                                    name_regex=path_data.get("name_regex")
+                                    name_regex=path_data.get("name_regex"),
+                                    ignore_patterns=ignore_patterns
                                 ))
 
                             source.rom_paths = rom_paths
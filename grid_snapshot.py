@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Enough entries to fill a maximized window a few times over; the rest of the
+# grid is rebuilt from the real library anyway
+MAX_SNAPSHOT_ENTRIES = 300
+
+
+@dataclass
+class SnapshotEntry:
+    """A single grid tile as it was last shown"""
+    game_id: str
+    title: str
+    color: Optional[str] = None  # Average cover colour as "#rrggbb"
+
+
+@dataclass
+class GridSnapshot:
+    """The last visible grid: its view state and the tiles in display order"""
+    view_key: str
+    entries: List[SnapshotEntry] = field(default_factory=list)
+    total: int = 0  # Number of games in the grid, may exceed len(entries)
+    created: float = 0.0
+
+    def game_ids(self) -> List[str]:
+        """Get the snapshot's game IDs in display order"""
+        return [entry.game_id for entry in self.entries]
+
+
+def make_view_key(search_text: str, sort_field: str, ascending: bool,
+                  show_hidden: bool, active_filters: Dict[str, Any]) -> str:
+    """
+    Build a key describing the view a snapshot was taken with
+
+    Args:
+        search_text: The search entry text
+        sort_field: The sort field
+        ascending: Whether sorting is ascending
+        show_hidden: Whether hidden games are shown
+        active_filters: The sidebar filters
+
+    Returns:
+        A string that is equal for equal view states
+    """
+    return json.dumps({
+        "search": (search_text or "").lower(),
+        "sort": [sort_field, bool(ascending)],
+        "hidden": bool(show_hidden),
+        "filters": active_filters or {},
+    }, sort_keys=True)
+
+
+def view_key_from_app_state(app_state_manager) -> str:
+    """
+    Build the view key for the view state stored in an AppStateManager
+
+    Args:
+        app_state_manager: The app state manager
+
+    Returns:
+        The view key
+    """
+    sort_field, ascending = app_state_manager.get_sort_state()
+    return make_view_key(
+        app_state_manager.get_search_text(),
+        sort_field, ascending,
+        app_state_manager.get_show_hidden(),
+        app_state_manager.get_sidebar_active_filters()
+    )
+
+
+def get_snapshot_path(data_dir: str = "data") -> Path:
+    """Get the path of the grid snapshot file"""
+    return Path(data_dir) / "grid_snapshot.json"
+
+
+def save_grid_snapshot(snapshot: GridSnapshot, data_dir: str = "data") -> bool:
+    """
+    Save a grid snapshot, replacing the previous one atomically
+
+    Args:
+        snapshot: The snapshot to save
+        data_dir: The data directory path
+
+    Returns:
+        True if successful, False otherwise
+    """
+    path = get_snapshot_path(data_dir)
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "view_key": snapshot.view_key,
+        "total": snapshot.total,
+        "created": snapshot.created or time.time(),
+        # Compact rows instead of objects - this file is read before anything else
+        "entries": [[e.game_id, e.title, e.color] for e in snapshot.entries[:MAX_SNAPSHOT_ENTRIES]],
+    }
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        logger.debug(f"Saved grid snapshot with {len(data['entries'])} of {snapshot.total} games")
+        return True
+    except Exception as e:
+        logger.error(f"Error saving grid snapshot: {e}")
+        return False
+
+
+def load_grid_snapshot(data_dir: str = "data", view_key: Optional[str] = None) -> Optional[GridSnapshot]:
+    """
+    Load the grid snapshot
+
+    Args:
+        data_dir: The data directory path
+        view_key: If given, only return the snapshot when it was taken with this view
+
+    Returns:
+        The snapshot, or None if there is no usable snapshot
+    """
+    path = get_snapshot_path(data_dir)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if data.get("version") != SNAPSHOT_VERSION:
+            logger.debug("Ignoring grid snapshot from a different version")
+            return None
+
+        snapshot = GridSnapshot(
+            view_key=data.get("view_key", ""),
+            entries=[SnapshotEntry(str(row[0]), row[1], row[2]) for row in data.get("entries", [])],
+            total=data.get("total", 0),
+            created=data.get("created", 0.0)
+        )
+    except Exception as e:
+        logger.warning(f"Error loading grid snapshot: {e}")
+        return None
+
+    if view_key is not None and snapshot.view_key != view_key:
+        logger.debug("Grid snapshot was taken with a different view, ignoring it")
+        return None
+
+    return snapshot
@@ -0,0 +1,98 @@
+import os
+import logging
+from typing import Optional
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Gdk', '4.0')
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import Gtk, Gdk, GdkPixbuf
+
+from data import Game, Runner
+from data_handler import DataHandler
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class GtkDataHandler(DataHandler):
+    """
+    DataHandler with the image and icon helpers the GTK interface needs.
+
+    DataHandler itself doesn't import GTK, so importers, the command line
+    tools and benchmarks can use it without initialising a display.
+    """
+
+    def has_icon(self, icon_name: str) -> bool:
+        """
+        Check whether an icon is available in the icon theme.
+
+        Args:
+            icon_name: The name of the icon
+
+        Returns:
+            True if the icon exists, False otherwise
+        """
+        display = Gdk.Display.get_default()
+        if not display:
+            return False
+        return Gtk.IconTheme.get_for_display(display).has_icon(icon_name)
+
+    def load_game_image(self, game: Game, width: int = 200, height: int = 260) -> Optional[GdkPixbuf.Pixbuf]:
+        """
+        Load a game's image as a pixbuf, scaled to the specified dimensions.
+
+        Args:
+            game: The game to load the image for
+            width: The desired width of the image
+            height: The desired height of the image
+
+        Returns:
+            A pixbuf containing the game's image, or None if no image is available
+        """
+        try:
+            cover_path = game.get_cover_path(self.data_dir)
+            if not os.path.exists(cover_path):
+                return None
+            return GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                cover_path, width, height, True)
+        except Exception as e:
+            logger.error(f"Error loading image for {game.title}: {e}")
+            return None
+
+    def get_default_icon_paintable(self, icon_name: str, size: int = 128) -> 'Gdk.Paintable':
+        """
+        Get a default icon as a paintable for use with GtkPicture widgets.
+
+        Args:
+            icon_name: The name of the icon to get
+            size: The size of the icon
+
+        Returns:
+            A paintable that can be used with GtkPicture widgets
+        """
+        display = Gdk.Display.get_default()
+        icon_theme = Gtk.IconTheme.get_for_display(display)
+        # The empty list is for icon sizes, 1 is scale factor, Gtk.TextDirection.LTR is text direction
+        return icon_theme.lookup_icon(icon_name, [], size, 1, Gtk.TextDirection.LTR, 0)
+
+    def load_runner_image(self, runner: Runner, width: int = 64, height: int = 64) -> Optional[GdkPixbuf.Pixbuf]:
+        """
+        Load a runner's image as a pixbuf, scaled to the specified dimensions.
+
+        Args:
+            runner: The runner to load the image for
+            width: The desired width of the image
+            height: The desired height of the image
+
+        Returns:
+            A pixbuf containing the runner's image, or None if no image is available
+        """
+        try:
+            if not runner.image or not os.path.exists(runner.image):
+                return None
+            return GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                runner.image, width, height, True)
+        except Exception as e:
+            logger.error(f"Error loading image for {runner.title}: {e}")
+            return None
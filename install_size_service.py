@@ -0,0 +1,252 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from scan_scheduler import ResourceLimiter, get_device_key, get_resource_limiter
+from sources.file_state_cache import FileStateCache
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class InstallSizeService:
+    """
+    Computes the installation size of directory-based games in the background.
+
+    Scanners enqueue (game, directory) pairs instead of walking game folders
+    themselves. A single worker thread sums file sizes with
+    FileStateCache.tree_size, whose directory listings are kept in
+    data/install_size_state.sqlite. Adding, removing or renaming a file changes
+    the directory's mtime, so when a tree is measured again only changed
+    directories are listed; the others cost one stat. Files rewritten in place
+    keep their directory's mtime and are picked up once the directory changes.
+
+    The worker holds the device slot of the resource limiter while measuring,
+    so it takes turns with scans of the same disk, and lists at most
+    max_dirs_per_second directories. The slot is given up while it sleeps
+    between listings and after every LISTINGS_PER_TURN listings, so a scan
+    of the same disk never waits for a whole game folder. Jobs are kept in data/install_sizes.sqlite
+    until they finish, so work interrupted by quitting resumes on the next
+    start. A game's installation_size is updated when its size is known and
+    has changed.
+    """
+
+    DB_FILENAME = "install_sizes.sqlite"
+    STATE_FILENAME = "install_size_state.sqlite"
+
+    # Directory listings done on the disk's device slot before giving it up for
+    # at least TURN_PAUSE seconds; a slot released and taken back at once would
+    # not let anyone waiting for it in
+    LISTINGS_PER_TURN = 20
+    TURN_PAUSE = 0.01
+
+    def __init__(self, data_handler, max_dirs_per_second: float = 200.0,
+                 limiter: Optional[ResourceLimiter] = None):
+        """
+        Initialize the service and resume jobs left over from the last run
+
+        Args:
+            data_handler: The data handler for updating games
+            max_dirs_per_second: Maximum directory listings per second; 0 for no limit
+            limiter: Resource limiter for per-device limits, defaults to the global one
+        """
+        self.data_handler = data_handler
+        self.max_dirs_per_second = max_dirs_per_second
+        self.limiter = limiter or get_resource_limiter()
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending: Dict[str, str] = {}  # game ID -> directory, in queue order
+        self._worker: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._last_listing = 0.0
+        self._turn_listings = 0
+        # Directory listings; each worker thread opens its own connection
+        self._state_path = str(Path(data_handler.data_dir) / self.STATE_FILENAME)
+
+        db_path = Path(data_handler.data_dir) / self.DB_FILENAME
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            game_id TEXT PRIMARY KEY,
+            directory TEXT NOT NULL,
+            queued_at REAL NOT NULL
+        );
+        ''')
+        self.conn.commit()
+
+        rows = self.conn.execute("SELECT game_id, directory FROM jobs ORDER BY queued_at").fetchall()
+        if rows:
+            logger.info(f"Resuming {len(rows)} queued installation size computations")
+            with self._lock:
+                self._pending.update(rows)
+                self._start_worker()
+
+    def add_listener(self, callback: Callable[[str, int], None]):
+        """
+        Register a callback for changed installation sizes
+
+        Args:
+            callback: Called with (game_id, size) from the worker thread after the game was saved
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, int], None]):
+        """Unregister a callback added with add_listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def enqueue_many(self, jobs: List[Tuple[str, str]]):
+        """
+        Queue games to have their installation size computed
+
+        Args:
+            jobs: (game_id, directory) pairs; a game queued again gets the new directory
+        """
+        jobs = [(game_id, directory) for game_id, directory in jobs if game_id and directory]
+        if not jobs:
+            return
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO jobs (game_id, directory, queued_at) VALUES (?, ?, ?)",
+                [(game_id, directory, now) for game_id, directory in jobs])
+            self.conn.commit()
+            for game_id, directory in jobs:
+                self._pending[game_id] = directory
+            self._start_worker()
+
+    def pending_count(self) -> int:
+        """Get the number of games waiting for their size"""
+        with self._lock:
+            return len(self._pending)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued game has been measured
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if the queue is empty, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def _start_worker(self):
+        """Start the worker thread if it isn't running (called with the lock held)"""
+        if self._pending and (self._worker is None or not self._worker.is_alive()):
+            self._worker = threading.Thread(target=self._run, name="install-size", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        file_cache = FileStateCache(self._state_path)
+        try:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._worker = None
+                        self._idle.notify_all()
+                        return
+                    game_id, directory = next(iter(self._pending.items()))
+
+                size = None
+                try:
+                    device_key = get_device_key(directory)
+                    with self.limiter.hold(device_key):
+                        size = self._tree_size(file_cache, os.path.abspath(directory), device_key)
+                except Exception as e:
+                    logger.error(f"Error computing the size of {directory}: {e}", exc_info=True)
+                file_cache.commit()
+
+                if size is not None:
+                    self._update_game(game_id, size)
+
+                with self._lock:
+                    # A game queued again meanwhile keeps its new job
+                    if self._pending.get(game_id) == directory:
+                        del self._pending[game_id]
+                        self.conn.execute("DELETE FROM jobs WHERE game_id = ? AND directory = ?", (game_id, directory))
+                    self.conn.commit()
+        finally:
+            file_cache.close()
+
+    def _tree_size(self, file_cache: FileStateCache, root: str, device_key: Optional[str]) -> Optional[int]:
+        """Sum the sizes of the files below root, listing only directories that changed"""
+        if not os.path.isdir(root):
+            logger.warning(f"Installation directory {root} doesn't exist")
+            return None
+        self._turn_listings = 0
+        return file_cache.tree_size(root, throttle=lambda: self._throttle(device_key))
+
+    def _throttle(self, device_key: Optional[str]):
+        """Space directory listings out to max_dirs_per_second, letting others use the disk meanwhile"""
+        self._turn_listings += 1
+        delay = 0.0
+        if self.max_dirs_per_second > 0:
+            delay = self._last_listing + 1.0 / self.max_dirs_per_second - time.monotonic()
+        if self._turn_listings >= self.LISTINGS_PER_TURN:
+            delay = max(delay, self.TURN_PAUSE)
+        if delay > 0:
+            with self.limiter.released(device_key):
+                time.sleep(delay)
+            self._turn_listings = 0
+        self._last_listing = time.monotonic()
+
+    def _update_game(self, game_id: str, size: int):
+        """Save a game's new installation size and tell the listeners"""
+        game = self.data_handler.library_index.get_game(game_id)
+        if game is None:
+            return  # Removed in the meantime
+        if game.installation_size == size:
+            return
+        game.installation_size = size
+        if not self.data_handler.save_game(game):
+            logger.warning(f"Failed to save the installation size of {game.title}")
+            return
+
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(game_id, size)
+            except Exception as e:
+                logger.error(f"Error with install size listener: {e}")
+
+
+# One service per data directory, shared by all scanners in the process
+_services: Dict[str, InstallSizeService] = {}
+_services_lock = threading.Lock()
+
+
+def get_install_size_service(data_handler) -> InstallSizeService:
+    """
+    Get the installation size service of a data handler's library
+
+    Args:
+        data_handler: The data handler instance
+
+    Returns:
+        The shared service, created (and its saved jobs resumed) on first use
+    """
+    key = os.path.abspath(str(data_handler.data_dir))
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = InstallSizeService(data_handler)
+        return service
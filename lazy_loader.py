@@ -0,0 +1,85 @@
+import logging
+import importlib
+import threading
+from typing import Any, Dict, List
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class LazyRegistry:
+    """
+    Maps names to "module:attribute" targets that are only imported on first use.
+
+    Scanners, metadata providers and dialogs pull in heavy third-party modules
+    (requests, vdf, isodate, ...). Registering them here instead of importing
+    them at module level keeps those imports off the startup path.
+    """
+
+    def __init__(self, name: str, targets: Dict[Any, str] = None):
+        """
+        Initialize the registry
+
+        Args:
+            name: Name of the registry, used in log messages
+            targets: Optional initial mapping of key to "module:attribute"
+        """
+        self.name = name
+        self._targets: Dict[Any, str] = {}
+        self._loaded: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+        for key, target in (targets or {}).items():
+            self.register(key, target)
+
+    def register(self, key: Any, target: str):
+        """
+        Register a lazily imported target
+
+        Args:
+            key: The key used to look the target up
+            target: Import path in the form "package.module:attribute"
+        """
+        if ":" not in target:
+            raise ValueError(f"Invalid lazy target '{target}', expected 'module:attribute'")
+        self._targets[key] = target
+        self._loaded.pop(key, None)
+
+    def get(self, key: Any) -> Any:
+        """
+        Get the object registered under key, importing its module on first use
+
+        Args:
+            key: The registered key
+
+        Returns:
+            The imported attribute
+
+        Raises:
+            KeyError: If nothing is registered under key
+        """
+        if key in self._loaded:
+            return self._loaded[key]
+
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+
+            target = self._targets[key]
+            module_name, attr_name = target.split(":", 1)
+            logger.debug(f"Loading {self.name} '{key}' from {module_name}")
+            module = importlib.import_module(module_name)
+            obj = getattr(module, attr_name)
+            self._loaded[key] = obj
+            return obj
+
+    def is_loaded(self, key: Any) -> bool:
+        """Check whether the target for key has already been imported"""
+        return key in self._loaded
+
+    def keys(self) -> List[Any]:
+        """Get all registered keys"""
+        return list(self._targets.keys())
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._targets
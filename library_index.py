@@ -0,0 +1,262 @@
+import copy
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from data import Game
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+def make_path_key(directory: str, files) -> str:
+    """
+    Build the key that identifies an installed game by its location
+
+    Args:
+        directory: Installation directory
+        files: Installation files, a list of paths relative to directory (or a single value)
+
+    Returns:
+        Key of the form "<directory>::<file>|<file>..."
+    """
+    files_key = "|".join(sorted(files)) if isinstance(files, list) else str(files)
+    return f"{directory}::{files_key}"
+
+
+def get_path_key(game: Game) -> Optional[str]:
+    """Get the path key of a game, or None if it has no installation data"""
+    if getattr(game, "installation_directory", None) and getattr(game, "installation_files", None):
+        return make_path_key(game.installation_directory, game.installation_files)
+    return None
+
+
+class LibraryIndex:
+    """
+    In-memory index of the library for scanners.
+
+    Games are grouped by source and indexed by (source, launcher_type, launcher_id)
+    and (source, path key). The library is parsed from disk once, on the first
+    lookup after creation or invalidate(), and then kept current by the data
+    handler as games are saved and removed.
+
+    The index holds its own copies of the games and hands out copies, so callers
+    can modify and save what they get back without affecting the index or each
+    other. All methods are thread-safe.
+
+    It also counts references to media files: which games' covers link to each
+    file of the media store. Cover links are read separately, on the first media
+    lookup, so scans that never ask about media don't pay for them.
+    """
+
+    def __init__(self, loader: Callable[[], List[Game]],
+                 cover_loader: Optional[Callable[[], Dict[str, str]]] = None):
+        """
+        Initialize the index
+
+        Args:
+            loader: Function returning every game in the library
+            cover_loader: Optional function returning game ID -> media key of every cover link
+        """
+        self._loader = loader
+        self._cover_loader = cover_loader
+        self._covers: Optional[Dict[str, str]] = None
+        self._media_refs: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._games: Optional[Dict[str, Game]] = None
+        self._by_source: Dict[str, Dict[str, Game]] = {}
+        self._by_launcher_id: Dict[Tuple[str, str, str], Game] = {}
+        self._by_path: Dict[Tuple[str, str], Game] = {}
+        self._keys: Dict[str, Tuple[Optional[Tuple[str, str, str]], Optional[Tuple[str, str]]]] = {}
+
+    def _ensure_loaded(self):
+        if self._games is not None:
+            return
+        games = self._loader()
+        self._games = {}
+        self._by_source = {}
+        self._by_launcher_id = {}
+        self._by_path = {}
+        self._keys = {}
+        for game in games:
+            self._add(game)
+        logger.debug(f"Library index built with {len(self._games)} games")
+
+    def _add(self, game: Game):
+        self._games[game.id] = game
+
+        launcher_key = None
+        path_key = None
+        if game.source:
+            self._by_source.setdefault(game.source, {})[game.id] = game
+            if game.launcher_type and game.launcher_id:
+                launcher_key = (game.source, game.launcher_type, game.launcher_id)
+                self._by_launcher_id[launcher_key] = game
+            game_path_key = get_path_key(game)
+            if game_path_key:
+                path_key = (game.source, game_path_key)
+                self._by_path[path_key] = game
+        self._keys[game.id] = (launcher_key, path_key)
+
+    def _discard(self, game_id: str):
+        old = self._games.pop(game_id, None)
+        if old is None:
+            return
+        if old.source in self._by_source:
+            self._by_source[old.source].pop(game_id, None)
+        launcher_key, path_key = self._keys.pop(game_id, (None, None))
+        # Another game may have taken over the key since; only drop our own entry
+        if launcher_key and self._by_launcher_id.get(launcher_key) is old:
+            del self._by_launcher_id[launcher_key]
+        if path_key and self._by_path.get(path_key) is old:
+            del self._by_path[path_key]
+
+    def _ensure_covers_loaded(self):
+        if self._covers is not None:
+            return
+        self._covers = {}
+        self._media_refs = {}
+        if self._cover_loader:
+            for game_id, media_key in self._cover_loader().items():
+                self._covers[game_id] = media_key
+                self._media_refs.setdefault(media_key, set()).add(game_id)
+        logger.debug(f"Media references built for {len(self._covers)} covers")
+
+    def _discard_cover(self, game_id: str):
+        media_key = self._covers.pop(game_id, None)
+        if media_key is not None:
+            refs = self._media_refs.get(media_key)
+            if refs is not None:
+                refs.discard(game_id)
+                if not refs:
+                    del self._media_refs[media_key]
+
+    def invalidate(self):
+        """Drop the index; the next lookup parses the library again"""
+        with self._lock:
+            self._games = None
+            self._covers = None
+
+    def update(self, game: Game):
+        """
+        Record a saved game
+
+        Args:
+            game: The game as it was written to disk
+        """
+        with self._lock:
+            if self._games is None:
+                return
+            self._discard(game.id)
+            self._add(copy.deepcopy(game))
+
+    def remove(self, game_id: str):
+        """
+        Forget a removed game
+
+        Args:
+            game_id: ID of the game
+        """
+        with self._lock:
+            if self._games is not None:
+                self._discard(game_id)
+            if self._covers is not None:
+                self._discard_cover(game_id)
+
+    def set_cover(self, game_id: str, media_key: Optional[str]):
+        """
+        Record where a game's cover links to
+
+        Args:
+            game_id: ID of the game
+            media_key: Key of the media file (see MediaStore.get_key), or None if the cover was removed
+        """
+        with self._lock:
+            if self._covers is None:
+                return
+            self._discard_cover(game_id)
+            if media_key:
+                self._covers[game_id] = media_key
+                self._media_refs.setdefault(media_key, set()).add(game_id)
+
+    def get_media_refcount(self, media_key: str) -> int:
+        """Get the number of games whose cover links to a media file"""
+        with self._lock:
+            self._ensure_covers_loaded()
+            return len(self._media_refs.get(media_key, ()))
+
+    def get_referenced_media(self) -> Dict[str, int]:
+        """
+        Get every media file in use
+
+        Returns:
+            Dictionary of media key to the number of games linking to it
+        """
+        with self._lock:
+            self._ensure_covers_loaded()
+            return {media_key: len(refs) for media_key, refs in self._media_refs.items()}
+
+    def get_game(self, game_id: str) -> Optional[Game]:
+        """Get a copy of a game by ID, if it is in the library"""
+        with self._lock:
+            self._ensure_loaded()
+            game = self._games.get(game_id)
+            return copy.deepcopy(game) if game else None
+
+    def get_source_games(self, source_id: str) -> List[Game]:
+        """
+        Get all games imported from a source
+
+        Args:
+            source_id: ID of the source
+
+        Returns:
+            Copies of the games of the source
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return [copy.deepcopy(game) for game in self._by_source.get(source_id, {}).values()]
+
+    def get_by_launcher_id(self, source_id: str, launcher_type: str) -> Dict[str, Game]:
+        """
+        Get the games of a source with a launcher ID, keyed by launcher ID
+
+        Args:
+            source_id: ID of the source
+            launcher_type: Launcher type of the games (e.g. "STEAM")
+
+        Returns:
+            Dictionary of launcher ID to a copy of the game
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return {key[2]: copy.deepcopy(game) for key, game in self._by_launcher_id.items()
+                    if key[0] == source_id and key[1] == launcher_type}
+
+    def get_by_path_key(self, source_id: str) -> Dict[str, Game]:
+        """
+        Get the installed games of a source, keyed by path key (see make_path_key)
+
+        Args:
+            source_id: ID of the source
+
+        Returns:
+            Dictionary of path key to a copy of the game
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return {key[1]: copy.deepcopy(game) for key, game in self._by_path.items() if key[0] == source_id}
+
+    def find_by_launcher_id(self, source_id: str, launcher_type: str, launcher_id) -> Optional[Game]:
+        """Get a copy of the game of a source with the given launcher ID, if any"""
+        with self._lock:
+            self._ensure_loaded()
+            game = self._by_launcher_id.get((source_id, launcher_type, launcher_id))
+            return copy.deepcopy(game) if game else None
+
+    def find_by_path_key(self, source_id: str, path_key: str) -> Optional[Game]:
+        """Get a copy of the game of a source installed at the given path key, if any"""
+        with self._lock:
+            self._ensure_loaded()
+            game = self._by_path.get((source_id, path_key))
+            return copy.deepcopy(game) if game else None
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
 
+import time
+# Taken before the heavy imports so time-to-interactive covers the whole startup
+_PROCESS_START = time.monotonic()
+
 import logging
 import sys
 import gi
@@ -8,11 +12,14 @@ import signal
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 gi.require_version('Gdk', '4.0')
-from gi.repository import Gtk, Adw, Gio, Gdk, GLib
-from data_handler import DataHandler
+from gi.repository import Gtk, Adw, Gio, GLib
+from gtk_data_handler import GtkDataHandler
 from app_state_manager import AppStateManager
+from startup_pipeline import StartupPipeline, format_timings
+from grid_snapshot import load_grid_snapshot, save_grid_snapshot, view_key_from_app_state
 # Import controllers
 from controllers import GameShelfController, GameShelfWindow, SplashScreen
+from controllers.snapshot_window_controller import SnapshotWindow
 # Import tray icon implementation
 from tray_icon import GameShelfTrayIcon
 
@@ -23,6 +30,7 @@ class GameShelfApp(Adw.Application):
         super().__init__(application_id="com.gameshelf.app")
         self.win = None
         self.splash = None
+        self.grid_snapshot = None
         self.tray_icon = None
 
         # Set application icon
@@ -40,13 +48,9 @@ class GameShelfApp(Adw.Application):
         else:
             self.app_icon_path = None
 
-        # Load CSS
-        css = Gtk.CssProvider()
-        css.load_from_path(os.path.join(os.path.dirname(__file__), "layout", "style.css"))
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(), css,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
+        # CSS is loaded by the startup pipeline once the splash screen is up
+        self.css_path = os.path.join(os.path.dirname(__file__), "layout", "style.css")
+        self.startup_timings = {}
 
         # Set up application lifecycle signal handlers
         self.connect("shutdown", self.on_shutdown)
@@ -69,46 +73,83 @@ class GameShelfApp(Adw.Application):
         self._show_splash_screen()
 
     def _show_splash_screen(self):
-        """Show splash screen and start loading the main app in the background"""
-        # Path to splash screen image
-        splash_image_path = os.path.join(os.path.dirname(__file__), "gameshelf-transparent.png")
-
-        # Create and show splash screen
-        self.splash = SplashScreen(
-            image_path=splash_image_path,
-            timeout_ms=3000,  # Show for 3 seconds minimum
-            on_timeout=self._initialize_main_window,
-            application=self  # Pass the application to properly parent the window
-        )
+        """Show the last grid snapshot or the splash screen and load the main app on background workers"""
+        # App state is a small file; it is needed to validate the snapshot and size its window
+        self.app_state_manager = AppStateManager()
+        self.grid_snapshot = load_grid_snapshot(view_key=view_key_from_app_state(self.app_state_manager))
+
+        if self.grid_snapshot and self.grid_snapshot.entries:
+            # Paint the grid as it was last time; the real window replaces it once loaded
+            width, height = self.app_state_manager.get_window_size()
+            self.splash = SnapshotWindow(
+                self.grid_snapshot, width, height,
+                maximized=self.app_state_manager.get_window_maximized(),
+                application=self
+            )
+        else:
+            # Path to splash screen image
+            splash_image_path = os.path.join(os.path.dirname(__file__), "gameshelf-transparent.png")
+
+            # Create and show splash screen - it stays up until the startup pipeline is done
+            self.splash = SplashScreen(
+                image_path=splash_image_path,
+                timeout_ms=0,
+                application=self  # Pass the application to properly parent the window
+            )
         self.splash.present()
 
-        # Start loading the main application in the background - 50ms delay to let the splash render first
-        GLib.timeout_add(50, self._initialize_app_data)
-
-    def _initialize_app_data(self):
-        """Initialize app data in the background while splash screen is showing"""
-        try:
-            # Initialize data handler and app state manager
-            self.data_handler = DataHandler()
-            self.app_state_manager = AppStateManager()
-
-            # Create main controller with handlers
-            self.controller = GameShelfController(self.data_handler, self.app_state_manager)
-
+        # Load library, covers and stylesheet while the splash is visible
+        self.startup_pipeline = StartupPipeline(
+            on_ready=self._on_startup_ready,
+            css_path=self.css_path,
+            app_state_manager=self.app_state_manager,
+            first_screen_ids=self.grid_snapshot.game_ids() if self.grid_snapshot else None
+        )
+        self.startup_pipeline.start()
+
+    def _on_startup_ready(self, result):
+        """Called on the main thread once the startup pipeline has finished"""
+        self.startup_timings = dict(result.timings)
+        logging.info(f"Startup pipeline finished: {format_timings(self.startup_timings)}")
+
+        if result.error is None:
+            self.data_handler = result.data_handler
+            self.app_state_manager = result.app_state_manager
+            self.controller = GameShelfController(
+                self.data_handler, self.app_state_manager,
+                games=result.games, runners=result.runners
+            )
+            self.controller.initial_cover_cache = result.cover_textures
+            self.controller.initial_cover_colors = result.cover_colors
             logging.info("Application data initialization complete")
-        except Exception as e:
-            # Log any initialization errors but continue with app startup
-            logging.error(f"Error during app initialization: {e}")
-
-            # Make sure we have at least minimal required objects
-            if not hasattr(self, 'data_handler'):
-                self.data_handler = DataHandler()
-            if not hasattr(self, 'app_state_manager'):
-                self.app_state_manager = AppStateManager()
-            if not hasattr(self, 'controller'):
-                self.controller = GameShelfController(self.data_handler, self.app_state_manager)
-
-        return False  # Don't repeat this timeout
+        else:
+            # Leave the controller unset so the main window falls back to a synchronous load
+            logging.error(f"Error during app initialization: {result.error}")
+
+        self._initialize_main_window()
+        if self.splash:
+            self.splash.finish()
+            self.splash = None
+        self._log_grid_snapshot_accuracy()
+
+    def _log_grid_snapshot_accuracy(self):
+        """Log how many tiles of the snapshot painted at startup the real grid shows in the same place.
+
+        Diagnostic only: the real window replaces the snapshot window outright,
+        at the snapshot window's size and both starting at the top of the grid;
+        no tiles are swapped in place. A low count means the snapshot was
+        stale, e.g. the library changed outside GameShelf.
+        """
+        snapshot = self.grid_snapshot
+        self.grid_snapshot = None
+        grid_controller = getattr(getattr(self, 'controller', None), 'game_grid_controller', None)
+        if not snapshot or not grid_controller:
+            return
+
+        snapshot_ids = snapshot.game_ids()
+        grid_ids = grid_controller.get_grid_game_ids(limit=len(snapshot_ids))
+        unchanged = sum(1 for a, b in zip(snapshot_ids, grid_ids) if a == b)
+        logging.info(f"Grid snapshot accuracy: {unchanged} of {len(snapshot_ids)} tiles unchanged")
 
     def _initialize_main_window(self):
         """Initialize and show the main window after splash screen closes"""
@@ -118,7 +159,7 @@ class GameShelfApp(Adw.Application):
             # Make sure the controller exists before creating the window
             if not hasattr(self, 'controller') or self.controller is None:
                 logging.info("Creating controller first...")
-                self.data_handler = DataHandler()
+                self.data_handler = GtkDataHandler()
                 self.app_state_manager = AppStateManager()
                 self.controller = GameShelfController(self.data_handler, self.app_state_manager)
 
@@ -128,11 +169,17 @@ class GameShelfApp(Adw.Application):
                 # Create the window
                 self.win = GameShelfWindow(self, self.controller)
 
-                # Apply saved window size and state
-                width, height = self.app_state_manager.get_window_size()
+                # Apply saved window size and state, or take over those of the snapshot
+                # window, which the user may have resized while the library loaded
+                if isinstance(self.splash, SnapshotWindow):
+                    width, height = self.splash.get_default_size()
+                    maximized = self.splash.is_maximized()
+                else:
+                    width, height = self.app_state_manager.get_window_size()
+                    maximized = self.app_state_manager.get_window_maximized()
                 self.win.set_default_size(width, height)
 
-                if self.app_state_manager.get_window_maximized():
+                if maximized:
                     self.win.maximize()
 
             # Present the window
@@ -141,6 +188,13 @@ class GameShelfApp(Adw.Application):
             self._window_shown = True
             logging.info("Main window presented successfully")
 
+            # Measured when the first frame of the window has been painted
+            frame_clock = self.win.get_frame_clock()
+            if frame_clock:
+                self._after_paint_handler = frame_clock.connect("after-paint", self._on_first_paint)
+            else:
+                GLib.idle_add(self._report_time_to_interactive)
+
             # Mark initialization as complete
             self._initialization_complete = True
 
@@ -194,6 +248,19 @@ class GameShelfApp(Adw.Application):
                 sys.exit(1)
 
 
+    def _on_first_paint(self, frame_clock):
+        """Report the time to interactive once, after the main window's first paint"""
+        frame_clock.disconnect(self._after_paint_handler)
+        self._after_paint_handler = None
+        self._report_time_to_interactive()
+
+    def _report_time_to_interactive(self):
+        """Log how long it took from process start until the main window was usable"""
+        elapsed = time.monotonic() - _PROCESS_START
+        logging.info(f"Time to interactive: {elapsed * 1000:.0f} ms ({format_timings(self.startup_timings)})")
+        self.startup_timings["time_to_interactive"] = elapsed
+        return False  # Don't repeat
+
     def _on_window_hide(self, window):
         """Handle window hide event to update tray icon menu"""
         logging.debug("Window hidden")
@@ -206,6 +273,19 @@ class GameShelfApp(Adw.Application):
         if hasattr(self, 'tray_icon') and self.tray_icon:
             self.tray_icon.update_show_hide_label(True)
 
+    def _save_grid_snapshot(self):
+        """Save the visible grid so the next startup can paint it immediately"""
+        grid_controller = getattr(getattr(self, 'controller', None), 'game_grid_controller', None)
+        if not grid_controller:
+            return
+        try:
+            previous = load_grid_snapshot()
+            snapshot = grid_controller.build_snapshot(previous)
+            if snapshot:
+                save_grid_snapshot(snapshot)
+        except Exception as e:
+            logging.error(f"Error saving grid snapshot: {e}")
+
     def on_shutdown(self, app):
         """Save application state when shutting down"""
         # Only save window state if initialization was completed successfully
@@ -217,6 +297,7 @@ class GameShelfApp(Adw.Application):
                 self.app_state_manager.set_window_size(width, height)
 
             self.app_state_manager.set_window_maximized(self.win.is_maximized())
+            self._save_grid_snapshot()
         else:
             logging.info("Skipping window state save - initialization not completed")
 
@@ -0,0 +1,313 @@
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Set, Tuple
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+def get_media_filename_for_url(url: str) -> str:
+    """
+    Generate a media filename for a given URL using SHA256 hash
+
+    Media downloaded before the content-addressed store was named this way.
+
+    Args:
+        url: The URL to generate a filename for
+
+    Returns:
+        Filename with .jpg extension
+    """
+    url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return f"{url_hash}.jpg"
+
+
+class MediaFile(NamedTuple):
+    """A file in the media store"""
+    key: str
+    path: str
+    size: int
+    mtime: float
+
+
+class MediaStore:
+    """
+    Content-addressed store for cover images.
+
+    Each image is named after the SHA-256 of its content and kept two directory
+    levels deep by the first four hex digits (media/3f/a2/3fa2....jpg), so no
+    directory grows past a few hundred entries even with 100k images, and the
+    same picture downloaded from several URLs or added by hand twice is stored
+    once. Games link to media files through their cover.jpg symlink.
+
+    Media files are identified by their key, the path relative to the media
+    directory. Files from before the store (named after a URL hash, flat in
+    media/) keep working and are moved into the store by migrate_legacy().
+
+    URLs that have been downloaded are recorded in media/index.sqlite so a URL
+    is fetched only once. Removing games never deletes media; unreferenced files
+    are reclaimed by collect_garbage() (gameshelf-cli gc-media).
+    """
+
+    INDEX_FILENAME = "index.sqlite"
+    EXTENSION = ".jpg"
+
+    def __init__(self, media_dir):
+        """
+        Initialize the store
+
+        Args:
+            media_dir: Root directory of the media files
+        """
+        self.media_dir = Path(media_dir)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Open the URL index on first use (called with the lock held)"""
+        if self._conn is None:
+            self.media_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.media_dir / self.INDEX_FILENAME), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, media_key TEXT NOT NULL)")
+            self._conn.commit()
+        return self._conn
+
+    def get_key_for_digest(self, digest: str) -> str:
+        """Get the key of the media file with the given content hash"""
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{self.EXTENSION}"
+
+    def get_path(self, key: str) -> Path:
+        """Get the path of a media file from its key"""
+        return self.media_dir / key
+
+    def get_key(self, path) -> Optional[str]:
+        """
+        Get the key of a media file from its path
+
+        Args:
+            path: Path of a file, or a cover link pointing at one
+
+        Returns:
+            Key relative to the media directory, or None if the path is outside it
+        """
+        try:
+            relative = os.path.relpath(os.path.realpath(path), os.path.realpath(self.media_dir))
+        except ValueError:
+            return None
+        if relative.startswith(os.pardir):
+            return None
+        return relative.replace(os.sep, "/")
+
+    def add_file(self, source_path: str, move: bool = False, url: Optional[str] = None) -> Optional[Path]:
+        """
+        Add an image to the store
+
+        Args:
+            source_path: File to add
+            move: Move the file into the store instead of copying it (e.g. a finished download)
+            url: Optional URL the image was downloaded from, recorded for lookup_url
+
+        Returns:
+            Path of the stored file, or None on error
+        """
+        try:
+            digest = hashlib.sha256()
+            with open(source_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            key = self.get_key_for_digest(digest.hexdigest())
+            media_path = self.get_path(key)
+
+            if media_path.exists():
+                # Same content is already stored
+                if move:
+                    os.unlink(source_path)
+            else:
+                media_path.parent.mkdir(parents=True, exist_ok=True)
+                if move:
+                    try:
+                        os.replace(source_path, media_path)
+                    except OSError:
+                        # Different filesystem (e.g. /tmp); fall back to copy and delete
+                        self._copy_into(source_path, media_path)
+                        os.unlink(source_path)
+                else:
+                    self._copy_into(source_path, media_path)
+
+            if url:
+                with self._lock:
+                    conn = self._get_conn()
+                    conn.execute("INSERT OR REPLACE INTO urls (url, media_key) VALUES (?, ?)", (url, key))
+                    conn.commit()
+            return media_path
+
+        except Exception as e:
+            logger.error(f"Error adding {source_path} to the media store: {e}")
+            return None
+
+    def _copy_into(self, source_path: str, media_path: Path):
+        """Copy a file to its place in the store; readers never see a partial file"""
+        fd, temp_path = tempfile.mkstemp(dir=media_path.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, media_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def lookup_url(self, url: str) -> Optional[Path]:
+        """
+        Get the stored image downloaded from a URL
+
+        Args:
+            url: URL of the image
+
+        Returns:
+            Path of the media file, or None if the URL hasn't been downloaded
+            (or its file has since been collected)
+        """
+        with self._lock:
+            row = self._get_conn().execute("SELECT media_key FROM urls WHERE url = ?", (url,)).fetchone()
+        if row:
+            media_path = self.get_path(row[0])
+            if media_path.exists():
+                return media_path
+
+        # Downloaded before the store and not migrated yet
+        legacy_path = self.media_dir / get_media_filename_for_url(url)
+        return legacy_path if legacy_path.exists() else None
+
+    def iter_files(self) -> Iterator[MediaFile]:
+        """
+        Yield every media file, both in the sharded store and legacy flat files
+
+        Yields:
+            MediaFile entries
+        """
+        pending = [""]
+        while pending:
+            prefix = pending.pop()
+            try:
+                with os.scandir(self.media_dir / prefix) as entries:
+                    for entry in entries:
+                        key = f"{prefix}{entry.name}"
+                        if entry.is_dir(follow_symlinks=False):
+                            # Only the two shard levels hold media
+                            if prefix.count("/") < 2 and len(entry.name) == 2:
+                                pending.append(f"{key}/")
+                        elif entry.is_file(follow_symlinks=False) and entry.name.endswith(self.EXTENSION):
+                            stat = entry.stat(follow_symlinks=False)
+                            yield MediaFile(key, entry.path, stat.st_size, stat.st_mtime)
+            except FileNotFoundError:
+                continue
+
+    def migrate_legacy(self, links: Dict[str, str], dry_run: bool = False) -> Dict[str, str]:
+        """
+        Move flat, URL-named media files into the store and repoint their links
+
+        Args:
+            links: Cover link path -> key of the media file it points at
+            dry_run: Only count what would be moved
+
+        Returns:
+            Old key -> new key of every migrated file
+        """
+        legacy = {key for key in links.values() if "/" not in key}
+        moved: Dict[str, str] = {}
+        for key in sorted(legacy):
+            if dry_run:
+                moved[key] = key
+                continue
+            new_path = self.add_file(str(self.get_path(key)))
+            if new_path is None:
+                continue
+            moved[key] = self.get_key(new_path)
+
+        if dry_run:
+            return moved
+
+        for link_path, key in links.items():
+            if key in moved:
+                try:
+                    relative = os.path.relpath(self.get_path(moved[key]), os.path.dirname(link_path))
+                    temp_link = f"{link_path}.tmp"
+                    if os.path.lexists(temp_link):
+                        os.unlink(temp_link)
+                    os.symlink(relative, temp_link)
+                    os.replace(temp_link, link_path)
+                except OSError as e:
+                    logger.error(f"Error relinking {link_path}: {e}")
+
+        # The flat copies are now unreferenced and go in the sweep
+        with self._lock:
+            conn = self._get_conn()
+            conn.executemany("UPDATE urls SET media_key = ? WHERE media_key = ?",
+                             [(new, old) for old, new in moved.items()])
+            conn.commit()
+        return moved
+
+    def collect_garbage(self, referenced: Set[str], min_age: float = 3600,
+                        dry_run: bool = False) -> Tuple[int, int]:
+        """
+        Delete media files that no game links to (the sweep of a mark-and-sweep)
+
+        Args:
+            referenced: Keys of every media file in use (the mark)
+            min_age: Keep files younger than this many seconds; a download
+                     may have been stored but not linked yet
+            dry_run: Only count what would be deleted
+
+        Returns:
+            Tuple of (files deleted, bytes reclaimed)
+        """
+        cutoff = time.time() - min_age
+        removed = 0
+        reclaimed = 0
+        removed_keys = []
+        for media_file in self.iter_files():
+            if media_file.key in referenced or media_file.mtime > cutoff:
+                continue
+            if not dry_run:
+                try:
+                    os.unlink(media_file.path)
+                except OSError as e:
+                    logger.error(f"Error removing {media_file.path}: {e}")
+                    continue
+                removed_keys.append(media_file.key)
+            removed += 1
+            reclaimed += media_file.size
+
+        if removed_keys:
+            with self._lock:
+                conn = self._get_conn()
+                conn.executemany("DELETE FROM urls WHERE media_key = ?", [(key,) for key in removed_keys])
+                conn.commit()
+            self._remove_empty_shards()
+        return removed, reclaimed
+
+    def _remove_empty_shards(self):
+        """Remove shard directories left empty by a sweep"""
+        for first in list(os.scandir(self.media_dir)):
+            if not first.is_dir(follow_symlinks=False) or len(first.name) != 2:
+                continue
+            for second in list(os.scandir(first.path)):
+                if second.is_dir(follow_symlinks=False):
+                    try:
+                        os.rmdir(second.path)
+                    except OSError:
+                        pass  # Not empty
+            try:
+                os.rmdir(first.path)
+            except OSError:
+                pass
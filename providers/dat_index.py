@@ -0,0 +1,197 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Region, language, revision and dump flags, e.g. "(USA)", "(Rev 1)", "[!]"
+_TAG_PATTERN = re.compile(r"\s*(\([^)]*\)|\[[^\]]*\])")
+
+
+def strip_dat_tags(name: str) -> str:
+    """
+    Remove the parenthesized and bracketed tags from a DAT game name
+
+    Args:
+        name: Game name, e.g. "Super Mario World (USA) (Rev 1)"
+
+    Returns:
+        The bare title, e.g. "Super Mario World"
+    """
+    return _TAG_PATTERN.sub("", name).strip() or name
+
+
+class DatIndex:
+    """
+    Hash table of known ROM dumps, imported from DAT files.
+
+    DAT files (Logiqx XML, as published by No-Intro and Redump) list every
+    verified dump of a platform with its CRC32, SHA-1 and size. A scanned file
+    whose hashes are in the table is identified exactly, whatever it is named,
+    including its region and revision. Files are looked up by SHA-1, or by CRC32
+    and size for DATs without SHA-1 and for archive members, whose SHA-1 isn't
+    known without extracting them.
+
+    Stored in data/providers/dat/dat_index.sqlite. Each operation opens its own
+    connection, so the index can be used from any thread.
+    """
+
+    DB_FILENAME = "dat_index.sqlite"
+
+    def __init__(self, data_directory: str = "data"):
+        """
+        Initialize the index
+
+        Args:
+            data_directory: GameShelf data directory
+        """
+        self.data_directory = os.path.join(data_directory, "providers", "dat")
+        self.db_path = os.path.join(self.data_directory, self.DB_FILENAME)
+
+    def exists(self) -> bool:
+        """Check whether any DAT has been imported"""
+        return os.path.exists(self.db_path)
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Open a connection to the index, creating the tables if needed"""
+        os.makedirs(self.data_directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript('''
+        CREATE TABLE IF NOT EXISTS dats (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            version TEXT,
+            imported_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS roms (
+            dat_id INTEGER NOT NULL,
+            game_name TEXT NOT NULL,
+            rom_name TEXT NOT NULL,
+            size INTEGER,
+            crc32 TEXT,
+            sha1 TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_roms_sha1 ON roms(sha1);
+        CREATE INDEX IF NOT EXISTS idx_roms_crc32 ON roms(crc32, size);
+        CREATE INDEX IF NOT EXISTS idx_roms_dat ON roms(dat_id);
+        ''')
+        return conn
+
+    def import_dat(self, dat_path: str) -> Tuple[str, int]:
+        """
+        Import a Logiqx XML DAT file, replacing an earlier import of the same DAT
+
+        Args:
+            dat_path: Path of the DAT file
+
+        Returns:
+            Tuple of (DAT name, number of ROMs imported)
+
+        Raises:
+            ET.ParseError: If the file isn't a valid XML DAT
+        """
+        name = None
+        version = None
+        roms: List[Tuple[str, str, Optional[int], Optional[str], Optional[str]]] = []
+
+        # Stream the file; No-Intro and Redump DATs run to tens of megabytes
+        for _, elem in ET.iterparse(dat_path, events=("end",)):
+            if elem.tag == "header":
+                name = elem.findtext("name") or name
+                version = elem.findtext("version") or version
+                elem.clear()
+            elif elem.tag in ("game", "machine"):
+                game_name = elem.get("name") or elem.findtext("description") or ""
+                for rom in elem.iter("rom"):
+                    crc32 = (rom.get("crc") or "").lower() or None
+                    sha1 = (rom.get("sha1") or "").lower() or None
+                    if not crc32 and not sha1:
+                        continue
+                    size = rom.get("size")
+                    roms.append((game_name, rom.get("name") or "",
+                                 int(size) if size and size.isdigit() else None, crc32, sha1))
+                elem.clear()
+
+        name = name or os.path.splitext(os.path.basename(dat_path))[0]
+
+        conn = self.get_connection()
+        try:
+            with conn:
+                row = conn.execute("SELECT id FROM dats WHERE name = ?", (name,)).fetchone()
+                if row:
+                    conn.execute("DELETE FROM roms WHERE dat_id = ?", (row[0],))
+                    conn.execute("UPDATE dats SET version = ?, imported_at = ? WHERE id = ?",
+                                 (version, time.time(), row[0]))
+                    dat_id = row[0]
+                else:
+                    dat_id = conn.execute("INSERT INTO dats (name, version, imported_at) VALUES (?, ?, ?)",
+                                          (name, version, time.time())).lastrowid
+                conn.executemany(
+                    "INSERT INTO roms (dat_id, game_name, rom_name, size, crc32, sha1) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(dat_id,) + rom for rom in roms]
+                )
+        finally:
+            conn.close()
+
+        logger.info(f"Imported {len(roms)} ROMs from DAT '{name}'")
+        return name, len(roms)
+
+    def list_dats(self) -> List[Tuple[str, Optional[str], int]]:
+        """
+        List the imported DATs
+
+        Returns:
+            List of (name, version, number of ROMs)
+        """
+        if not self.exists():
+            return []
+        conn = self.get_connection()
+        try:
+            return conn.execute(
+                "SELECT d.name, d.version, COUNT(r.dat_id) FROM dats d "
+                "LEFT JOIN roms r ON r.dat_id = d.id GROUP BY d.id ORDER BY d.name"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def lookup(self, hashes: Iterable[Tuple[str, str, int]]) -> Dict[Tuple[str, str, int], str]:
+        """
+        Identify files by their hashes
+
+        Args:
+            hashes: (CRC32, SHA-1, size) of each file, hex digits in lowercase. SHA-1 may
+                    be None when only the CRC32 is known, e.g. for archive members.
+
+        Returns:
+            Dictionary of the hashes that are known to the game name of their dump
+        """
+        hashes = list(dict.fromkeys(hashes))
+        if not hashes or not self.exists():
+            return {}
+
+        found: Dict[Tuple[str, str, int], str] = {}
+        conn = self.get_connection()
+        try:
+            for crc32, sha1, size in hashes:
+                row = None
+                if sha1:
+                    row = conn.execute(
+                        "SELECT game_name FROM roms WHERE sha1 = ? ORDER BY dat_id LIMIT 1", (sha1,)
+                    ).fetchone()
+                if row is None:
+                    # Older DATs only carry CRC32, and archives only record it; the size
+                    # guards against collisions. A dump with a different SHA-1 isn't a match.
+                    row = conn.execute(
+                        "SELECT game_name FROM roms WHERE crc32 = ? AND size = ? "
+                        "AND (sha1 IS NULL OR ? IS NULL) ORDER BY dat_id LIMIT 1", (crc32, size, sha1)
+                    ).fetchone()
+                if row:
+                    found[(crc32, sha1, size)] = row[0]
+        finally:
+            conn.close()
+        return found
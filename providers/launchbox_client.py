@@ -4,17 +4,24 @@ import os
 import sys
 import sqlite3
 import argparse
+import hashlib
 import requests
 import zipfile
 import tempfile
 import xml.etree.ElementTree as ET
 import re
 import shutil
+import threading
+import time
+import unicodedata
+import weakref
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Set, Tuple
 import datetime
 import logging
 
+from providers.dat_index import strip_dat_tags
+from providers.match_cache import MatchCache
 from providers.metadata_provider import MetadataProvider, Image, ImageCollection, SearchResultItem, Game, Genre, Platform, Company
 
 # Set up logger
@@ -22,11 +29,154 @@ logger = logging.getLogger(__name__)
 # Set logger level to DEBUG to see all messages
 logger.setLevel(logging.DEBUG)
 
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Get the form of a game name that lookups compare: lowercased, without trailing spaces."""
+    return name.lower().rstrip(' ') if name is not None else None
+
+
+def platform_key(platform: Optional[str]) -> Optional[str]:
+    """Get the form of a platform name that lookups compare: lowercased."""
+    return platform.lower() if platform is not None else None
+
+
+def _game_row(record: dict) -> tuple:
+    """Get the Games columns of a parsed game, up to Publisher."""
+    return (
+        record['DatabaseID'], record['Name'], record['ReleaseDate'], record['ReleaseYear'],
+        record['Overview'], record['MaxPlayers'], record['ReleaseType'],
+        1 if record['Cooperative'] else 0, record['WikipediaURL'], record['VideoURL'],
+        record['CommunityRating'], record['Platform'], record['ESRB'],
+        record['CommunityRatingCount'], record['Genres'], record['Developer'], record['Publisher']
+    )
+
+
+def _image_row(record: dict) -> tuple:
+    """Get the GameImages columns of a parsed image."""
+    return record['DatabaseID'], record['FileName'], record['Type'], record['Region'], record['CRC32']
+
+
+_HASH_MASK = (1 << 64) - 1
+
+
+def _add_row_hash(hashes: Dict[str, int], record_type: str, row: tuple):
+    """Add a row of a game to the game's content hash.
+
+    A game's content hash is the sum (modulo 2**64) of a 64-bit BLAKE2b digest
+    of each of its rows: its Games row, alternate names and images. A sum
+    doesn't depend on the order rows come in, and the dump lists a game's
+    alternate names and images far from the game itself.
+
+    Args:
+        hashes: DatabaseID -> content hash, updated in place
+        record_type: 'game', 'alternate_name' or 'image'
+        row: The row, starting with the DatabaseID
+    """
+    digest = hashlib.blake2b(repr((record_type,) + tuple(row)).encode('utf-8'), digest_size=8).digest()
+    database_id = row[0]
+    hashes[database_id] = (hashes.get(database_id, 0) + int.from_bytes(digest, 'little')) & _HASH_MASK
+
+
+def _signed_hash(value: int) -> int:
+    """Convert a content hash to the signed 64-bit integer SQLite stores."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+# Roman numerals as they appear in sequel titles. I and X are left alone, they
+# are as often letters ("Mega Man X") as numbers.
+_ROMAN_NUMERALS = {
+    'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9',
+    'xi': '11', 'xii': '12', 'xiii': '13', 'xiv': '14', 'xv': '15', 'xvi': '16',
+}
+_NON_WORD_PATTERN = re.compile(r'[\W_]+')
+_NUMBER_PATTERN = re.compile(r'\d+')
+
+
+def title_match_key(title: str) -> str:
+    """Reduce a title to the form the fuzzy matcher compares.
+
+    Region and edition tags in parentheses or brackets are dropped, accents
+    are removed, '&' becomes 'and', apostrophes are removed and other
+    punctuation becomes spaces, roman numerals become digits and a leading or
+    trailing "the" is dropped. So
+    "Legend of Zelda, The - A Link to the Past (USA)" and "The Legend of Zelda:
+    A Link to the Past" have the same key.
+
+    Args:
+        title: Game title or file name
+
+    Returns:
+        Lowercased words separated by single spaces
+    """
+    key = unicodedata.normalize('NFKD', strip_dat_tags(title).lower())
+    key = ''.join(char for char in key if not unicodedata.combining(char))
+    key = key.replace('&', ' and ').replace("'", '').replace('\u2019', '')
+    words = [_ROMAN_NUMERALS.get(word, word) for word in _NON_WORD_PATTERN.sub(' ', key).split()]
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    if len(words) > 1 and words[-1] == 'the':
+        words = words[:-1]
+    return ' '.join(words)
+
+
+def _padded_trigrams(key: str) -> set:
+    padded = f' {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def title_similarity(search_key: str, candidate_key: str) -> float:
+    """Score how alike two match keys are.
+
+    The score is the Dice coefficient of the keys' trigrams. A candidate that
+    starts with the whole searched title, i.e. adds a subtitle, gets half of
+    the remaining distance to 1.0 on top. Titles with different numbers are
+    different games of a series and get half the score.
+
+    Args:
+        search_key: Match key of the searched title
+        candidate_key: Match key of a game name
+
+    Returns:
+        Similarity from 0.0 to 1.0, where 1.0 means the same match key
+    """
+    if search_key == candidate_key:
+        return 1.0
+    search_trigrams = _padded_trigrams(search_key)
+    candidate_trigrams = _padded_trigrams(candidate_key)
+    score = 2 * len(search_trigrams & candidate_trigrams) / (len(search_trigrams) + len(candidate_trigrams))
+    if candidate_key.startswith(search_key + ' '):
+        score = (score + 1) / 2
+    if set(_NUMBER_PATTERN.findall(search_key)) != set(_NUMBER_PATTERN.findall(candidate_key)):
+        score /= 2
+    return score
+
+
+class _PooledConnection:
+    """A thread's read connection, with the database generation it was opened on"""
+
+    __slots__ = ('conn', 'generation', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection, generation: int):
+        self.conn = conn
+        self.generation = generation
+
+
 class LaunchBoxDatabase:
     """Handles interactions with the local LaunchBox metadata SQLite database."""
 
     DB_FILENAME = "LBGDB.sqlite"
 
+    # Names read from the trigram index per fuzzy search, before scoring
+    SIMILAR_CANDIDATES = 50
+    # Trigrams of a title searched for; the rarest ones are the most telling,
+    # and common ones would make the search read most of the index
+    SIMILAR_TRIGRAMS = 8
+
+    # Bytes of the database file memory-mapped by each read connection
+    MMAP_SIZE = 256 * 1024 * 1024
+    # Prepared statements kept by each read connection
+    CACHED_STATEMENTS = 256
+
     def __init__(self, data_directory: str):
         """Initialize the database handler with a path to store the database file.
 
@@ -37,31 +187,91 @@ class LaunchBoxDatabase:
         self.data_directory = data_directory
         self.db_path = os.path.join(data_directory, self.DB_FILENAME)
         self.conn = None
+        self._lookup_tables_checked = False
+        self._lookup_tables_lock = threading.Lock()
+
+        # Read connections, one per thread; the registry holds them weakly so a
+        # finished thread's connection is closed with its thread-local storage
+        self._local = threading.local()
+        self._pool = weakref.WeakSet()
+        self._pool_lock = threading.Lock()
+        self._generation = 0
 
     def get_connection(self):
-        """Get a SQLite connection, creating one if it doesn't exist.
+        """Get a new read-write SQLite connection, which the caller closes.
 
         Note: This creates a new connection for thread-safety.
         SQLite objects created in one thread can only be used in that same thread.
+        Lookups use get_read_connection instead.
         """
         # Always create a new connection for thread safety
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
+    def get_read_connection(self) -> sqlite3.Connection:
+        """Get the calling thread's read-only connection, opening it on first use.
+
+        Lookups come from many threads, often many in a row during a scan.
+        Each thread keeps one connection, opened read-only (mode=ro) with
+        memory-mapped I/O, so its page cache and prepared statements are reused
+        from one lookup to the next. The connection is in autocommit mode, so no
+        read transaction stays open between lookups. After the database is
+        rebuilt or close() is called, each thread opens a new one.
+
+        The connection belongs to the calling thread and must not be closed by it.
+        """
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is not None:
+            if pooled.generation == self._generation:
+                return pooled.conn
+            # Opened on a replaced database file
+            pooled.conn.close()
+
+        uri = Path(self.db_path).absolute().as_uri() + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, isolation_level=None, check_same_thread=False,
+                               cached_statements=self.CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA mmap_size = {self.MMAP_SIZE}')
+
+        with self._pool_lock:
+            pooled = _PooledConnection(conn, self._generation)
+            self._pool.add(pooled)
+        self._local.pooled = pooled
+        return conn
+
+    def _retire_read_connections(self) -> List[_PooledConnection]:
+        """Make every thread open a new read connection on its next lookup"""
+        with self._pool_lock:
+            self._generation += 1
+            pooled_connections = list(self._pool)
+            self._pool.clear()
+        return pooled_connections
+
     def close(self):
-        """Close the database connection."""
-        # Since we're now creating new connections for each operation,
-        # there's no persistent connection to close
+        """Close the read connections of all threads.
+
+        Call when no lookups are running, e.g. when the provider is no longer
+        needed; a later lookup opens a new connection.
+        """
+        for pooled in self._retire_read_connections():
+            pooled.conn.close()
         self.conn = None
 
     def database_exists(self) -> bool:
         """Check if the database file exists."""
         return os.path.exists(self.db_path)
 
-    def create_tables(self):
-        """Create the database tables if they don't exist."""
-        conn = self.get_connection()
+    def create_tables(self, conn: Optional[sqlite3.Connection] = None, indexes: bool = True):
+        """Create the database tables if they don't exist.
+
+        Args:
+            conn: Connection to create the tables in, defaults to a new connection to the database
+            indexes: Also create the indexes; a bulk build creates them after loading
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
@@ -84,7 +294,18 @@ class LaunchBoxDatabase:
                 CommunityRatingCount INTEGER,
                 Genres TEXT,
                 Developer TEXT,
-                Publisher TEXT
+                Publisher TEXT,
+                NormName TEXT,
+                PlatformKey TEXT
+            )
+            ''')
+
+            # Alternate names, normalized for indexed exact lookups
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS GameAlternateNames (
+                DatabaseID TEXT,
+                Name TEXT,
+                NormName TEXT
             )
             ''')
 
@@ -107,15 +328,336 @@ class LaunchBoxDatabase:
             )
             ''')
 
-            # Create indexes
-            cursor.execute('CREATE INDEX IF NOT EXISTS IX_ImageType ON GameImages(Type)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS IX_ImageRegion ON GameImages(Region)')
+            # Content hash of each game's rows, compared by refresh_database
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS GameHashes (
+                DatabaseID TEXT PRIMARY KEY,
+                Hash INTEGER
+            ) WITHOUT ROWID
+            ''')
+
+            # Facts about the database as a whole, such as its DataVersion
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS Meta (
+                Key TEXT PRIMARY KEY,
+                Value TEXT
+            ) WITHOUT ROWID
+            ''')
+
+            if indexes:
+                self.create_indexes(conn)
 
             conn.commit()
         finally:
             cursor.close()
+            if own_conn:
+                conn.close()
+
+    def create_indexes(self, conn: sqlite3.Connection):
+        """Create the indexes of the image table.
+
+        Args:
+            conn: Connection to the database to index
+        """
+        conn.execute('CREATE INDEX IF NOT EXISTS IX_ImageType ON GameImages(Type)')
+        conn.execute('CREATE INDEX IF NOT EXISTS IX_ImageRegion ON GameImages(Region)')
+        conn.execute('CREATE INDEX IF NOT EXISTS IX_ImageDatabaseID ON GameImages(DatabaseID)')
+        conn.execute('CREATE INDEX IF NOT EXISTS IX_GamePlatformName ON Games(PlatformKey, NormName)')
+        conn.execute('CREATE INDEX IF NOT EXISTS IX_GameName ON Games(NormName)')
+        conn.execute('CREATE INDEX IF NOT EXISTS IX_AlternateName ON GameAlternateNames(NormName)')
+
+    def build_title_trigrams(self, conn: sqlite3.Connection) -> bool:
+        """(Re)build the trigram index of game names used for fuzzy matching.
+
+        GameTitleTrigrams is an FTS5 table with the trigram tokenizer over the
+        match key of every name and alternate name, with the platform key as a
+        second indexed column to narrow searches to one platform.
+        GameTitleTrigramsVocab exposes how many names contain each trigram.
+
+        Args:
+            conn: Connection to the database, with Games and GameAlternateNames filled in
+
+        Returns:
+            True if the index was built, False if SQLite has no trigram tokenizer (before 3.34)
+        """
+        conn.create_function('title_match_key', 1, title_match_key, deterministic=True)
+        try:
+            conn.execute('DROP TABLE IF EXISTS GameTitleTrigramsVocab')
+            conn.execute('DROP TABLE IF EXISTS GameTitleTrigrams')
+            conn.execute('''
+            CREATE VIRTUAL TABLE GameTitleTrigrams USING fts5(
+                MatchKey,
+                PlatformKey,
+                DatabaseID UNINDEXED,
+                Name UNINDEXED,
+                tokenize='trigram'
+            )
+            ''')
+            conn.execute("CREATE VIRTUAL TABLE GameTitleTrigramsVocab USING fts5vocab(GameTitleTrigrams, 'row')")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Fuzzy title matching is not available with SQLite {sqlite3.sqlite_version}: {e}")
+            return False
+
+        conn.execute('''
+        INSERT INTO GameTitleTrigrams (MatchKey, PlatformKey, DatabaseID, Name)
+        SELECT title_match_key(Name), PlatformKey, DatabaseID, Name FROM Games WHERE Name IS NOT NULL
+        ''')
+        conn.execute('''
+        INSERT INTO GameTitleTrigrams (MatchKey, PlatformKey, DatabaseID, Name)
+        SELECT title_match_key(a.Name), g.PlatformKey, a.DatabaseID, a.Name
+        FROM GameAlternateNames a JOIN Games g ON g.DatabaseID = a.DatabaseID
+        WHERE a.Name IS NOT NULL
+        ''')
+        conn.execute("INSERT INTO GameTitleTrigrams(GameTitleTrigrams) VALUES('optimize')")
+        return True
+
+    def ensure_lookup_tables(self):
+        """Add the lookup columns and tables to a database built without them.
+
+        Databases built before NormName, PlatformKey, GameAlternateNames and
+        GameTitleTrigrams existed get them filled in and indexed on first use,
+        once, through a writable connection of their own.
+        """
+        if self._lookup_tables_checked or not self.database_exists():
+            return
+        with self._lookup_tables_lock:
+            if self._lookup_tables_checked:
+                return
+            conn = self.get_connection()
+            try:
+                self._add_lookup_tables(conn)
+            finally:
+                conn.close()
+            self._lookup_tables_checked = True
+
+    def _add_lookup_tables(self, conn: sqlite3.Connection):
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(Games)')}
+        if columns and 'NormName' not in columns:
+            logger.info("Adding normalized name columns to the LaunchBox database")
+            conn.create_function('normalize_name', 1, normalize_name, deterministic=True)
+            conn.create_function('platform_key', 1, platform_key, deterministic=True)
+            with conn:
+                conn.execute('ALTER TABLE Games ADD COLUMN NormName TEXT')
+                conn.execute('ALTER TABLE Games ADD COLUMN PlatformKey TEXT')
+                conn.execute('UPDATE Games SET NormName = normalize_name(Name), PlatformKey = platform_key(Platform)')
+                conn.execute('CREATE TABLE IF NOT EXISTS GameAlternateNames (DatabaseID TEXT, Name TEXT, NormName TEXT)')
+                # GameNames holds the base names too; those are matched in Games
+                conn.execute('''
+                INSERT INTO GameAlternateNames (DatabaseID, Name, NormName)
+                SELECT gn.c0, gn.c1, normalize_name(gn.c1)
+                FROM GameNames_content gn JOIN Games g ON g.DatabaseID = gn.c0
+                WHERE gn.c1 IS NOT g.Name
+                ORDER BY gn.id
+                ''')
+                self.create_indexes(conn)
+        if columns and not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'GameTitleTrigramsVocab'").fetchone():
+            logger.info("Adding the title trigram index to the LaunchBox database")
+            with conn:
+                self.build_title_trigrams(conn)
+        if columns and not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'Meta'").fetchone():
+            # The contents are as they were when the file was last written
+            with conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS Meta (Key TEXT PRIMARY KEY, Value TEXT) WITHOUT ROWID')
+                self.set_data_version(conn, str(os.stat(self.db_path).st_mtime_ns))
+
+    def get_data_version(self) -> Optional[str]:
+        """Get the version of the database contents, set by the last full import.
+
+        Refreshes replace games in place and leave the version as it is.
+
+        Returns:
+            The version, or None if the database has none
+        """
+        self.ensure_lookup_tables()
+        try:
+            row = self.get_read_connection().execute(
+                "SELECT Value FROM Meta WHERE Key = 'DataVersion'").fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading the LaunchBox database version: {e}")
+            return None
+        return row[0] if row else None
+
+    def set_data_version(self, conn: sqlite3.Connection, version: str):
+        """Store the version of the database contents.
+
+        Args:
+            conn: Connection to the database, in the caller's transaction
+            version: New version
+        """
+        conn.execute("INSERT OR REPLACE INTO Meta (Key, Value) VALUES ('DataVersion', ?)", (version,))
+
+    def store_content_hashes(self, conn: sqlite3.Connection, hashes: Dict[str, int]):
+        """Store the content hashes of games, replacing earlier ones.
+
+        Args:
+            conn: Connection to the database, in the caller's transaction
+            hashes: DatabaseID -> content hash, as computed by _add_row_hash
+        """
+        conn.executemany('INSERT OR REPLACE INTO GameHashes (DatabaseID, Hash) VALUES (?, ?)',
+                         [(database_id, _signed_hash(value)) for database_id, value in hashes.items()])
+
+    def load_content_hashes(self) -> Dict[str, int]:
+        """Get the content hash of every game in the database.
+
+        A database built before GameHashes existed gets the table, with the
+        hashes computed from its rows, on first use.
+
+        Returns:
+            DatabaseID -> content hash
+        """
+        conn = self.get_connection()
+        try:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'GameHashes'").fetchone():
+                logger.info("Adding content hashes to the LaunchBox database")
+                hashes: Dict[str, int] = {}
+                for row in conn.execute('''
+                SELECT DatabaseID, Name, ReleaseDate, ReleaseYear, Overview, MaxPlayers, ReleaseType,
+                       Cooperative, WikipediaURL, VideoURL, CommunityRating, Platform, ESRB,
+                       CommunityRatingCount, Genres, Developer, Publisher
+                FROM Games
+                '''):
+                    _add_row_hash(hashes, 'game', row)
+                for row in conn.execute('SELECT DatabaseID, Name FROM GameAlternateNames'):
+                    _add_row_hash(hashes, 'alternate_name', row)
+                for row in conn.execute('SELECT DatabaseID, FileName, Type, Region, CRC32 FROM GameImages'):
+                    _add_row_hash(hashes, 'image', row)
+                with conn:
+                    self.create_tables(conn)
+                    self.store_content_hashes(conn, hashes)
+                return hashes
+
+            return {row[0]: row[1] & _HASH_MASK for row in conn.execute('SELECT DatabaseID, Hash FROM GameHashes')}
+        finally:
             conn.close()
 
+    def replace_games(self, database_ids: Set[str], games: List[tuple], alternate_names: List[tuple],
+                      images: List[tuple], hashes: Dict[str, int]):
+        """Replace every row of some games in one transaction.
+
+        The old rows of the games are deleted from all tables, including the
+        full-text and trigram indexes, and the new rows inserted. Lookups
+        running meanwhile see either the old or the new rows of all games.
+
+        Args:
+            database_ids: Games to replace; those without new rows are removed
+            games: New Games rows, with NormName and PlatformKey
+            alternate_names: New GameAlternateNames rows, with NormName
+            images: New GameImages rows
+            hashes: New content hashes of the games that have rows
+        """
+        conn = self.get_connection()
+        conn.create_function('title_match_key', 1, title_match_key, deterministic=True)
+        try:
+            has_trigrams = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'GameTitleTrigrams'").fetchone() is not None
+            conn.execute('CREATE TEMP TABLE ReplacedGames (DatabaseID TEXT PRIMARY KEY)')
+            replaced = 'SELECT DatabaseID FROM temp.ReplacedGames'
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany('INSERT INTO temp.ReplacedGames (DatabaseID) VALUES (?)',
+                                 [(database_id,) for database_id in database_ids])
+
+                conn.execute(f'DELETE FROM Games WHERE DatabaseID IN ({replaced})')
+                conn.execute(f'DELETE FROM GameAlternateNames WHERE DatabaseID IN ({replaced})')
+                conn.execute(f'DELETE FROM GameImages WHERE DatabaseID IN ({replaced})')
+                conn.execute(f'DELETE FROM GameHashes WHERE DatabaseID IN ({replaced})')
+                # Full-text rows are found through their content tables, whose
+                # columns are named c0, c1, ... in declaration order
+                conn.execute(f'DELETE FROM GameNames WHERE rowid IN '
+                             f'(SELECT id FROM GameNames_content WHERE c0 IN ({replaced}))')
+                if has_trigrams:
+                    conn.execute(f'DELETE FROM GameTitleTrigrams WHERE rowid IN '
+                                 f'(SELECT id FROM GameTitleTrigrams_content WHERE c2 IN ({replaced}))')
+
+                conn.executemany('''
+                INSERT OR REPLACE INTO Games (
+                    DatabaseID, Name, ReleaseDate, ReleaseYear, Overview, MaxPlayers,
+                    ReleaseType, Cooperative, WikipediaURL, VideoURL, CommunityRating,
+                    Platform, ESRB, CommunityRatingCount, Genres, Developer, Publisher,
+                    NormName, PlatformKey
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', games)
+                conn.executemany('INSERT INTO GameNames (DatabaseID, Name) VALUES (?, ?)',
+                                 [row[:2] for row in games] + [row[:2] for row in alternate_names])
+                conn.executemany('INSERT INTO GameAlternateNames (DatabaseID, Name, NormName) VALUES (?, ?, ?)',
+                                 alternate_names)
+                conn.executemany('''
+                INSERT INTO GameImages (DatabaseID, FileName, Type, Region, CRC32) VALUES (?, ?, ?, ?, ?)
+                ''', images)
+                self.store_content_hashes(conn, hashes)
+
+                if has_trigrams:
+                    conn.execute(f'''
+                    INSERT INTO GameTitleTrigrams (MatchKey, PlatformKey, DatabaseID, Name)
+                    SELECT title_match_key(Name), PlatformKey, DatabaseID, Name FROM Games
+                    WHERE Name IS NOT NULL AND DatabaseID IN ({replaced})
+                    ''')
+                    conn.execute(f'''
+                    INSERT INTO GameTitleTrigrams (MatchKey, PlatformKey, DatabaseID, Name)
+                    SELECT title_match_key(a.Name), g.PlatformKey, a.DatabaseID, a.Name
+                    FROM GameAlternateNames a JOIN Games g ON g.DatabaseID = a.DatabaseID
+                    WHERE a.Name IS NOT NULL AND a.DatabaseID IN ({replaced})
+                    ''')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.close()
+
+    def get_build_connection(self, build_path: str) -> sqlite3.Connection:
+        """Open a new database file for a bulk build.
+
+        The file is only written by the build, so durability and concurrency
+        are traded for speed: no journal, no syncs, a large page cache and
+        big pages. A crash leaves a broken build file, never a broken database.
+
+        Args:
+            build_path: Path of the file to build; an existing file is replaced
+
+        Returns:
+            Connection to the empty build file
+        """
+        for path in (build_path, build_path + "-journal"):
+            if os.path.exists(path):
+                os.unlink(path)
+        conn = sqlite3.connect(build_path)
+        # The page size only applies to a database without tables
+        conn.execute('PRAGMA page_size = 16384')
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute('PRAGMA cache_size = -262144')  # 256 MB
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA locking_mode = EXCLUSIVE')
+        return conn
+
+    def install_build(self, conn: sqlite3.Connection, build_path: str):
+        """Finish a bulk build and move it into place.
+
+        Indexes are created and the full-text index optimized now that all rows
+        are in, then the file replaces the database in one rename. Connections
+        opened before the rename keep reading the old data; new ones get the
+        new database.
+
+        Args:
+            conn: Connection returned by get_build_connection, closed by this call
+            build_path: Path of the build file
+        """
+        try:
+            self.create_indexes(conn)
+            conn.execute("INSERT INTO GameNames(GameNames) VALUES('optimize')")
+            conn.execute('ANALYZE')
+            conn.commit()
+            # Leave the file in the journal mode the application uses
+            conn.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            conn.close()
+        os.replace(build_path, self.db_path)
+        # Lookups running now finish on the old file; each thread's next one uses the new
+        self._retire_read_connections()
+
     def _escape_fts5_query(self, query: str) -> str:
         """Escape special characters in FTS5 query syntax.
 
@@ -150,7 +692,7 @@ class LaunchBoxDatabase:
         Returns:
             List of matching games
         """
-        conn = self.get_connection()
+        conn = self.get_read_connection()
         cursor = conn.cursor()
 
         try:
@@ -192,18 +734,18 @@ class LaunchBoxDatabase:
 
             return results
         finally:
-            # Ensure connection is closed
             cursor.close()
-            conn.close()
 
     def search_games_by_title_and_platform(self, title: str, platform: str) -> List[Dict[str, Any]]:
         """Search for games by title match (case insensitive) and platform.
         Uses a series of increasingly lenient search methods:
         1. Exact title match in Games table
-        2. Exact title match in GameNames table (alternate names)
-        3. Title prefix match (for games that start with the search term)
-        4. Spaces-as-wildcards match (replaces spaces with % wildcards)
-        5. Wildcard-prefix match (prepends % and replaces spaces with % wildcards)
+        2. Exact title match in GameAlternateNames table
+        3. Fuzzy match against the trigram index (see search_similar_titles)
+
+        The exact steps filter on the precomputed NormName and PlatformKey
+        columns, so they are answered from the (PlatformKey, NormName) indexes
+        instead of scanning the table.
 
         Args:
             title: The game title to search for
@@ -212,164 +754,163 @@ class LaunchBoxDatabase:
         Returns:
             List of matching games
         """
-        conn = self.get_connection()
+        conn = self.get_read_connection()
         cursor = conn.cursor()
 
         try:
-            results = []
+            self.ensure_lookup_tables()
+
+            # An empty platform matches every platform
+            platform_filter = 'g.PlatformKey = ? AND' if platform else ''
+            platform_params = (platform_key(platform),) if platform else ()
+
+            def fetch(sql, params):
+                results = []
+                for row in cursor.execute(sql, platform_params + params).fetchall():
+                    result = dict(row)
+                    # Convert ReleaseDate to datetime if it exists
+                    if result['ReleaseDate']:
+                        try:
+                            result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
+                        except ValueError:
+                            pass
+                    results.append(result)
+                return results
 
             # 1. First try exact match on the main Games table
-            cursor.execute('''
+            results = fetch(f'''
             SELECT
                 g.*
             FROM
                 Games g
             WHERE
-                RTRIM(LOWER(g.Name)) = RTRIM(LOWER(?)) AND
-                (LOWER(g.Platform) = LOWER(?) OR ? = '')
+                {platform_filter} g.NormName = ?
+            ORDER BY g.rowid
             LIMIT 10
-            ''', (title, platform, platform))
-
-            for row in cursor.fetchall():
-                result = dict(row)
-                # Convert ReleaseDate to datetime if it exists
-                if result['ReleaseDate']:
-                    try:
-                        result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
-                    except ValueError:
-                        pass
-                results.append(result)
+            ''', (normalize_name(title),))
 
             # 2. If we didn't find any results with exact title match,
-            # try searching for the title in the GameNames FTS table
+            # try the alternate names
             if not results:
                 logger.debug(f"No exact match found for '{title}', trying alternate names")
-
-                # For the FTS table, we need to escape any special characters
-                # but since we're doing a direct comparison instead of MATCH,
-                # we don't need the FTS5 escaping here
-                cursor.execute('''
+                results = fetch(f'''
                 SELECT
                     g.*
                 FROM
-                    GameNames_content gn
+                    GameAlternateNames a
                 JOIN
-                    Games g ON g.DatabaseID = gn.c0
+                    Games g ON g.DatabaseID = a.DatabaseID
                 WHERE
-                    RTRIM(LOWER(gn.c1)) = RTRIM(LOWER(?)) AND
-                    (LOWER(g.Platform) = LOWER(?) OR ? = '')
+                    {platform_filter} a.NormName = ?
+                ORDER BY a.rowid
                 LIMIT 10
-                ''', (title, platform, platform))
-
-                for row in cursor.fetchall():
-                    result = dict(row)
-                    # Convert ReleaseDate to datetime if it exists
-                    if result['ReleaseDate']:
-                        try:
-                            result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
-                        except ValueError:
-                            pass
-                    results.append(result)
+                ''', (normalize_name(title),))
 
                 if results:
                     logger.debug(f"Found {len(results)} matches via alternate names")
 
-            # 3. If still no results, try a prefix match (title LIKE 'search%')
+            # 3. If still no results, rank similar names by trigram similarity
             if not results:
-                logger.debug(f"No exact matches found for '{title}', trying prefix match")
-                # Add wildcard to the end of the title
-                title_prefix = title.strip() + '%'
-                cursor.execute('''
-                SELECT
-                    g.*
-                FROM
-                    Games g
-                WHERE
-                    LOWER(g.Name) LIKE LOWER(?) AND
-                    (LOWER(g.Platform) = LOWER(?) OR ? = '')
-                ORDER BY LENGTH(g.Name) ASC
-                LIMIT 10
-                ''', (title_prefix, platform, platform))
-
-                for row in cursor.fetchall():
-                    result = dict(row)
-                    # Convert ReleaseDate to datetime if it exists
-                    if result['ReleaseDate']:
-                        try:
-                            result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
-                        except ValueError:
-                            pass
-                    results.append(result)
+                logger.debug(f"No exact matches found for '{title}', trying fuzzy match")
+                results = self._search_similar(cursor, title, platform, 10)
 
                 if results:
-                    logger.debug(f"Found {len(results)} matches via prefix search")
+                    logger.debug(f"Found {len(results)} fuzzy matches, best '{results[0]['Name']}' "
+                                 f"with score {results[0]['Score']:.2f}")
 
-            # 4. If still no results, try replacing spaces with wildcards (t%i%t%l%e%)
-            if not results:
-                logger.debug(f"No matches found for '{title}', trying spaces-as-wildcards match")
-                # Replace spaces with % and keep the % at the end
-                if ' ' in title:
-                    wildcarded_title = title.strip().replace(' ', '%') + '%'
-                    cursor.execute('''
-                    SELECT
-                        g.*
-                    FROM
-                        Games g
-                    WHERE
-                        LOWER(g.Name) LIKE LOWER(?) AND
-                        (LOWER(g.Platform) = LOWER(?) OR ? = '')
-                    ORDER BY LENGTH(g.Name) ASC
-                    LIMIT 5
-                    ''', (wildcarded_title, platform, platform))
-
-                    for row in cursor.fetchall():
-                        result = dict(row)
-                        # Convert ReleaseDate to datetime if it exists
-                        if result['ReleaseDate']:
-                            try:
-                                result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
-                            except ValueError:
-                                pass
-                        results.append(result)
-
-                    if results:
-                        logger.debug(f"Found {len(results)} matches via spaces-as-wildcards search")
-
-            # 5. If still no results, try prepending a wildcard (%title with spaces as %)
-            if not results:
-                logger.debug(f"No matches found for '{title}', trying wildcard-prefix match")
-                # Prepend % and replace spaces with % and keep the % at the end
-                wildcarded_title = '%' + title.strip().replace(' ', '%') + '%'
-                cursor.execute('''
-                SELECT
-                    g.*
-                FROM
-                    Games g
-                WHERE
-                    LOWER(g.Name) LIKE LOWER(?) AND
-                    (LOWER(g.Platform) = LOWER(?) OR ? = '')
-                ORDER BY LENGTH(g.Name) ASC
-                LIMIT 5
-                ''', (wildcarded_title, platform, platform))
+            return results
+        finally:
+            cursor.close()
 
-                for row in cursor.fetchall():
-                    result = dict(row)
-                    # Convert ReleaseDate to datetime if it exists
-                    if result['ReleaseDate']:
-                        try:
-                            result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
-                        except ValueError:
-                            pass
-                    results.append(result)
+    def search_similar_titles(self, pairs: List[Tuple[str, str]],
+                              limit: int = 10) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Find the games whose names are most similar to each of several titles.
 
-                if results:
-                    logger.debug(f"Found {len(results)} matches via wildcard-prefix search")
+        Args:
+            pairs: (title, platform name) pairs; an empty platform matches any platform
+            limit: Maximum number of games per title
 
-            return results
+        Returns:
+            Dictionary of each pair to its games, best first, with 'Score' (similarity
+            from 0.0 to 1.0, see title_similarity) and 'MatchedName' (the name that matched)
+        """
+        conn = self.get_read_connection()
+        cursor = conn.cursor()
+
+        try:
+            self.ensure_lookup_tables()
+            return {(title, platform): self._search_similar(cursor, title, platform, limit)
+                    for title, platform in dict.fromkeys(pairs)}
         finally:
-            # Ensure connection is closed
             cursor.close()
-            conn.close()
+
+    def _search_similar(self, cursor: sqlite3.Cursor, title: str, platform: str, limit: int) -> List[Dict[str, Any]]:
+        """Rank the names sharing trigrams with a title by similarity.
+
+        One FTS5 query ORs the title's SIMILAR_TRIGRAMS rarest trigrams and
+        returns the best SIMILAR_CANDIDATES names by bm25, which are then scored
+        with title_similarity; each game is kept once, with its best name.
+        """
+        key = title_match_key(title)
+        trigrams = list({key[i:i + 3] for i in range(len(key) - 2)})
+        if not trigrams:
+            return []
+
+        try:
+            # Trigrams no name contains (typos) can't find anything and are left out
+            counts = dict(cursor.execute(
+                f"SELECT term, doc FROM GameTitleTrigramsVocab WHERE term IN ({','.join('?' * len(trigrams))})",
+                trigrams).fetchall())
+        except sqlite3.OperationalError as e:
+            # No trigram index: SQLite without the trigram tokenizer
+            logger.debug(f"Fuzzy search unavailable: {e}")
+            return []
+        trigrams = sorted((t for t in trigrams if counts.get(t)), key=lambda t: (counts[t], t))[:self.SIMILAR_TRIGRAMS]
+        if not trigrams:
+            return []
+
+        query = 'MatchKey : (' + ' OR '.join('"' + t.replace('"', '""') + '"' for t in trigrams) + ')'
+        params = ()
+        platform_filter = ''
+        if platform:
+            # The phrase narrows the search to names of the platform (and of any
+            # platform containing its name); the join keeps only the exact one
+            key_of_platform = platform_key(platform)
+            if len(key_of_platform) >= 3:
+                query = 'PlatformKey : "' + key_of_platform.replace('"', '""') + '" AND ' + query
+            platform_filter = 'AND g.PlatformKey = ?'
+            params = (key_of_platform,)
+
+        rows = cursor.execute(f'''
+        SELECT
+            g.*, t.Name AS MatchedName, t.MatchKey AS MatchKey
+        FROM
+            GameTitleTrigrams t
+        JOIN
+            Games g ON g.DatabaseID = t.DatabaseID
+        WHERE
+            GameTitleTrigrams MATCH ? {platform_filter}
+        ORDER BY t.rank
+        LIMIT ?
+        ''', (query,) + params + (self.SIMILAR_CANDIDATES,)).fetchall()
+
+        best = {}
+        for row in rows:
+            result = dict(row)
+            result['Score'] = title_similarity(key, result.pop('MatchKey'))
+            previous = best.get(result['DatabaseID'])
+            if previous is None or result['Score'] > previous['Score']:
+                best[result['DatabaseID']] = result
+
+        results = sorted(best.values(), key=lambda result: result['Score'], reverse=True)[:limit]
+        for result in results:
+            # Convert ReleaseDate to datetime if it exists
+            if result['ReleaseDate']:
+                try:
+                    result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
+                except ValueError:
+                    pass
+        return results
 
     def get_game_by_id(self, database_id: str) -> Optional[Dict[str, Any]]:
         """Get a game by its database ID.
@@ -380,7 +921,7 @@ class LaunchBoxDatabase:
         Returns:
             Game data or None if not found
         """
-        conn = self.get_connection()
+        conn = self.get_read_connection()
         cursor = conn.cursor()
 
         try:
@@ -413,13 +954,139 @@ class LaunchBoxDatabase:
 
             return result
         finally:
-            # Ensure connection is closed
             cursor.close()
-            conn.close()
+
+    def load_platform_names(self, platforms: List[str]) -> Dict[str, Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]]:
+        """Load the game names of several platforms in one pass over the database.
+
+        The wanted platforms go into a temp table that the Games table is joined
+        against, so each table is scanned once however many platforms are asked for.
+        An empty platform name stands for all platforms.
+
+        Args:
+            platforms: Platform names (case insensitive)
+
+        Returns:
+            Dictionary of lowercased platform name to a tuple of
+            (list of (DatabaseID, Name) from the Games table in table order,
+             list of (DatabaseID, Name) from GameNames, which includes alternate names)
+        """
+        platform_keys = sorted({platform.lower() for platform in platforms})
+        names = {key: ([], []) for key in platform_keys}
+        if not platform_keys:
+            return names
+
+        conn = self.get_read_connection()
+        cursor = conn.cursor()
+
+        try:
+            self.ensure_lookup_tables()
+
+            if '' in names:
+                cursor.execute('SELECT DatabaseID, Name FROM Games ORDER BY rowid')
+                names[''][0].extend((row[0], row[1]) for row in cursor.fetchall() if row[1])
+                cursor.execute('SELECT c0, c1 FROM GameNames_content ORDER BY id')
+                names[''][1].extend((row[0], row[1]) for row in cursor.fetchall() if row[1])
+
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS wanted_platforms (platform_key TEXT PRIMARY KEY)')
+            cursor.execute('DELETE FROM wanted_platforms')
+            cursor.executemany('INSERT INTO wanted_platforms (platform_key) VALUES (?)',
+                               [(key,) for key in platform_keys if key])
+
+            # Each wanted platform is a range of the (PlatformKey, NormName) index
+            cursor.execute('''
+            SELECT
+                w.platform_key, g.DatabaseID, g.Name
+            FROM
+                wanted_platforms w
+            CROSS JOIN
+                Games g
+            WHERE
+                g.PlatformKey = w.platform_key
+            ORDER BY g.rowid
+            ''')
+            for row in cursor.fetchall():
+                if row[2]:
+                    names[row[0]][0].append((row[1], row[2]))
+
+            cursor.execute('''
+            SELECT
+                w.platform_key, gn.c0, gn.c1
+            FROM
+                GameNames_content gn
+            CROSS JOIN
+                Games g
+            CROSS JOIN
+                wanted_platforms w
+            WHERE
+                g.DatabaseID = gn.c0 AND
+                w.platform_key = g.PlatformKey
+            ORDER BY gn.id
+            ''')
+            for row in cursor.fetchall():
+                if row[2]:
+                    names[row[0]][1].append((row[1], row[2]))
+
+            return names
+        finally:
+            cursor.close()
+
+    def get_games_by_ids(self, database_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several games and their images by database ID.
+
+        Like get_game_by_id, but for a whole batch using two joins against a
+        temp table of the wanted IDs.
+
+        Args:
+            database_ids: The games' DatabaseIDs
+
+        Returns:
+            Dictionary of DatabaseID to game data, for the games that were found
+        """
+        wanted = sorted(set(database_ids))
+        if not wanted:
+            return {}
+
+        conn = self.get_read_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS wanted_games (DatabaseID TEXT PRIMARY KEY)')
+            cursor.execute('DELETE FROM wanted_games')
+            cursor.executemany('INSERT INTO wanted_games (DatabaseID) VALUES (?)', [(i,) for i in wanted])
+
+            results = {}
+            cursor.execute('SELECT g.* FROM wanted_games w JOIN Games g ON g.DatabaseID = w.DatabaseID')
+            for row in cursor.fetchall():
+                result = dict(row)
+                result['Images'] = []
+
+                # Convert ReleaseDate to datetime if it exists
+                if result['ReleaseDate']:
+                    try:
+                        result['ReleaseDate'] = datetime.datetime.fromisoformat(result['ReleaseDate'])
+                    except ValueError:
+                        pass
+
+                # Convert Cooperative from integer to boolean
+                if 'Cooperative' in result:
+                    result['Cooperative'] = bool(result['Cooperative'])
+
+                results[result['DatabaseID']] = result
+
+            cursor.execute('SELECT i.* FROM wanted_games w JOIN GameImages i ON i.DatabaseID = w.DatabaseID')
+            for img_row in cursor.fetchall():
+                image = dict(img_row)
+                if image['DatabaseID'] in results:
+                    results[image['DatabaseID']]['Images'].append(image)
+
+            return results
+        finally:
+            cursor.close()
 
     def get_image_types(self) -> List[str]:
         """Get all image types available in the database."""
-        conn = self.get_connection()
+        conn = self.get_read_connection()
         cursor = conn.cursor()
 
         try:
@@ -427,11 +1094,10 @@ class LaunchBoxDatabase:
             return [row[0] for row in cursor.fetchall()]
         finally:
             cursor.close()
-            conn.close()
 
     def get_regions(self) -> List[str]:
         """Get all regions available in the database."""
-        conn = self.get_connection()
+        conn = self.get_read_connection()
         cursor = conn.cursor()
 
         try:
@@ -439,7 +1105,59 @@ class LaunchBoxDatabase:
             return [row[0] for row in cursor.fetchall()]
         finally:
             cursor.close()
-            conn.close()
+
+
+class PlatformNameIndex:
+    """In-memory name lookups for the games of one platform.
+
+    Reproduces the exact steps of LaunchBoxDatabase.search_games_by_title_and_platform
+    with dictionary lookups instead of SQL queries, so many titles can be
+    matched after reading the platform's names once. Titles without an exact
+    match go to LaunchBoxDatabase.search_similar_titles.
+    """
+
+    def __init__(self, main_names: List[Tuple[str, str]], alternate_names: List[Tuple[str, str]]):
+        """Build the lookups.
+
+        Args:
+            main_names: (DatabaseID, Name) of the platform's games, in table order
+            alternate_names: (DatabaseID, Name) of all names of the platform's games
+        """
+        self.main_names = main_names
+        self.names_by_id = {}
+        self.exact = {}
+        for database_id, name in main_names:
+            self.names_by_id.setdefault(database_id, name)
+            self.exact.setdefault(normalize_name(name), []).append(database_id)
+
+        self.alternate = {}
+        for database_id, name in alternate_names:
+            self.alternate.setdefault(normalize_name(name), []).append(database_id)
+
+    def _results(self, database_ids: List[str], limit: int) -> List[Dict[str, Any]]:
+        return [{'DatabaseID': i, 'Name': self.names_by_id[i]} for i in database_ids[:limit]]
+
+    def search(self, title: str) -> List[Dict[str, Any]]:
+        """Search a title by exact name, then by exact alternate name.
+
+        Args:
+            title: The game title to search for
+
+        Returns:
+            Matching games as dicts with 'DatabaseID' and 'Name', best first
+        """
+        key = normalize_name(title)
+
+        # 1. Exact title match
+        if key in self.exact:
+            return self._results(self.exact[key], 10)
+
+        # 2. Exact match on any name, including alternate names
+        if key in self.alternate:
+            ids = [i for i in self.alternate[key] if i in self.names_by_id]
+            if ids:
+                return self._results(ids, 10)
+        return []
 
 
 class XmlData:
@@ -452,7 +1170,19 @@ class XmlData:
 
 
 class LaunchBoxXmlParser:
-    """Parser for the LaunchBox Metadata.xml file."""
+    """Parser for the LaunchBox Metadata.xml file.
+
+    The file is read with iterparse: each top-level element is turned into a
+    record and dropped from the tree as soon as it ends, so memory use stays
+    the same however large the file is.
+    """
+
+    # Top-level element -> record type yielded by iter_records
+    RECORD_TYPES = {
+        'Game': 'game',
+        'GameAlternateName': 'alternate_name',
+        'GameImage': 'image',
+    }
 
     def __init__(self, xml_path: str):
         """Initialize the parser with the path to the XML file.
@@ -461,42 +1191,69 @@ class LaunchBoxXmlParser:
             xml_path: Path to the Metadata.xml file
         """
         self.xml_path = xml_path
-        self.tree = None
-        self.root = None
 
-    def parse(self):
-        """Parse the XML file."""
-        self.tree = ET.parse(self.xml_path)
-        self.root = self.tree.getroot()
+    def iter_records(self) -> Iterator[Tuple[str, dict]]:
+        """Stream the records of the XML file.
+
+        Yields:
+            Tuples of (record type, data): ('game', game), ('alternate_name', name)
+            or ('image', image), in file order. Records without the fields the
+            database needs are skipped.
+
+        Raises:
+            ET.ParseError: If the file isn't well-formed XML
+        """
+        depth = 0
+        root = None
+        for event, elem in ET.iterparse(self.xml_path, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth != 1:
+                continue
+
+            record_type = self.RECORD_TYPES.get(elem.tag)
+            record = None
+            if record_type == 'game':
+                record = self._parse_game(elem)
+                if record and not record.get('DatabaseID'):
+                    record = None
+            elif record_type == 'alternate_name':
+                record = self._parse_game_alternate_name(elem)
+                if record and not (record.get('DatabaseID') and record.get('Name')):
+                    record = None
+            elif record_type == 'image':
+                record = self._parse_game_image(elem)
+                if record and not (record.get('DatabaseID') and record.get('FileName') and record.get('Type')):
+                    record = None
+
+            # Drop the finished element (and any other parsed children) from the root
+            root.clear()
+
+            if record:
+                yield record_type, record
 
     def get_data(self) -> XmlData:
         """Parse and return all data from the XML file.
 
+        Holds every record in memory; LaunchBoxMetadata.initialize_database
+        streams iter_records instead.
+
         Returns:
             XmlData object containing games, alternate names, and images
         """
-        if self.root is None:
-            self.parse()
-
         data = XmlData()
-
-        # Parse all games
-        for game_elem in self.root.findall('./Game'):
-            game = self._parse_game(game_elem)
-            if game and game.get('DatabaseID'):
-                data.games.append(game)
-
-        # Parse all game alternate names
-        for alt_name_elem in self.root.findall('./GameAlternateName'):
-            alt_name = self._parse_game_alternate_name(alt_name_elem)
-            if alt_name and alt_name.get('DatabaseID') and alt_name.get('Name'):
-                data.game_alternate_names.append(alt_name)
-
-        # Parse all game images
-        for img_elem in self.root.findall('./GameImage'):
-            img = self._parse_game_image(img_elem)
-            if img and img.get('DatabaseID') and img.get('FileName') and img.get('Type'):
-                data.game_images.append(img)
+        lists = {
+            'game': data.games,
+            'alternate_name': data.game_alternate_names,
+            'image': data.game_images,
+        }
+        for record_type, record in self.iter_records():
+            lists[record_type].append(record)
 
         logger.info(f"Parsed {len(data.games)} games, {len(data.game_alternate_names)} alternate names, {len(data.game_images)} images")
         return data
@@ -514,15 +1271,15 @@ class LaunchBoxXmlParser:
             game = {}
 
             # Extract basic game info
-            game['DatabaseID'] = self._get_element_text(game_elem, './DatabaseID')
-            game['Name'] = self._get_element_text(game_elem, './Name')
+            game['DatabaseID'] = self._get_element_text(game_elem, 'DatabaseID')
+            game['Name'] = self._get_element_text(game_elem, 'Name')
 
             # Skip if no database ID
             if not game['DatabaseID']:
                 return None
 
             # Release date and year
-            release_date = self._get_element_text(game_elem, './ReleaseDate')
+            release_date = self._get_element_text(game_elem, 'ReleaseDate')
             if release_date:
                 try:
                     # Parse ISO 8601 format with timezone (e.g., 2009-04-07T00:00:00-07:00)
@@ -537,27 +1294,27 @@ class LaunchBoxXmlParser:
                         game['ReleaseYear'] = parsed_date.year
                     except ValueError:
                         game['ReleaseDate'] = None
-                        game['ReleaseYear'] = self._safe_int(self._get_element_text(game_elem, './ReleaseYear'))
+                        game['ReleaseYear'] = self._safe_int(self._get_element_text(game_elem, 'ReleaseYear'))
             else:
                 game['ReleaseDate'] = None
-                game['ReleaseYear'] = self._safe_int(self._get_element_text(game_elem, './ReleaseYear'))
+                game['ReleaseYear'] = self._safe_int(self._get_element_text(game_elem, 'ReleaseYear'))
 
             # Other game details
-            game['Overview'] = self._get_element_text(game_elem, './Overview')
-            game['MaxPlayers'] = self._safe_int(self._get_element_text(game_elem, './MaxPlayers'))
-            game['ReleaseType'] = self._get_element_text(game_elem, './ReleaseType')
-            game['Cooperative'] = self._get_element_text(game_elem, './Cooperative') == 'true'
-            game['WikipediaURL'] = self._get_element_text(game_elem, './WikipediaURL')
-            game['VideoURL'] = self._get_element_text(game_elem, './VideoURL')
-            game['CommunityRating'] = self._safe_float(self._get_element_text(game_elem, './CommunityRating'))
-            game['Platform'] = self._get_element_text(game_elem, './Platform')
-            game['ESRB'] = self._get_element_text(game_elem, './ESRB')
-            game['CommunityRatingCount'] = self._safe_int(self._get_element_text(game_elem, './CommunityRatingCount'))
+            game['Overview'] = self._get_element_text(game_elem, 'Overview')
+            game['MaxPlayers'] = self._safe_int(self._get_element_text(game_elem, 'MaxPlayers'))
+            game['ReleaseType'] = self._get_element_text(game_elem, 'ReleaseType')
+            game['Cooperative'] = self._get_element_text(game_elem, 'Cooperative') == 'true'
+            game['WikipediaURL'] = self._get_element_text(game_elem, 'WikipediaURL')
+            game['VideoURL'] = self._get_element_text(game_elem, 'VideoURL')
+            game['CommunityRating'] = self._safe_float(self._get_element_text(game_elem, 'CommunityRating'))
+            game['Platform'] = self._get_element_text(game_elem, 'Platform')
+            game['ESRB'] = self._get_element_text(game_elem, 'ESRB')
+            game['CommunityRatingCount'] = self._safe_int(self._get_element_text(game_elem, 'CommunityRatingCount'))
 
             # Extract genres, developers, publishers
-            game['Genres'] = self._get_element_text(game_elem, './Genres')
-            game['Developer'] = self._get_element_text(game_elem, './Developer')
-            game['Publisher'] = self._get_element_text(game_elem, './Publisher')
+            game['Genres'] = self._get_element_text(game_elem, 'Genres')
+            game['Developer'] = self._get_element_text(game_elem, 'Developer')
+            game['Publisher'] = self._get_element_text(game_elem, 'Publisher')
 
             return game
 
@@ -576,8 +1333,8 @@ class LaunchBoxXmlParser:
         """
         try:
             alt_name = {}
-            alt_name['DatabaseID'] = self._get_element_text(alt_name_elem, './DatabaseID')
-            alt_name['Name'] = self._get_element_text(alt_name_elem, './AlternateName')
+            alt_name['DatabaseID'] = self._get_element_text(alt_name_elem, 'DatabaseID')
+            alt_name['Name'] = self._get_element_text(alt_name_elem, 'AlternateName')
             return alt_name
         except Exception as e:
             logger.error(f"Error parsing alternate name: {e}")
@@ -594,19 +1351,23 @@ class LaunchBoxXmlParser:
         """
         try:
             img = {}
-            img['DatabaseID'] = self._get_element_text(img_elem, './DatabaseID')
-            img['FileName'] = self._get_element_text(img_elem, './FileName')
-            img['Type'] = self._get_element_text(img_elem, './Type')
-            img['Region'] = self._get_element_text(img_elem, './Region')
-            img['CRC32'] = self._safe_int(self._get_element_text(img_elem, './CRC32'))
+            img['DatabaseID'] = self._get_element_text(img_elem, 'DatabaseID')
+            img['FileName'] = self._get_element_text(img_elem, 'FileName')
+            img['Type'] = self._get_element_text(img_elem, 'Type')
+            img['Region'] = self._get_element_text(img_elem, 'Region')
+            img['CRC32'] = self._safe_int(self._get_element_text(img_elem, 'CRC32'))
             return img
         except Exception as e:
             logger.error(f"Error parsing image: {e}")
             return None
 
-    def _get_element_text(self, parent, xpath):
-        """Safely get element text or return None if element doesn't exist."""
-        elem = parent.find(xpath)
+    def _get_element_text(self, parent, tag):
+        """Safely get element text or return None if element doesn't exist.
+
+        Takes a plain child tag rather than a path, which ElementTree looks up
+        directly instead of compiling an XPath for every field of every record.
+        """
+        elem = parent.find(tag)
         if elem is not None and elem.text:
             return elem.text
         return None
@@ -690,8 +1451,8 @@ class MetadataDownloader:
                                 mb_downloaded = downloaded / (1024 * 1024)
                                 progress_callback(f"Downloading metadata: {mb_downloaded:.1f} MB downloaded")
 
-                        # Still log to stdout for console users
-                        if total_size > 0:
+                        # Console users without a callback see progress on stdout
+                        if total_size > 0 and not progress_callback:
                             percent = int(100 * downloaded / total_size)
                             sys.stdout.write(f"\rDownloading: {percent}% ({downloaded} / {total_size} bytes)")
                             sys.stdout.flush()
@@ -775,9 +1536,26 @@ class MetadataDownloader:
         return cleaned_xml_path
 
 
+class MetadataRefresh(NamedTuple):
+    """What refresh_database changed."""
+    added: Set[str]  # DatabaseIDs of new games
+    changed: Set[str]  # DatabaseIDs of games with changed rows
+    removed: Set[str]  # DatabaseIDs of games no longer in the dump
+    affected_pairs: Set[Tuple[str, str]]  # Match cache keys whose match may have changed (see MatchCache.find_pairs)
+
+
 class LaunchBoxMetadata(MetadataProvider):
     """Main class for interacting with LaunchBox metadata."""
 
+    # Rows written per executemany call while importing Metadata.xml
+    IMPORT_BATCH_SIZE = 5000
+
+    # Lowest title_similarity at which a fuzzy match is used without asking
+    FUZZY_MATCH_THRESHOLD = 0.75
+
+    # Part of the match cache version; bump when the matching steps change
+    MATCHER_VERSION = 1
+
     def __init__(self, data_directory: str = "data"):
         """Initialize the metadata manager.
 
@@ -793,6 +1571,27 @@ class LaunchBoxMetadata(MetadataProvider):
         self.database = LaunchBoxDatabase(launchbox_dir)
         self.downloader = MetadataDownloader(launchbox_dir)
 
+        # Name lookups of platforms used by match_titles, kept between batches
+        self._name_indexes: Dict[str, PlatformNameIndex] = {}
+        # Results of match_titles, kept across scans and sessions
+        self.match_cache = MatchCache("LaunchBox", data_directory)
+
+    def get_match_cache_version(self) -> Optional[str]:
+        """Get the version of the database and matcher that matches come from.
+
+        The data version changes with each full import only; refresh_database
+        forgets the matches of the games it changes instead.
+
+        Returns:
+            The version, or None if there is no database
+        """
+        if not self.database.database_exists():
+            return None
+        data_version = self.database.get_data_version()
+        if data_version is None:
+            return None
+        return f"{self.MATCHER_VERSION}:{self.FUZZY_MATCH_THRESHOLD}:{data_version}"
+
     def initialize_database(self, force: bool = False, progress_callback=None) -> bool:
         """Initialize or update the LaunchBox metadata database.
 
@@ -811,39 +1610,23 @@ class LaunchBoxMetadata(MetadataProvider):
             progress_callback("Initializing LaunchBox database...")
         logger.info("Initializing LaunchBox metadata database")
 
-        # Download metadata zip
-        if progress_callback:
-            progress_callback("Starting download...")
-        zip_path = self.downloader.download_metadata(force=force, progress_callback=progress_callback)
-        if not zip_path:
-            return False
-
-        # Extract metadata XML
-        if progress_callback:
-            progress_callback("Extracting metadata files...")
-        xml_path = self.downloader.extract_metadata_xml(zip_path)
-        if not xml_path:
+        downloaded = self._download_metadata_xml(force, progress_callback)
+        if not downloaded:
             return False
+        zip_path, xml_path = downloaded
 
-        # Create database tables
+        # Build a new database next to the current one, which keeps serving
+        # searches until the build is swapped in; indexes are created at the end
         if progress_callback:
             progress_callback("Creating database tables...")
-        self.database.create_tables()
-
-        # Parse XML data
-        if progress_callback:
-            progress_callback("Parsing game metadata...")
-        parser = LaunchBoxXmlParser(xml_path)
-        try:
-            data = parser.get_data()
-        except ET.ParseError as e:
-            logger.error(f"Error parsing XML: {e}")
-            return False
+        build_path = self.database.db_path + ".build"
+        conn = self.database.get_build_connection(build_path)
+        self.database.create_tables(conn, indexes=False)
 
-        # Insert data into database
+        # Stream the XML straight into the database
         if progress_callback:
             progress_callback("Building game database...")
-        conn = self.database.get_connection()
+        parser = LaunchBoxXmlParser(xml_path)
         cursor = conn.cursor()
 
         try:
@@ -852,72 +1635,78 @@ class LaunchBoxMetadata(MetadataProvider):
             # Start a transaction for better performance
             conn.execute('BEGIN TRANSACTION')
 
-            # Insert games
-            game_count = 0
-            for game in data.games:
-                # Insert into Games table
-                cursor.execute('''
-                INSERT OR REPLACE INTO Games (
-                    DatabaseID, Name, ReleaseDate, ReleaseYear, Overview, MaxPlayers,
-                    ReleaseType, Cooperative, WikipediaURL, VideoURL, CommunityRating,
-                    Platform, ESRB, CommunityRatingCount, Genres, Developer, Publisher
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    game['DatabaseID'], game['Name'], game['ReleaseDate'], game['ReleaseYear'],
-                    game['Overview'], game['MaxPlayers'], game['ReleaseType'],
-                    1 if game['Cooperative'] else 0, game['WikipediaURL'], game['VideoURL'],
-                    game['CommunityRating'], game['Platform'], game['ESRB'],
-                    game['CommunityRatingCount'], game['Genres'], game['Developer'], game['Publisher']
-                ))
-
-                game_count += 1
-                if game_count % 1000 == 0:
-                    sys.stdout.write(f"\rProcessed {game_count} games")
+            games = []
+            names = []
+            alternate_names = []
+            images = []
+            hashes: Dict[str, int] = {}
+            counts = {'game': 0, 'alternate_name': 0, 'image': 0}
+
+            def flush():
+                if games:
+                    cursor.executemany('''
+                    INSERT OR REPLACE INTO Games (
+                        DatabaseID, Name, ReleaseDate, ReleaseYear, Overview, MaxPlayers,
+                        ReleaseType, Cooperative, WikipediaURL, VideoURL, CommunityRating,
+                        Platform, ESRB, CommunityRatingCount, Genres, Developer, Publisher,
+                        NormName, PlatformKey
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', games)
+                if names:
+                    # Base names and alternate names both go into the FTS index
+                    cursor.executemany('''
+                    INSERT OR REPLACE INTO GameNames (DatabaseID, Name) VALUES (?, ?)
+                    ''', names)
+                if alternate_names:
+                    cursor.executemany('''
+                    INSERT INTO GameAlternateNames (DatabaseID, Name, NormName) VALUES (?, ?, ?)
+                    ''', alternate_names)
+                if images:
+                    cursor.executemany('''
+                    INSERT OR REPLACE INTO GameImages (DatabaseID, FileName, Type, Region, CRC32)
+                    VALUES (?, ?, ?, ?, ?)
+                    ''', images)
+                games.clear()
+                names.clear()
+                alternate_names.clear()
+                images.clear()
+                # Console users without a callback see progress on stdout
+                if not progress_callback:
+                    sys.stdout.write(f"\rProcessed {counts['game']} games, {counts['alternate_name']} alternate names, "
+                                     f"{counts['image']} images")
                     sys.stdout.flush()
 
-            logger.info("Progress complete")  # Progress reporting complete
-
-            # Insert game names (including base names and alternate names)
-            logger.info("Adding game names to FTS index...")
-
-            # Add base game names
-            for game in data.games:
-                cursor.execute('''
-                INSERT OR REPLACE INTO GameNames (DatabaseID, Name) VALUES (?, ?)
-                ''', (game['DatabaseID'], game['Name']))
-
-            # Add alternate game names
-            for alt_name in data.game_alternate_names:
-                cursor.execute('''
-                INSERT OR REPLACE INTO GameNames (DatabaseID, Name) VALUES (?, ?)
-                ''', (alt_name['DatabaseID'], alt_name['Name']))
-
-            # Insert game images
-            image_count = 0
-            logger.info("Adding game images...")
-
-            for image in data.game_images:
-                if not image.get('FileName') or not image.get('Type'):
-                    continue  # Skip invalid images
-
-                cursor.execute('''
-                INSERT OR REPLACE INTO GameImages (DatabaseID, FileName, Type, Region, CRC32)
-                VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    image['DatabaseID'], image['FileName'], image['Type'],
-                    image['Region'], image['CRC32']
-                ))
+            for record_type, row in self._iter_rows(parser):
+                counts[record_type] += 1
+                _add_row_hash(hashes, record_type, row)
+                if record_type == 'game':
+                    games.append(row + (normalize_name(row[1]), platform_key(row[11])))
+                    names.append(row[:2])
+                elif record_type == 'alternate_name':
+                    names.append(row)
+                    alternate_names.append(row + (normalize_name(row[1]),))
+                else:
+                    images.append(row)
 
-                image_count += 1
-                if image_count % 10000 == 0:
-                    sys.stdout.write(f"\rAdded {image_count} images")
-                    sys.stdout.flush()
+                if len(games) + len(names) + len(alternate_names) + len(images) >= self.IMPORT_BATCH_SIZE:
+                    flush()
+            flush()
+            self.database.store_content_hashes(conn, hashes)
+            # Matches cached against the old database no longer count
+            self.database.set_data_version(conn, str(time.time_ns()))
 
             logger.info("Progress complete")  # Progress reporting complete
 
             # Commit the transaction
             conn.execute('COMMIT')
-            logger.info(f"Database initialization complete. {game_count} games, {len(data.game_alternate_names)} alternate names, and {image_count} images added.")
+
+            if progress_callback:
+                progress_callback("Indexing game database...")
+            self.database.build_title_trigrams(conn)
+            self.database.install_build(conn, build_path)
+            # Cached name lookups belong to the old data
+            self._name_indexes = {}
+            logger.info(f"Database initialization complete. {counts['game']} games, {counts['alternate_name']} alternate names, and {counts['image']} images added.")
 
             # Clean up temporary files
             if os.path.exists(zip_path):
@@ -927,13 +1716,179 @@ class LaunchBoxMetadata(MetadataProvider):
 
             return True
 
+        except ET.ParseError as e:
+            logger.error(f"Error parsing XML: {e}")
+            return False
+
         except Exception as e:
-            conn.execute('ROLLBACK')
             logger.error(f"Error populating database: {e}")
             import traceback
             logger.error(traceback.format_exc())
             return False
 
+        finally:
+            # A failed build is dropped; the current database stays as it was
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            if os.path.exists(build_path):
+                os.unlink(build_path)
+
+    def refresh_database(self, progress_callback=None) -> Optional[MetadataRefresh]:
+        """Update the database to the latest metadata, writing only the games that changed.
+
+        The dump is downloaded as by initialize_database and streamed once,
+        computing the content hash of every game's rows while the rows are
+        spilled to a scratch file. Games whose hash differs from the one stored
+        at the last import have their rows read back from the scratch file and
+        replace their old rows in one transaction. Week to week a few thousand
+        games change, so a refresh costs one parse of the dump but none of the
+        table and index building of a full import. The data version stays as
+        it is, so the match cache keeps every match except those of the
+        changed games, which are forgotten. Without a database, a full import
+        is done instead.
+
+        Args:
+            progress_callback: Optional callback for progress updates (callable with message string)
+
+        Returns:
+            The changes, or None if the refresh failed. After a full import every
+            cached match is reported as affected.
+        """
+        if not self.database.database_exists():
+            if not self.initialize_database(force=True, progress_callback=progress_callback):
+                return None
+            return MetadataRefresh(set(), set(), set(), self.match_cache.find_pairs())
+
+        logger.info("Refreshing LaunchBox metadata database")
+        # Old databases get their lookup tables and content hashes before comparing
+        self.database.ensure_lookup_tables()
+        stored_hashes = self.database.load_content_hashes()
+
+        downloaded = self._download_metadata_xml(True, progress_callback)
+        if not downloaded:
+            return None
+        zip_path, xml_path = downloaded
+        parser = LaunchBoxXmlParser(xml_path)
+
+        # Rows of the dump by record type, in untyped columns so values come back as they went in
+        staging_path = self.database.db_path + ".refresh"
+        staging = self.database.get_build_connection(staging_path)
+        staging_tables = {'game': 'Games', 'alternate_name': 'AlternateNames', 'image': 'Images'}
+
+        try:
+            if progress_callback:
+                progress_callback("Comparing metadata...")
+            new_hashes: Dict[str, int] = {}
+            batches: Dict[str, List[tuple]] = {record_type: [] for record_type in staging_tables}
+
+            def flush(record_type):
+                batch = batches[record_type]
+                if not batch:
+                    return
+                table = staging_tables[record_type]
+                if not staging.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone():
+                    staging.execute(f"CREATE TABLE {table} ({', '.join(f'c{i}' for i in range(len(batch[0])))})")
+                staging.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(batch[0]))})", batch)
+                batch.clear()
+
+            for record_type, row in self._iter_rows(parser):
+                _add_row_hash(new_hashes, record_type, row)
+                batches[record_type].append(row)
+                if len(batches[record_type]) >= self.IMPORT_BATCH_SIZE:
+                    flush(record_type)
+            for record_type in staging_tables:
+                flush(record_type)
+
+            added = set(new_hashes) - set(stored_hashes)
+            removed = set(stored_hashes) - set(new_hashes)
+            changed = {database_id for database_id, value in new_hashes.items()
+                       if database_id in stored_hashes and stored_hashes[database_id] != value}
+            replaced = added | changed | removed
+            if not replaced:
+                logger.info("LaunchBox metadata is up to date")
+                return MetadataRefresh(added, changed, removed, set())
+
+            # Look up what the old rows were matched to; those matches are
+            # forgotten once the new rows are in
+            affected_pairs = self.match_cache.find_pairs(replaced)
+
+            if progress_callback:
+                progress_callback(f"Updating {len(replaced)} games...")
+            staging.execute('CREATE TABLE Replaced (DatabaseID PRIMARY KEY)')
+            staging.executemany('INSERT INTO Replaced VALUES (?)', [(database_id,) for database_id in replaced])
+            rows = {record_type: [] for record_type in staging_tables}
+            for record_type, table in staging_tables.items():
+                if staging.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone():
+                    rows[record_type] = staging.execute(
+                        f"SELECT * FROM {table} WHERE c0 IN (SELECT DatabaseID FROM Replaced) ORDER BY rowid"
+                    ).fetchall()
+
+            self.database.replace_games(
+                replaced,
+                [row + (normalize_name(row[1]), platform_key(row[11])) for row in rows['game']],
+                [row + (normalize_name(row[1]),) for row in rows['alternate_name']],
+                rows['image'],
+                {database_id: new_hashes[database_id] for database_id in added | changed}
+            )
+            self.match_cache.forget(affected_pairs)
+            # Cached name lookups belong to the old data
+            self._name_indexes = {}
+            logger.info(f"LaunchBox metadata refreshed: {len(added)} games added, {len(changed)} changed, "
+                        f"{len(removed)} removed; {len(affected_pairs)} matched titles affected")
+            return MetadataRefresh(added, changed, removed, affected_pairs)
+
+        except ET.ParseError as e:
+            logger.error(f"Error parsing XML: {e}")
+            return None
+
+        except Exception as e:
+            logger.error(f"Error refreshing database: {e}", exc_info=True)
+            return None
+
+        finally:
+            staging.close()
+            for path in (staging_path, zip_path, xml_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    def _download_metadata_xml(self, force: bool, progress_callback=None) -> Optional[Tuple[str, str]]:
+        """Download the metadata zip and extract Metadata.xml.
+
+        Returns:
+            Tuple of (zip path, XML path), temporary files the caller removes, or None on failure
+        """
+        # Download metadata zip
+        if progress_callback:
+            progress_callback("Starting download...")
+        zip_path = self.downloader.download_metadata(force=force, progress_callback=progress_callback)
+        if not zip_path:
+            return None
+
+        # Extract metadata XML
+        if progress_callback:
+            progress_callback("Extracting metadata files...")
+        xml_path = self.downloader.extract_metadata_xml(zip_path)
+        if not xml_path:
+            return None
+        return zip_path, xml_path
+
+    def _iter_rows(self, parser: LaunchBoxXmlParser) -> Iterator[Tuple[str, tuple]]:
+        """Stream the records of Metadata.xml as table rows.
+
+        Yields:
+            Tuples of (record type, row): the Games row of a game up to Publisher,
+            (DatabaseID, Name) of an alternate name, or the GameImages row of an image
+        """
+        for record_type, record in parser.iter_records():
+            if record_type == 'game':
+                yield record_type, _game_row(record)
+            elif record_type == 'alternate_name':
+                yield record_type, (record['DatabaseID'], record['Name'])
+            else:
+                yield record_type, _image_row(record)
+
     def search(self, query: str, progress_callback=None) -> List[SearchResultItem]:
         """Search for games by name.
 
@@ -997,12 +1952,9 @@ class LaunchBoxMetadata(MetadataProvider):
         Uses progressive fallback search methods to find matches:
         1. Exact title match
         2. Alternate names match
-        3. Prefix match (games that start with the search term)
-        4. Spaces-as-wildcards match (replaces spaces with % wildcards)
-        5. Wildcard-prefix match (prepends % and replaces spaces with % wildcards)
+        3. Fuzzy match, ranking similar names by trigram similarity
 
-        For fuzzy matches (3-5), if exactly one result is found, it will be used.
-        For multiple matches, only uses the first result if it's a strong match.
+        A fuzzy match is only used if its score reaches FUZZY_MATCH_THRESHOLD.
 
         If found, returns the full Game object with metadata.
 
@@ -1038,6 +1990,36 @@ class LaunchBoxMetadata(MetadataProvider):
 
         # For fuzzy matches, only use the match if there's exactly one result
         # or if the first result is a strong match (title starts with our search)
+        match = self._pick_confident_match(title, raw_results)
+        if not match:
+            return None
+
+        game_id = match['DatabaseID']
+        return self.get_details(int(game_id) if game_id.isdigit() else 0)
+
+    def _pick_confident_match(self, title: str, raw_results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Pick the result to use from a title search, if it is a confident match.
+
+        Fuzzy results (with a 'Score') are used if the best one scores at least
+        FUZZY_MATCH_THRESHOLD. Otherwise a single result is always used, and with
+        several results the first one is used only if it starts with the title
+        or contains all of the title's words in order.
+
+        Args:
+            title: The title that was searched for
+            raw_results: Search results with at least 'DatabaseID' and 'Name', best first
+
+        Returns:
+            The chosen result, or None if no result is a confident match
+        """
+        if 'Score' in raw_results[0]:
+            if raw_results[0]['Score'] >= self.FUZZY_MATCH_THRESHOLD:
+                logger.debug(f"Using fuzzy match '{raw_results[0]['Name']}' with score {raw_results[0]['Score']:.2f}")
+                return raw_results[0]
+            logger.debug(f"Best fuzzy match '{raw_results[0]['Name']}' for '{title}' scores only "
+                         f"{raw_results[0]['Score']:.2f}")
+            return None
+
         if len(raw_results) > 1:
             title_lower = title.lower().strip()
             # Check if the first result is a clear best match
@@ -1070,9 +2052,7 @@ class LaunchBoxMetadata(MetadataProvider):
             else:
                 logger.debug(f"Using first fuzzy match '{raw_results[0]['Name']}' as it starts with search term")
 
-        # Use the first match
-        game_id = raw_results[0]['DatabaseID']
-        return self.get_details(int(game_id) if game_id.isdigit() else 0)
+        return raw_results[0]
 
     def get_details(self, game_id: int) -> Optional[Game]:
         """Get detailed information about a specific game.
@@ -1091,6 +2071,17 @@ class LaunchBoxMetadata(MetadataProvider):
         if not raw_game:
             return None
 
+        return self._build_game(raw_game)
+
+    def _build_game(self, raw_game: Dict[str, Any]) -> Game:
+        """Convert a game row (with its 'Images') from the database into a Game.
+
+        Args:
+            raw_game: Game data from get_game_by_id or get_games_by_ids
+
+        Returns:
+            Game details
+        """
         # Create a list of genres from the comma-separated genres field
         genres = []
         if raw_game.get('Genres'):
@@ -1167,6 +2158,73 @@ class LaunchBoxMetadata(MetadataProvider):
             rating=raw_game.get('ESRB')
         )
 
+    def match_titles(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[Game]]:
+        """Find metadata for many (title, platform) pairs at once.
+
+        Gives the same matches as calling search_by_title_and_platform for each
+        pair, but loads the names of the requested platforms in a single pass
+        and matches titles against in-memory maps, runs the fuzzy searches for
+        the rest on one connection, then fetches all matched games in one batch.
+        Use this when scanning many games. The name maps are kept, so later
+        batches for the same platforms skip the name pass, and the results go
+        into the match cache, so pairs matched before (in any session, against
+        the same import of the database) skip matching altogether.
+
+        Args:
+            pairs: (title, platform name) pairs; an empty platform matches any platform
+
+        Returns:
+            Dictionary of each pair to its Game, or None if no confident match was found
+        """
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+
+        if not self.database.database_exists():
+            logger.error("Database not initialized. Run initialize-database first.")
+            return {pair: None for pair in pairs}
+
+        version = self.get_match_cache_version()
+        chosen_ids = self.match_cache.get_many(pairs, version) if version else {}
+        cached = len(chosen_ids)
+        to_match = [pair for pair in pairs if pair not in chosen_ids]
+        if to_match:
+            matched_ids = self._match_title_ids(to_match)
+            chosen_ids.update(matched_ids)
+            if version:
+                self.match_cache.store_many(matched_ids, version)
+
+        raw_games = self.database.get_games_by_ids([i for i in chosen_ids.values() if i])
+        # Several pairs may match the same game
+        matched = sum(1 for game_id in chosen_ids.values() if game_id in raw_games)
+        logger.info(f"Matched {matched} of {len(pairs)} titles against LaunchBox metadata "
+                    f"({cached} from the match cache)")
+
+        return {
+            pair: self._build_game(raw_games[game_id]) if game_id in raw_games else None
+            for pair, game_id in chosen_ids.items()
+        }
+
+    def _match_title_ids(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """Match (title, platform) pairs to the DatabaseID of their game, or None"""
+        missing = {platform.lower() for _, platform in pairs} - set(self._name_indexes)
+        if missing:
+            platform_names = self.database.load_platform_names(list(missing))
+            for key, (main, alternate) in platform_names.items():
+                self._name_indexes[key] = PlatformNameIndex(main, alternate)
+        indexes = self._name_indexes
+
+        exact_results = {(title, platform): indexes[platform.lower()].search(title) for title, platform in pairs}
+        similar_results = self.database.search_similar_titles(
+            [pair for pair, raw_results in exact_results.items() if not raw_results])
+
+        chosen_ids = {}
+        for (title, platform), raw_results in exact_results.items():
+            raw_results = raw_results or similar_results.get((title, platform))
+            match = self._pick_confident_match(title, raw_results) if raw_results else None
+            chosen_ids[(title, platform)] = match['DatabaseID'] if match else None
+        return chosen_ids
+
     def close(self):
         """Close database connections and clean up resources."""
         self.database.close()
@@ -1440,6 +2498,9 @@ def main():
     init_parser = subparsers.add_parser('initialize-database', help='Initialize or update the LaunchBox metadata database')
     init_parser.add_argument('--force', action='store_true', help='Force redownload even if database exists')
 
+    # Refresh database
+    subparsers.add_parser('refresh-database', help='Update the LaunchBox metadata database with only the changed games')
+
     # Search
     search_parser = subparsers.add_parser('search', help='Search for games by name')
     search_parser.add_argument('query', help='Game name to search for')
@@ -1475,6 +2536,10 @@ def main():
             if not success:
                 sys.exit(1)
 
+        elif args.command == 'refresh-database':
+            if metadata.refresh_database() is None:
+                sys.exit(1)
+
         elif args.command == 'search':
             results = metadata.search(args.query, args.limit)
             display_game_search_results(results)
@@ -1565,6 +2630,7 @@ def main():
             parser.print_help()
             logger.info("\nAvailable commands:")
             logger.info("  initialize-database  Initialize or update the LaunchBox metadata database")
+            logger.info("  refresh-database     Update the database with only the changed games")
             logger.info("  search               Search for games by name")
             logger.info("  details              Get detailed information about a specific game")
             logger.info("  interactive          Interactive search mode")
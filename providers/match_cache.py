@@ -0,0 +1,227 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+def get_match_key(title: str, platform: str) -> Tuple[str, str]:
+    """
+    Get the form of a (title, platform) pair that cached matches are stored under
+
+    Args:
+        title: Game title as searched for
+        platform: Platform name, may be empty
+
+    Returns:
+        Tuple of (title, platform), lowercased and without surrounding whitespace
+    """
+    return title.strip().lower(), (platform or "").strip().lower()
+
+
+class MatchCache:
+    """
+    Remembers which game of a metadata provider each (title, platform) pair matched.
+
+    Matching a title against a provider (name lookups, fuzzy search) costs far
+    more than fetching a known game, and the same pairs come back on every
+    rescan and for the same game in several sources. Each result is stored
+    with the version of the provider's data it came from (see
+    MetadataProvider.get_match_cache_version); results of any other version
+    are ignored and deleted, so a rebuilt metadata database or a changed
+    matcher starts over. Pairs without a match are remembered for
+    NEGATIVE_TTL seconds only, since they are the ones a user fixes by
+    renaming files.
+
+    Stored in data/providers/match_cache.sqlite, shared by all providers.
+    Each operation opens its own connection, so the cache can be used from any
+    thread.
+    """
+
+    DB_FILENAME = "match_cache.sqlite"
+
+    # Seconds a "no match" result is trusted
+    NEGATIVE_TTL = 7 * 24 * 3600
+
+    # Game IDs per query in find_pairs
+    LOOKUP_BATCH_SIZE = 500
+
+    def __init__(self, provider_name: str, data_directory: str = "data"):
+        """
+        Initialize the cache of one provider
+
+        Args:
+            provider_name: Name of the metadata provider, e.g. "LaunchBox"
+            data_directory: GameShelf data directory
+        """
+        self.provider_name = provider_name
+        self.data_directory = os.path.join(data_directory, "providers")
+        self.db_path = os.path.join(self.data_directory, self.DB_FILENAME)
+        self._lock = threading.Lock()
+        self._purged_version: Optional[str] = None
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Open a connection to the cache, creating the table if needed"""
+        os.makedirs(self.data_directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS matches (
+            provider TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            title TEXT NOT NULL,
+            game_id TEXT,
+            version TEXT NOT NULL,
+            matched_at REAL NOT NULL,
+            PRIMARY KEY (provider, platform, title)
+        ) WITHOUT ROWID
+        ''')
+        return conn
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]], version: str) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Look up the cached matches of (title, platform) pairs
+
+        Args:
+            pairs: (title, platform name) pairs
+            version: Current version of the provider's data
+
+        Returns:
+            Dictionary of the pairs with a valid cached result to the matched game
+            ID, or None for a remembered "no match". Pairs not in the result
+            have to be matched.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs or not os.path.exists(self.db_path):
+            return {}
+
+        found: Dict[Tuple[str, str], Optional[str]] = {}
+        oldest_negative = time.time() - self.NEGATIVE_TTL
+        conn = self.get_connection()
+        try:
+            self._purge_other_versions(conn, version)
+            for pair in pairs:
+                title, platform = get_match_key(*pair)
+                row = conn.execute(
+                    "SELECT game_id, matched_at FROM matches WHERE provider = ? AND platform = ? AND title = ? "
+                    "AND version = ?", (self.provider_name, platform, title, version)
+                ).fetchone()
+                if row is None or (row[0] is None and row[1] < oldest_negative):
+                    continue
+                found[pair] = row[0]
+        finally:
+            conn.close()
+        return found
+
+    def store_many(self, matches: Dict[Tuple[str, str], Optional[str]], version: str):
+        """
+        Remember the results of matching (title, platform) pairs
+
+        Args:
+            matches: Dictionary of each pair to its matched game ID, or None if nothing matched
+            version: Version of the provider's data the matches came from
+        """
+        if not matches:
+            return
+        now = time.time()
+        rows = []
+        for pair, game_id in matches.items():
+            title, platform = get_match_key(*pair)
+            rows.append((self.provider_name, platform, title,
+                         str(game_id) if game_id is not None else None, version, now))
+
+        conn = self.get_connection()
+        try:
+            self._purge_other_versions(conn, version)
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO matches (provider, platform, title, game_id, version, matched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+        finally:
+            conn.close()
+
+    def find_pairs(self, game_ids: Optional[Iterable[str]] = None) -> Set[Tuple[str, str]]:
+        """
+        Find the (title, platform) pairs whose match may change with the given games
+
+        Those are the pairs matched to one of the games, and the pairs that
+        matched nothing, which a new or renamed game may match now. Results of
+        every data version count, since they record which titles were matched
+        to what.
+
+        Args:
+            game_ids: IDs of changed games, or None for every cached pair
+
+        Returns:
+            Pairs as returned by get_match_key
+        """
+        if not os.path.exists(self.db_path):
+            return set()
+
+        conn = self.get_connection()
+        try:
+            if game_ids is None:
+                rows = conn.execute("SELECT title, platform FROM matches WHERE provider = ?",
+                                    (self.provider_name,)).fetchall()
+            else:
+                rows = conn.execute("SELECT title, platform FROM matches WHERE provider = ? AND game_id IS NULL",
+                                    (self.provider_name,)).fetchall()
+                game_ids = [str(game_id) for game_id in game_ids]
+                for start in range(0, len(game_ids), self.LOOKUP_BATCH_SIZE):
+                    batch = game_ids[start:start + self.LOOKUP_BATCH_SIZE]
+                    rows.extend(conn.execute(
+                        f"SELECT title, platform FROM matches WHERE provider = ? "
+                        f"AND game_id IN ({', '.join('?' * len(batch))})", [self.provider_name] + batch
+                    ).fetchall())
+        finally:
+            conn.close()
+        return {(title, platform) for title, platform in rows}
+
+    def clear(self):
+        """Forget every cached match of this provider"""
+        if not os.path.exists(self.db_path):
+            return
+        conn = self.get_connection()
+        try:
+            with conn:
+                conn.execute("DELETE FROM matches WHERE provider = ?", (self.provider_name,))
+        finally:
+            conn.close()
+        logger.info(f"Cleared the {self.provider_name} match cache")
+
+    def forget(self, pairs: Iterable[Tuple[str, str]]):
+        """
+        Forget the cached matches of (title, platform) pairs, so they are matched again
+
+        Args:
+            pairs: (title, platform name) pairs, e.g. as returned by find_pairs
+        """
+        rows = [(self.provider_name, platform, title) for title, platform in
+                dict.fromkeys(get_match_key(*pair) for pair in pairs)]
+        if not rows or not os.path.exists(self.db_path):
+            return
+        conn = self.get_connection()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM matches WHERE provider = ? AND platform = ? AND title = ?", rows)
+        finally:
+            conn.close()
+        logger.info(f"Forgot {len(rows)} cached {self.provider_name} matches")
+
+    def _purge_other_versions(self, conn: sqlite3.Connection, version: str):
+        """Delete the matches of other data versions, once per version and process"""
+        with self._lock:
+            if self._purged_version == version:
+                return
+            self._purged_version = version
+        with conn:
+            deleted = conn.execute("DELETE FROM matches WHERE provider = ? AND version != ?",
+                                   (self.provider_name, version)).rowcount
+        if deleted:
+            logger.info(f"Dropped {deleted} cached {self.provider_name} matches of older metadata")
@@ -1,9 +1,10 @@
 import datetime
-from typing import List, Optional
+from typing import List, Optional, Type
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 
 from data_mapping import Genres, Platforms, AgeRatings, Features, Regions
+from lazy_loader import LazyRegistry
 
 
 @dataclass
@@ -104,6 +105,19 @@ class MetadataProvider(ABC):
         """
         pass
 
+    def get_match_cache_version(self) -> Optional[str]:
+        """
+        Get the version of the data that title matches come from
+
+        Providers that cache their (title, platform) matches in a MatchCache
+        return a string that changes whenever a search could give a different
+        answer, e.g. when their database is rebuilt or their matching changes.
+
+        Returns:
+            The version, or None if matches aren't cached (the default)
+        """
+        return None
+
     # Shared enum mapping methods
     def map_genres(self, genre_objects: List[Genre]) -> List[Genres]:
         """
@@ -195,3 +209,29 @@ class MetadataProvider(ABC):
             Mapped Regions enum value or None
         """
         return Regions.try_from_string(region_name) if region_name else None
+
+
+# Provider implementations, keyed by the name shown in the UI. The client
+# modules import requests and friends, so they load when a provider is first used
+METADATA_PROVIDERS = LazyRegistry("metadata provider", {
+    "LaunchBox": "providers.launchbox_client:LaunchBoxMetadata",
+    "OpenCritic": "providers.opencritic_client:OpenCriticClient",
+})
+
+
+def get_metadata_provider_class(name: str) -> Type[MetadataProvider]:
+    """
+    Get a metadata provider class by name, importing its module on first use
+
+    Args:
+        name: Provider name (e.g. "LaunchBox", "OpenCritic")
+
+    Returns:
+        The MetadataProvider subclass
+
+    Raises:
+        ValueError: If no provider is registered under that name
+    """
+    if name not in METADATA_PROVIDERS:
+        raise ValueError(f"Unknown metadata provider: {name}")
+    return METADATA_PROVIDERS.get(name)
@@ -0,0 +1,271 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from data import Game, Source, SourceType
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Service each online source type talks to. Accounts on the same service share
+# its connection limit.
+SOURCE_HOSTS = {
+    SourceType.XBOX: "xboxlive.com",
+    SourceType.PLAYSTATION: "playstation.com",
+    SourceType.EPIC: "epicgames.com",
+    SourceType.GOG: "gog.com",
+    SourceType.STEAM: "steampowered.com",
+}
+
+
+def get_device_key(path: str) -> str:
+    """
+    Get the limiter key of the device (mount) a path lives on
+
+    Args:
+        path: File or directory path; missing trailing components are ignored
+
+    Returns:
+        Key such as "device:2049", shared by all paths on the same filesystem
+    """
+    current = os.path.abspath(path)
+    while True:
+        try:
+            return f"device:{os.stat(current).st_dev}"
+        except OSError:
+            parent = os.path.dirname(current)
+            if parent == current:
+                return f"device:{path}"
+            current = parent
+
+
+def get_host_key(source_type: SourceType) -> Optional[str]:
+    """
+    Get the limiter key of the service an online source type talks to
+
+    Args:
+        source_type: Type of the source
+
+    Returns:
+        Key such as "host:gog.com", or None for local sources
+    """
+    host = SOURCE_HOSTS.get(source_type)
+    return f"host:{host}" if host else None
+
+
+class ResourceLimiter:
+    """
+    Caps concurrent work per physical resource.
+
+    Disk-bound work holds a "device:" key so roots on one disk are read one at a
+    time (parallel reads on one spindle only add seeks) while separate disks
+    run side by side. Network-bound work holds a "host:" key so several accounts
+    on one service don't hammer it at once. Semaphores are created on first use.
+    """
+
+    def __init__(self, per_device: int = 1, per_host: int = 2):
+        """
+        Initialize the limiter
+
+        Args:
+            per_device: Concurrent tasks allowed per device
+            per_host: Concurrent tasks allowed per host
+        """
+        self.per_device = max(1, per_device)
+        self.per_host = max(1, per_host)
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self, key: str) -> threading.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                limit = self.per_host if key.startswith("host:") else self.per_device
+                semaphore = self._semaphores[key] = threading.Semaphore(limit)
+            return semaphore
+
+    @contextmanager
+    def hold(self, key: Optional[str]):
+        """
+        Hold a slot of a resource for the duration of a with block
+
+        Args:
+            key: Resource key from get_device_key or get_host_key; None holds nothing
+        """
+        if key is None:
+            yield
+            return
+
+        semaphore = self._get_semaphore(key)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    @contextmanager
+    def released(self, key: Optional[str]):
+        """
+        Give up a slot held with hold() for the duration of a with block, e.g. while
+        sleeping, so work waiting for the resource can take a turn
+
+        Args:
+            key: Resource key of the held slot; None releases nothing
+        """
+        if key is None:
+            yield
+            return
+
+        semaphore = self._get_semaphore(key)
+        semaphore.release()
+        try:
+            yield
+        finally:
+            semaphore.acquire()
+
+
+# Global limiter shared by all scans in the process
+_resource_limiter = None
+_resource_limiter_lock = threading.Lock()
+
+
+def get_resource_limiter() -> ResourceLimiter:
+    """Get the global resource limiter instance"""
+    global _resource_limiter
+    with _resource_limiter_lock:
+        if _resource_limiter is None:
+            _resource_limiter = ResourceLimiter()
+        return _resource_limiter
+
+
+class SourceScanResult(NamedTuple):
+    """Outcome of scanning one source"""
+    source: Source
+    changed: int
+    errors: List[str]
+    elapsed: float
+
+
+class ScanScheduler:
+    """
+    Scans several sources concurrently.
+
+    Each source runs on a worker thread. Online sources hold their service's
+    host slot while scanning; ROM directory sources limit themselves per device
+    root by root (see DirectoryScanner), so sources on separate disks and
+    services overlap and a full sync takes about as long as the slowest source.
+
+    Per-source progress is folded into a single progress callback: every source
+    counts for PROGRESS_UNITS, of which it has completed its reported fraction.
+    """
+
+    PROGRESS_UNITS = 100
+
+    def __init__(self, source_handler, max_workers: int = 4, limiter: Optional[ResourceLimiter] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            source_handler: SourceHandler used to scan each source
+            max_workers: Maximum number of sources scanned at once
+            limiter: Resource limiter, defaults to the global one
+        """
+        self.source_handler = source_handler
+        self.max_workers = max(1, max_workers)
+        self.limiter = limiter or get_resource_limiter()
+
+    def run(self, sources: List[Source],
+            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+            source_callback: Optional[Callable[[SourceScanResult], None]] = None,
+            games_callback: Optional[Callable[[List[Game]], None]] = None) -> List[SourceScanResult]:
+        """
+        Scan sources and wait for all of them to finish
+
+        Args:
+            sources: Sources to scan
+            progress_callback: Optional callback(current, total, message) with the combined
+                               progress of all sources, called from worker threads
+            source_callback: Optional callback with each result as its source finishes,
+                             called from worker threads
+            games_callback: Optional callback with games saved while their source is
+                            still scanning, called from worker threads
+
+        Returns:
+            List of results in the order of sources. A source that raised has
+            changed=0 and the exception as its only error.
+        """
+        if not sources:
+            return []
+
+        # Re-read the library once for the whole run, in case another process
+        # (e.g. gameshelf-cli) changed it; scanners then share the index
+        data_handler = getattr(self.source_handler, "data_handler", None)
+        if data_handler is not None and hasattr(data_handler, "library_index"):
+            data_handler.library_index.invalidate()
+
+        total_units = len(sources) * self.PROGRESS_UNITS
+        fractions: Dict[str, float] = {}
+        running: List[str] = []
+        done = [0]
+        lock = threading.Lock()
+
+        def report():
+            if not progress_callback:
+                return
+            with lock:
+                current = int(sum(fractions.values()) * self.PROGRESS_UNITS)
+                names = ", ".join(running[:3]) + ("..." if len(running) > 3 else "")
+                message = f"Syncing {names} ({done[0]}/{len(sources)} done)" if names else \
+                    f"Synced {done[0]}/{len(sources)} sources"
+            try:
+                progress_callback(min(current, total_units), total_units, message)
+            except Exception as e:
+                logger.error(f"Error with progress callback: {e}")
+
+        def scan(index: int, source: Source) -> SourceScanResult:
+            key = f"{index}:{source.id}"
+
+            def source_progress(current, total, message=""):
+                if total and total > 0:
+                    with lock:
+                        # Never move backwards; scanners restart their count per phase
+                        fractions[key] = max(fractions.get(key, 0.0), min(current / total, 1.0) * 0.99)
+                    report()
+
+            with self.limiter.hold(get_host_key(source.source_type)):
+                with lock:
+                    running.append(source.name)
+                report()
+                start = time.monotonic()
+                try:
+                    changed, errors = self.source_handler.scan_source(source, source_progress, games_callback)
+                except Exception as e:
+                    logger.error(f"Error scanning {source.name}: {e}", exc_info=True)
+                    changed, errors = 0, [str(e)]
+                result = SourceScanResult(source, changed, errors, time.monotonic() - start)
+
+            with lock:
+                running.remove(source.name)
+                fractions[key] = 1.0
+                done[0] += 1
+            report()
+
+            if source_callback:
+                try:
+                    source_callback(result)
+                except Exception as e:
+                    logger.error(f"Error with source callback: {e}")
+            return result
+
+        results: List[Optional[SourceScanResult]] = [None] * len(sources)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(sources)),
+                                thread_name_prefix="scan") as pool:
+            futures = {pool.submit(scan, index, source): index for index, source in enumerate(sources)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        return results
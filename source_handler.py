@@ -10,24 +10,27 @@ import traceback
 import re
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
-from threading import Thread
-from gi.repository import GLib
 
 from data import Source, SourceType, Game, RomPath
 from data_handler import DataHandler
 from data_mapping import Platforms, Genres, CompletionStatus
-from sources.xbox_client import XboxLibrary
-from sources.psn_client import PSNClient
-from sources.gog_library_client import GogLibraryClient
-from sources.directory_scanner import DirectoryScanner
 from sources.scanner_base import SourceScanner
-from sources.epic_library_client import EpicLibraryClient
-from sources.steam_client import SteamScanner
-from cover_fetch import CoverFetcher
+from lazy_loader import LazyRegistry
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Scanner classes are imported the first time a source of that type is scanned;
+# the client modules pull in requests, vdf, isodate etc. which startup doesn't need
+SCANNERS = LazyRegistry("scanner", {
+    SourceType.ROM_DIRECTORY: "sources.directory_scanner:DirectoryScanner",
+    SourceType.XBOX: "sources.xbox_client:XboxLibrary",
+    SourceType.PLAYSTATION: "sources.psn_client:PSNClient",
+    SourceType.EPIC: "sources.epic_library_client:EpicLibraryClient",
+    SourceType.STEAM: "sources.steam_client:SteamScanner",
+    SourceType.GOG: "sources.gog_library_client:GogLibraryClient",
+})
+
 
 class SourceHandler:
     """Handles operations related to game sources and scanning"""
@@ -89,10 +92,15 @@ class SourceHandler:
                                     if isinstance(file_extensions, str):
                                         file_extensions = [ext.strip() for ext in file_extensions.split(",") if ext.strip()]
 
+                                    ignore_patterns = path_data.get("ignore_patterns", [])
+                                    if isinstance(ignore_patterns, str):
+                                        ignore_patterns = [p.strip() for p in ignore_patterns.split(",") if p.strip()]
+
                                     rom_path = RomPath(
                                         path=path_data.get("path", ""),
                                         file_extensions=file_extensions,
-                                        name_regex=path_data.get("name_regex")
+                                        name_regex=path_data.get("name_regex"),
+                                        ignore_patterns=ignore_patterns
                                     )
                                     rom_paths.append(rom_path)
                                 source.rom_paths = rom_paths
@@ -167,6 +175,8 @@ class SourceHandler:
                 }
                 if rom_path.name_regex:
                     path_data["name_regex"] = rom_path.name_regex
+                if rom_path.ignore_patterns:
+                    path_data["ignore_patterns"] = rom_path.ignore_patterns
                 rom_paths_data.append(path_data)
 
             source_data["rom_paths"] = rom_paths_data
@@ -200,11 +210,8 @@ class SourceHandler:
 
         # First, remove all games associated with this source
         try:
-            # Get all games
-            games = self.data_handler.load_games()
-
             # Find and remove games associated with this source
-            source_games = [game for game in games if game.source == source.id]
+            source_games = self.data_handler.library_index.get_source_games(source.id)
             logger.debug(f"Found {len(source_games)} games associated with source {source.id}")
 
             # Remove each game
@@ -265,33 +272,47 @@ class SourceHandler:
         Returns:
             An initialized scanner for the specified source type
         """
-        if source_type == SourceType.ROM_DIRECTORY:
-            return DirectoryScanner(self.data_handler)
-        elif source_type == SourceType.XBOX:
-            # For Xbox, set up token directory if source_id is provided
-            token_dir = None
-            if source_id:
-                token_dir = self.ensure_secure_token_storage(source_id)
-            return XboxLibrary(self.data_handler, token_dir=token_dir)
-        elif source_type == SourceType.PLAYSTATION:
-            # For PSN, set up token directory if source_id is provided
-            token_dir = None
-            if source_id:
-                token_dir = self.ensure_secure_token_storage(source_id)
-            return PSNClient(self.data_handler, token_dir=str(token_dir) if token_dir else None)
-        elif source_type == SourceType.EPIC:
-            # For Epic Games, set up token directory if source_id is provided
-            token_dir = None
-            if source_id:
-                token_dir = self.ensure_secure_token_storage(source_id)
-            return EpicLibraryClient(self.data_handler, token_dir=token_dir)
-        elif source_type == SourceType.STEAM:
-            # For Steam, no token directory is needed
-            return SteamScanner(self.data_handler)
+        if source_type not in SCANNERS:
+            raise ValueError(f"Unsupported source type: {source_type}")
+
+        scanner_class = SCANNERS.get(source_type)
+
+        if source_type in (SourceType.ROM_DIRECTORY, SourceType.STEAM):
+            # No token directory is needed
+            return scanner_class(self.data_handler)
+
+        # Online sources keep their tokens in a per-source directory
+        token_dir = None
+        if source_id:
+            token_dir = self.ensure_secure_token_storage(source_id)
+
+        if source_type == SourceType.PLAYSTATION:
+            return scanner_class(self.data_handler, token_dir=str(token_dir) if token_dir else None)
         elif source_type == SourceType.GOG:
-            token_dir = None
-            if source_id:
-                token_dir = self.ensure_secure_token_storage(source_id)
-            return GogLibraryClient(self.data_handler, data_dir=token_dir)
+            return scanner_class(self.data_handler, data_dir=token_dir)
         else:
-            raise ValueError(f"Unsupported source type: {source_type}")
+            return scanner_class(self.data_handler, token_dir=token_dir)
+
+    def scan_source(self, source: Source, progress_callback: Optional[callable] = None,
+                    games_saved_callback: Optional[callable] = None) -> Tuple[int, List[str]]:
+        """
+        Scan a source with the matching scanner
+
+        Args:
+            source: The source to scan
+            progress_callback: Optional callback function for progress updates
+            games_saved_callback: Optional callback with lists of games saved while the
+                                  scan is still running (only some scanners report these)
+
+        Returns:
+            Tuple of (number of games added or updated, list of error messages)
+        """
+        scanner = self.get_scanner(source.source_type, source.id)
+        scanner.games_saved_callback = games_saved_callback
+        changed, errors = scanner.scan(source, progress_callback)
+
+        # PSN returns (added_count, updated_count)
+        if isinstance(changed, tuple):
+            changed = sum(changed)
+
+        return changed or 0, errors or []
@@ -0,0 +1,266 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from gi.repository import Gio, GLib
+
+from data import Game, Source
+from sources.directory_scanner import get_game_group
+from sources.rom_walker import RomWalker
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Events that may bring in new game files. Plain CHANGED events (a file still
+# being written) only postpone the import.
+_IMPORT_EVENTS = {
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.RENAMED,
+}
+
+
+class _SourceWatch:
+    """Monitors and pending changes of one watched source"""
+
+    def __init__(self, source: Source):
+        self.source = source
+        self.monitors: Dict[str, Tuple[Gio.FileMonitor, str]] = {}  # directory -> (monitor, ROM path)
+        # ROM path -> names of changed entries directly in it
+        self.pending: Dict[str, Set[str]] = {}
+        self.first_event = 0.0
+        self.timeout_id = 0
+        self.scanning = False
+        self.scanner = None
+
+
+class SourceWatcher:
+    """
+    Imports new games of ROM directory sources as their files appear.
+
+    Every directory under the ROM paths of a watched source gets a
+    Gio.FileMonitor (inotify on Linux). Events are collected per source and
+    handled once no new event has come in for DEBOUNCE_MS, or at the latest
+    MAX_DELAY_MS after the first one, so copying a set of dumps triggers one
+    import instead of one per file, and a large file is only imported once it
+    has been written. Only the games (top-level entries) the events touched are
+    walked, matched and imported (see DirectoryScanner.scan_changes); one
+    source is never imported twice at the same time.
+
+    Sources opt in with config["watch"] (see Source.is_watched). Must be used
+    from the main thread.
+    """
+
+    DEBOUNCE_MS = 2000
+    MAX_DELAY_MS = 15000
+    # inotify watches are a limited system resource; big trees are only partly watched
+    MAX_MONITORS = 4096
+
+    def __init__(self, source_handler,
+                 games_saved_callback: Optional[Callable[[List[Game]], None]] = None,
+                 finished_callback: Optional[Callable[[Source, int, List[str]], None]] = None):
+        """
+        Initialize the watcher
+
+        Args:
+            source_handler: SourceHandler used to create scanners
+            games_saved_callback: Optional callback with games saved by an import,
+                                  called from the import thread
+            finished_callback: Optional callback(source, added, errors) after each import,
+                               called on the main thread
+        """
+        self.source_handler = source_handler
+        self.games_saved_callback = games_saved_callback
+        self.finished_callback = finished_callback
+        self._watches: Dict[str, _SourceWatch] = {}
+
+    def sync(self, sources: List[Source]):
+        """
+        Watch exactly the given sources that ask for it
+
+        Sources whose settings changed are watched again from scratch.
+
+        Args:
+            sources: All configured sources
+        """
+        wanted = {source.id: source for source in sources if source.is_watched()}
+        for source_id in list(self._watches):
+            watch = self._watches[source_id]
+            source = wanted.get(source_id)
+            if source is None or self._watch_key(source) != self._watch_key(watch.source):
+                self.unwatch(source_id)
+        for source_id, source in wanted.items():
+            if source_id not in self._watches:
+                self.watch(source)
+
+    @staticmethod
+    def _watch_key(source: Source):
+        return [(rom_path.path, tuple(rom_path.ignore_patterns or [])) for rom_path in source.rom_paths]
+
+    def watch(self, source: Source):
+        """
+        Start watching a source's ROM paths
+
+        The directory trees are listed on a background thread; monitors are
+        added on the main thread when the listing is done.
+
+        Args:
+            source: A ROM directory source
+        """
+        self.unwatch(source.id)
+        watch = self._watches[source.id] = _SourceWatch(source)
+
+        def list_dirs():
+            dirs = []
+            for rom_path in source.rom_paths:
+                dirs.extend((path, rom_path.path) for path in self._list_tree(rom_path.path, rom_path.ignore_patterns))
+            GLib.idle_add(add_monitors, dirs)
+
+        def add_monitors(dirs):
+            if self._watches.get(source.id) is not watch:
+                return False  # Unwatched in the meantime
+            for path, root in dirs:
+                self._add_monitor(watch, path, root)
+            logger.info(f"Watching {len(watch.monitors)} folders of {source.name}")
+            return False
+
+        threading.Thread(target=list_dirs, name=f"watch-{source.id}", daemon=True).start()
+
+    def unwatch(self, source_id: str):
+        """Stop watching a source"""
+        watch = self._watches.pop(source_id, None)
+        if watch is None:
+            return
+        for monitor, _ in watch.monitors.values():
+            monitor.cancel()
+        watch.monitors.clear()
+        if watch.timeout_id:
+            GLib.source_remove(watch.timeout_id)
+            watch.timeout_id = 0
+        logger.info(f"Stopped watching {watch.source.name}")
+
+    def stop(self):
+        """Stop watching all sources"""
+        for source_id in list(self._watches):
+            self.unwatch(source_id)
+
+    def _list_tree(self, root: str, ignore_patterns: List[str]) -> List[str]:
+        """List a directory and its subdirectories, skipping ignored ones"""
+        walker = RomWalker(root, ignore_patterns=ignore_patterns)
+        dirs = []
+        pending = [os.path.abspath(root)]
+        while pending and len(dirs) < self.MAX_MONITORS:
+            path = pending.pop()
+            dirs.append(path)
+            try:
+                with os.scandir(path) as entries:
+                    pending.extend(entry.path for entry in entries
+                                   if entry.is_dir(follow_symlinks=False) and not walker.is_ignored(entry.name))
+            except OSError as e:
+                logger.warning(f"Error listing {path}: {e}")
+        return dirs
+
+    def _add_monitor(self, watch: _SourceWatch, path: str, root: str):
+        if path in watch.monitors:
+            return
+        if len(watch.monitors) >= self.MAX_MONITORS:
+            logger.warning(f"Not watching {path}: {watch.source.name} already has {self.MAX_MONITORS} watched folders")
+            return
+        try:
+            monitor = Gio.File.new_for_path(path).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error as e:
+            logger.warning(f"Cannot watch {path}: {e}")
+            return
+        monitor.connect("changed", self._on_changed, watch, root)
+        watch.monitors[path] = (monitor, root)
+
+    def _on_changed(self, monitor, file, other_file, event_type, watch: _SourceWatch, root: str):
+        if self._watches.get(watch.source.id) is not watch:
+            return
+
+        # A rename within a folder reports the new name as other_file
+        changed = other_file if event_type in (Gio.FileMonitorEvent.RENAMED, Gio.FileMonitorEvent.MOVED_IN) \
+            and other_file is not None else file
+        path = changed.get_path() if changed else None
+        if not path:
+            return
+
+        if event_type == Gio.FileMonitorEvent.DELETED or event_type == Gio.FileMonitorEvent.MOVED_OUT:
+            monitored = watch.monitors.pop(path, None)
+            if monitored:
+                monitored[0].cancel()
+            return
+
+        if event_type == Gio.FileMonitorEvent.RENAMED and file is not None:
+            monitored = watch.monitors.pop(file.get_path(), None)
+            if monitored:
+                monitored[0].cancel()
+
+        if event_type in _IMPORT_EVENTS:
+            rom_path = next((rp for rp in watch.source.rom_paths if rp.path == root), None)
+            ignore_patterns = rom_path.ignore_patterns if rom_path else []
+            if os.path.isdir(path) and event_type != Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+                # New folders are watched too, so files copied into them are seen
+                for new_dir in self._list_tree(path, ignore_patterns):
+                    self._add_monitor(watch, new_dir, root)
+
+            group = get_game_group(root, path)
+            if group and not RomWalker(root, ignore_patterns=ignore_patterns).is_ignored(group):
+                if not watch.pending:
+                    watch.first_event = time.monotonic()
+                watch.pending.setdefault(root, set()).add(group)
+
+        if watch.pending:
+            self._schedule(watch)
+
+    def _schedule(self, watch: _SourceWatch):
+        """(Re)start the debounce timer of a source"""
+        waited_ms = (time.monotonic() - watch.first_event) * 1000
+        if watch.timeout_id:
+            if waited_ms >= self.MAX_DELAY_MS - self.DEBOUNCE_MS:
+                return  # Keep the running timer so a steady stream of events can't postpone forever
+            GLib.source_remove(watch.timeout_id)
+        watch.timeout_id = GLib.timeout_add(self.DEBOUNCE_MS, self._on_quiet, watch)
+
+    def _on_quiet(self, watch: _SourceWatch):
+        watch.timeout_id = 0
+        if self._watches.get(watch.source.id) is not watch or not watch.pending:
+            return False
+        if watch.scanning:
+            # Picked up when the running import finishes
+            return False
+
+        changes = watch.pending
+        watch.pending = {}
+        watch.scanning = True
+        if watch.scanner is None:
+            watch.scanner = self.source_handler.get_scanner(watch.source.source_type, watch.source.id)
+        watch.scanner.games_saved_callback = self.games_saved_callback
+
+        def run():
+            entries = sum(len(names) for names in changes.values())
+            logger.info(f"Importing {entries} changed entries of {watch.source.name}")
+            try:
+                added, errors = watch.scanner.scan_changes(watch.source, changes)
+            except Exception as e:
+                logger.error(f"Error importing changes of {watch.source.name}: {e}", exc_info=True)
+                added, errors = 0, [str(e)]
+            GLib.idle_add(finished, added, errors)
+
+        def finished(added, errors):
+            watch.scanning = False
+            if self.finished_callback:
+                try:
+                    self.finished_callback(watch.source, added, errors)
+                except Exception as e:
+                    logger.error(f"Error with watch finished callback: {e}")
+            if watch.pending and self._watches.get(watch.source.id) is watch:
+                watch.first_event = time.monotonic()
+                self._schedule(watch)
+            return False
+
+        threading.Thread(target=run, name=f"watch-import-{watch.source.id}", daemon=True).start()
+        return False
@@ -0,0 +1,76 @@
+import os
+import zipfile
+import logging
+from typing import List, NamedTuple, Optional
+
+# py7zr is optional; without it 7z archives are treated like any other file
+try:
+    import py7zr
+except ImportError:
+    py7zr = None
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+ZIP_EXTENSIONS = (".zip",)
+SEVEN_ZIP_EXTENSIONS = (".7z",)
+
+
+class ArchiveMember(NamedTuple):
+    """A file inside an archive, as listed in the archive's directory"""
+    name: str
+    size: int
+    crc32: Optional[str]  # 8 lowercase hex digits, None if the archive doesn't record it
+
+
+def get_archive_extensions() -> List[str]:
+    """Get the archive extensions that can be listed with the installed modules"""
+    extensions = list(ZIP_EXTENSIONS)
+    if py7zr is not None:
+        extensions.extend(SEVEN_ZIP_EXTENSIONS)
+    return extensions
+
+
+def is_archive(name: str) -> bool:
+    """Check whether a file name has a supported archive extension"""
+    return name.lower().endswith(tuple(get_archive_extensions()))
+
+
+def read_archive_members(path: str) -> Optional[List[ArchiveMember]]:
+    """
+    List the files in an archive without extracting anything
+
+    Only the archive's directory is read: for zip the central directory at the
+    end of the file, which already records each member's size and CRC32; for
+    7z the header. No member data is decompressed, so listing a multi-gigabyte
+    archive costs a few small reads.
+
+    Args:
+        path: Path of a zip or 7z archive
+
+    Returns:
+        Members in archive order (directories left out), or None if the file
+        isn't a readable archive
+    """
+    name = path.lower()
+    try:
+        if name.endswith(ZIP_EXTENSIONS):
+            with zipfile.ZipFile(path) as archive:
+                return [ArchiveMember(info.filename, info.file_size, f"{info.CRC:08x}")
+                        for info in archive.infolist() if not info.is_dir()]
+
+        if name.endswith(SEVEN_ZIP_EXTENSIONS) and py7zr is not None:
+            with py7zr.SevenZipFile(path, mode="r") as archive:
+                return [ArchiveMember(info.filename, info.uncompressed or 0,
+                                      f"{info.crc32:08x}" if info.crc32 is not None else None)
+                        for info in archive.list() if not info.is_directory]
+
+    except Exception as e:
+        # Damaged, truncated or encrypted archives are skipped like unreadable files
+        logger.warning(f"Error reading archive {path}: {e}")
+    return None
+
+
+def get_member_extension(member: ArchiveMember) -> str:
+    """Get the lowercase extension of an archive member, with the dot"""
+    return os.path.splitext(member.name)[1].lower()
@@ -1,20 +1,107 @@
 import re
 import logging
 import os
+import fnmatch
+import threading
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Set, Callable, Iterable
 
 from data import Source, Game, SourceType, RomPath
 from data_mapping import Platforms, AgeRatings
 from sources.scanner_base import SourceScanner
+from sources.file_state_cache import FileState, FileStateCache
+from sources.rom_walker import RomWalker
+from sources.rom_hasher import RomHasher
+from sources.archive_reader import ArchiveMember, get_archive_extensions, get_member_extension, read_archive_members
+from library_index import make_path_key
+from scan_scheduler import get_resource_limiter, get_device_key
+from sources.scan_pipeline import ScanPipeline
 from providers.launchbox_client import LaunchBoxMetadata
-from cover_fetch import CoverFetcher
+from providers.dat_index import DatIndex, strip_dat_tags
+from artwork_service import get_artwork_service
+from install_size_service import get_install_size_service
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Scans of one source (a full scan and a watch-triggered one) take turns, so a
+# game found by both isn't added twice
+_source_locks: Dict[str, threading.Lock] = {}
+_source_locks_lock = threading.Lock()
+
+
+def _get_source_lock(source_id: str) -> threading.Lock:
+    with _source_locks_lock:
+        return _source_locks.setdefault(source_id, threading.Lock())
+
+
+def get_game_group(root: str, path: str) -> Optional[str]:
+    """
+    Get the entry directly in a ROM path that a file or folder belongs to
+
+    Every file of a game lives under the same top-level entry: a subfolder game
+    in its folder, a root file game in its files named "<stem>.<ext>".
+
+    Args:
+        root: The ROM path
+        path: Path of a file or folder under root
+
+    Returns:
+        Name of the top-level entry, or None if path is root itself or outside it
+    """
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+    if relative == os.curdir or relative.startswith(os.pardir):
+        return None
+    return relative.split(os.sep)[0]
+
+
+def _make_entries_filter(entries: Optional[Iterable[str]]) -> Optional[Callable[[str, bool], bool]]:
+    """
+    Build a RomWalker top-level filter that only lets the given entries through
+
+    Args:
+        entries: Names of entries directly in a ROM path, or None for all of them
+
+    Returns:
+        The filter, or None if entries is None
+    """
+    if entries is None:
+        return None
+    entries = set(entries)
+    stems = {Path(name).stem for name in entries}
+
+    def top_level_filter(name: str, is_dir: bool) -> bool:
+        # Root file games group all files of a stem
+        return name in entries if is_dir else Path(name).stem in stems
+
+    return top_level_filter
+
+
 class DirectoryScanner(SourceScanner):
-    """Scanner for directory/ROM type sources"""
+    """
+    Scanner for directory/ROM type sources
+
+    A scan is a pipeline (see ScanPipeline): the ROM paths are walked concurrently
+    and discovered games stream through metadata matching and saving, each stage
+    on its own threads with bounded queues in between. Covers are handed to the
+    artwork service, which downloads them in the background.
+
+    Archives (zip, and 7z with py7zr) are listed from their central directory
+    without extracting anything; an archive holding a file with one of the
+    path's extensions is scanned as that game. Sources with config["hash_roms"]
+    set also hash their ROM files while walking; hashes, and the CRC32s that
+    archives record for their members, identify games against the imported DAT
+    files (see DatIndex).
+    """
+
+    # Capacity of the queues between stages
+    QUEUE_SIZE = 256
+    # Games matched against metadata per batch
+    MATCH_BATCH_SIZE = 100
+    # Games saved per batch; the library is told about new games once per batch
+    PERSIST_BATCH_SIZE = 25
+    # Games whose files are hashed together, for sources with hash_roms set
+    HASH_BATCH_SIZE = 16
 
     def __init__(self, data_handler):
         """
@@ -26,8 +113,8 @@ class DirectoryScanner(SourceScanner):
         super().__init__(data_handler)
         # Initialize the LaunchBox metadata provider with the same data directory
         self.metadata_provider = LaunchBoxMetadata(str(data_handler.data_dir))
-        # Initialize the cover fetcher for downloading images
-        self.cover_fetcher = CoverFetcher(data_handler)
+        # Known ROM dumps by hash, for sources that identify their files by content
+        self.dat_index = DatIndex(str(data_handler.data_dir))
 
     def scan(self, source: Source, progress_callback: Optional[callable] = None) -> Tuple[int, List[str]]:
         """
@@ -41,6 +128,32 @@ class DirectoryScanner(SourceScanner):
         Returns:
             Tuple of (number of games added/updated, list of error messages)
         """
+        with _get_source_lock(source.id):
+            return self._scan(source, progress_callback)
+
+    def scan_changes(self, source: Source, changes: Dict[str, Set[str]],
+                     progress_callback: Optional[callable] = None) -> Tuple[int, List[str]]:
+        """
+        Import the games of some entries of a source's ROM paths, e.g. after files were copied in
+
+        Only the named entries are walked, matched and imported; the rest of the
+        source is left alone.
+
+        Args:
+            source: The source to scan
+            changes: ROM path -> names of entries directly in it that changed (see get_game_group).
+                     A file name selects every root file with the same stem.
+            progress_callback: Optional callback function for progress updates
+
+        Returns:
+            Tuple of (number of games added, list of error messages)
+        """
+        with _get_source_lock(source.id):
+            return self._scan(source, progress_callback, changes)
+
+    def _scan(self, source: Source, progress_callback: Optional[callable] = None,
+              changes: Optional[Dict[str, Set[str]]] = None) -> Tuple[int, List[str]]:
+        """Scan all ROM paths of a source, or only the entries in changes"""
         if source.source_type != SourceType.ROM_DIRECTORY:
             return 0, ["Source is not a ROM directory source"]
 
@@ -65,239 +178,471 @@ class DirectoryScanner(SourceScanner):
                 logger.warning(f"Unknown platform '{platform_value}' specified for source {source.name}")
                 # We'll continue without a platform in this case
 
-        # Dictionary to store game entries, keyed by parent folder or file name
-        game_entries = {}
-
-        # Scan each path in the source
-        for path_index, rom_path in enumerate(source.rom_paths):
+        rom_paths = []
+        for rom_path in source.rom_paths:
+            if changes is not None and rom_path.path not in changes:
+                continue
             if not rom_path.path or not Path(rom_path.path).exists():
                 errors.append(f"Path does not exist: {rom_path.path}")
-                continue
-
-            source_path = Path(rom_path.path)
-
-            # Update progress for path
+            else:
+                rom_paths.append(rom_path)
+
+        # Installation directory and files identify a game more robustly than its
+        # title, which users can change
+        existing_games_by_path = self.data_handler.library_index.get_by_path_key(source.id)
+        platform_value = platform.value if platform else ""
+
+        # Files of existing games by directory, to recognize a part of a game that
+        # was saved with more files (see _add_files_to_game)
+        existing_files_by_dir: Dict[str, List[set]] = {}
+        for game in existing_games_by_path.values():
+            if isinstance(game.installation_files, list):
+                existing_files_by_dir.setdefault(game.installation_directory, []).append(set(game.installation_files))
+
+        def is_existing(entry) -> bool:
+            if make_path_key(entry["directory"], entry["files"]) in existing_games_by_path:
+                return True
+            files = set(entry["files"])
+            return any(files <= known for known in existing_files_by_dir.get(entry["directory"], []))
+
+        # Game folders whose size is measured in the background (see InstallSizeService)
+        size_jobs = []
+        size_jobs_lock = threading.Lock()
+
+        # Games of this scan by (ROM path, game key). A path's games are discovered
+        # in order, so when files of one game key turn up again (a folder and a file
+        # of the same name) they are added to the game saved before.
+        scanned_game_ids: Dict[Tuple[str, str], Optional[str]] = {}
+        counts = {"found": 0, "added": 0}
+        counts_lock = threading.Lock()
+
+        def report_progress():
             if progress_callback:
+                with counts_lock:
+                    found, added = counts["found"], counts["added"]
                 try:
-                    progress_callback(path_index, len(source.rom_paths),
-                                     f"Scanning path {path_index+1}/{len(source.rom_paths)}: {source_path}")
+                    progress_callback(added, max(found, 1), f"Added {added} games ({found} found)...")
                 except Exception as e:
                     logger.error(f"Error with progress callback: {e}")
 
-            # Special handling for Wii U games based on folder structure
-            if platform and platform == Platforms.NINTENDO_WIIU:
-                logger.info(f"Scanning for Wii U games in directory: {rom_path.path}")
-                self._scan_wiiu_games(source_path, game_entries, rom_path, progress_callback)
-            else:
-                # Standard file extension based scanning for other platforms
-                self._scan_file_extensions(source_path, game_entries, rom_path, progress_callback)
-
-        # Initial progress update for processing
-        total_games = len(game_entries)
-        if progress_callback and total_games > 0:
-            try:
-                progress_callback(0, total_games, "Starting processing...")
-            except Exception as e:
-                logger.error(f"Error with progress callback: {e}")
-
-        # Get list of existing games from this source
-        existing_games_by_path = {}
-        for game in self.data_handler.load_games():
-            if game.source == source.id:
-                # Use installation directory and files as the key for identification
-                # This is more robust than using title which can be changed by users
-                if hasattr(game, 'installation_directory') and hasattr(game, 'installation_files') and game.installation_directory and game.installation_files:
-                    # Create a unique key based on directory and files
-                    files_key = "|".join(sorted(game.installation_files)) if isinstance(game.installation_files, list) else str(game.installation_files)
-                    path_key = f"{game.installation_directory}::{files_key}"
-                    existing_games_by_path[path_key] = game
-
-        # Process each game entry
-        index = 0
-        for game_key, entry in game_entries.items():
-            try:
-                # Report progress if callback provided
-                if progress_callback and index % 5 == 0:  # Update every 5 games
-                    try:
-                        progress_callback(index, total_games, f"Processing {entry['title']}...")
-                    except Exception as e:
-                        logger.error(f"Error with progress callback: {e}")
-
-                index += 1
-
-                title = entry["title"]
-
+        def match_stage(batch):
+            """Drop known games and look up metadata for the rest in one batch"""
+            with counts_lock:
+                counts["found"] += len(batch)
+            new_entries = []
+            for game_key, entry in batch:
                 # Check if we already have this game from this source using installation path
-                files_key = "|".join(sorted(entry["files"])) if isinstance(entry["files"], list) else str(entry["files"])
-                path_key = f"{entry['directory']}::{files_key}"
-                if path_key in existing_games_by_path:
+                if is_existing(entry):
                     # Game already exists, skip it
+                    scanned_game_ids.setdefault(game_key, None)
+                    existing = existing_games_by_path.get(make_path_key(entry["directory"], entry["files"]))
+                    if entry["size"] is None and existing:
+                        # Measure again; only folders changed since the last time are listed
+                        with size_jobs_lock:
+                            size_jobs.append((existing.id, entry["directory"]))
                     continue
+                new_entries.append((game_key, entry))
 
-                # Create a new game
-                game = Game(
-                    id="",  # ID will be assigned by data handler
-                    title=title,
-                    source=source.id
-                )
-
-                # Set installation data directly on the game object
-                game.installation_directory = entry["directory"]
-                game.installation_files = entry["files"]
-                game.installation_size = entry["size"]
-
-                # Set platform for ROM_DIRECTORY sources if we have a platform specified
-                platform_value = ""
-                if platform:
-                    game.platforms = [platform]
-                    platform_value = platform.value
-                    logger.info(f"Setting platform '{platform_value}' for game '{title}'")
-
-                # Try to fetch metadata from LaunchBox if platform is specified
-                metadata_game = None
-                if platform_value:
-                    try:
-                        # Search for the game by title and platform
-                        logger.info(f"Searching for metadata for '{title}' on platform '{platform_value}'")
-                        metadata_game = self.metadata_provider.search_by_title_and_platform(title, platform_value)
-
-                        if metadata_game:
-                            # If the metadata game name is different from our title, log the match
-                            if metadata_game.name.lower() != title.lower():
-                                logger.info(f"Found metadata for '{title}' as '{metadata_game.name}'")
-                            else:
-                                logger.info(f"Found metadata for '{title}'")
-
-                            # Update game with metadata
-                            if metadata_game.description:
-                                game.description = metadata_game.description
-
-                            # Add genres if available and valid
-                            if metadata_game.genres:
-                                genre_names = [genre.name for genre in metadata_game.genres if hasattr(genre, 'name')]
-                                if genre_names:
-                                    logger.info(f"Found genres for '{title}': {genre_names}")
-
-                                # Use metadata provider's mapping method
-                                mapped_genres = self.metadata_provider.map_genres(metadata_game.genres)
-                                if mapped_genres:
-                                    game.genres = mapped_genres
-                                    logger.debug(f"Mapped {len(mapped_genres)} genres for '{title}'")
-
-                            # Extract developer and publisher from companies if available
-                            if hasattr(metadata_game, 'companies') and metadata_game.companies:
-                                for company in metadata_game.companies:
-                                    if hasattr(company, 'type') and hasattr(company, 'name'):
-                                        if company.type.lower() == 'developer' and not game.developer:
-                                            game.developer = company.name
-                                            logger.info(f"Set developer '{company.name}' for '{title}'")
-                                        elif company.type.lower() == 'publisher' and not game.publisher:
-                                            game.publisher = company.name
-                                            logger.info(f"Set publisher '{company.name}' for '{title}'")
-
-                            # Try to map age ratings if available
-                            if hasattr(metadata_game, 'rating') and metadata_game.rating:
-                                rating_str = metadata_game.rating
-                                mapped_rating = self.metadata_provider.map_single_age_rating(rating_str)
-                                if mapped_rating:
-                                    game.age_ratings = [mapped_rating]
-                                    logger.info(f"Mapped metadata rating '{rating_str}' to {mapped_rating.value} for '{title}'")
-                                else:
-                                    logger.warning(f"Unable to map metadata age rating '{rating_str}' for '{title}'")
-
-                            # Try to extract and map regions if available
-                            if hasattr(metadata_game, 'region') and metadata_game.region:
-                                region_str = metadata_game.region
-                                mapped_region = self.metadata_provider.map_single_region(region_str)
-                                if mapped_region:
-                                    game.regions = [mapped_region]
-                                    logger.info(f"Mapped metadata region '{region_str}' to {mapped_region.value} for '{title}'")
-                                else:
-                                    logger.warning(f"Unable to map metadata region '{region_str}' for '{title}'")
-
-                            # We already set the platform from source config, so we don't override it
-                    except Exception as e:
-                        logger.error(f"Error fetching metadata for '{title}': {e}")
+            # Files identified by hash are matched by the title of their dump
+            metadata_matches = {}
+            if platform_value and new_entries:
+                try:
+                    metadata_matches = self.metadata_provider.match_titles(
+                        [(entry.get("match_title", entry["title"]), platform_value) for _, entry in new_entries]
+                    )
+                except Exception as e:
+                    logger.error(f"Error matching metadata for {source.name}: {e}")
 
-                # Save the game (installation data is now included in the game object)
-                if self.data_handler.save_game(game):
+            report_progress()
+            return [(game_key, entry, metadata_matches.get((entry.get("match_title", entry["title"]), platform_value)))
+                    for game_key, entry in new_entries]
 
-                    # If we found metadata with cover art, try to download the cover image
-                    if metadata_game and metadata_game.images and metadata_game.images.box:
-                        try:
+        def persist_stage(batch):
+            """Save a batch of new games and queue their covers for download"""
+            covers = []
+            saved_games = []
+            for game_key, entry, metadata_game in batch:
+                try:
+                    if game_key in scanned_game_ids:
+                        # More files of a game found earlier in this scan
+                        self._add_files_to_game(scanned_game_ids[game_key], entry)
+                        continue
+
+                    game = self._create_game(source, entry, platform, metadata_game)
+                    title = game.title
+
+                    # Save the game (installation data is now included in the game object)
+                    if self.data_handler.save_game(game):
+                        scanned_game_ids[game_key] = game.id
+                        saved_games.append(game)
+                        if entry["size"] is None:
+                            with size_jobs_lock:
+                                size_jobs.append((game.id, entry["directory"]))
+
+                        # If we found metadata with cover art, queue it for download
+                        if metadata_game and metadata_game.images and metadata_game.images.box:
                             image_url = metadata_game.images.box.url
                             if image_url:
-                                logger.info(f"Downloading cover image for '{title}' from {image_url}")
-                                success, error = self.cover_fetcher.fetch_and_save_for_game(game.id, image_url, "LaunchBox")
-                                if not success:
-                                    logger.warning(f"{title} - {error}")
-                        except Exception as e:
-                            logger.error(f"Error downloading cover image for '{title}': {e}")
-
-                    # If we found a description, save it separately
-                    if metadata_game and metadata_game.description:
-                        try:
-                            self.data_handler.update_game_description(game, metadata_game.description)
-                        except Exception as e:
-                            logger.error(f"Error saving description for '{title}': {e}")
+                                covers.append((game.id, image_url))
 
-                    added_count += 1
-                else:
-                    errors.append(f"Failed to save game '{title}'")
-
-            except Exception as e:
-                errors.append(f"Error processing game {game_key}: {e}")
+                        # If we found a description, save it separately
+                        if metadata_game and metadata_game.description:
+                            try:
+                                self.data_handler.update_game_description(game, metadata_game.description)
+                            except Exception as e:
+                                logger.error(f"Error saving description for '{title}': {e}")
+                    else:
+                        errors.append(f"Failed to save game '{title}'")
+                except Exception as e:
+                    errors.append(f"Error processing game {game_key[1]}: {e}")
+
+            if saved_games:
+                with counts_lock:
+                    counts["added"] += len(saved_games)
+                report_progress()
+                # Let the library show the new games while the scan goes on
+                if self.games_saved_callback:
+                    try:
+                        self.games_saved_callback(saved_games)
+                    except Exception as e:
+                        logger.error(f"Error with games saved callback: {e}")
+            if covers:
+                get_artwork_service(self.data_handler).enqueue_many(covers, "LaunchBox")
+
+        pipeline = ScanPipeline(f"scan {source.name}", queue_size=self.QUEUE_SIZE)
+        pipeline.add_stage("match", match_stage, batch_size=self.MATCH_BATCH_SIZE)
+        pipeline.add_stage("persist", persist_stage, batch_size=self.PERSIST_BATCH_SIZE)
+        stats = pipeline.run([
+            lambda rom_path=rom_path: self._discover_path(
+                source, platform, rom_path, changes.get(rom_path.path) if changes is not None else None)
+            for rom_path in rom_paths
+        ])
+        added_count = counts["added"]
+        if size_jobs:
+            get_install_size_service(self.data_handler).enqueue_many(size_jobs)
 
         # Final progress update
         if progress_callback:
             try:
-                progress_callback(total_games, total_games, "Complete")
+                progress_callback(counts["found"], counts["found"], "Complete")
             except Exception as e:
                 logger.error(f"Error with final progress callback: {e}")
 
-        # Log statistics
-        single_disc_count = sum(1 for entry in game_entries.values() if len(entry["files"]) == 1)
-        multi_disc_count = sum(1 for entry in game_entries.values() if len(entry["files"]) > 1)
-        logger.info(f"Scan complete. Found {single_disc_count} single-file games and {multi_disc_count} multi-disc games.")
+        for stage_stats in stats:
+            if stage_stats.errors:
+                errors.append(f"{stage_stats.errors} batches failed in the {stage_stats.name} stage")
+
+        logger.info(f"Scan complete. Found {counts['found']} games.")
         logger.info(f"Added {added_count} new games. Errors: {len(errors)}.")
 
         return added_count, errors
 
-    def _scan_wiiu_games(self, source_path: Path, game_entries: dict, rom_path: RomPath,
-                         progress_callback: Optional[callable] = None) -> None:
+    def _create_game(self, source: Source, entry: dict, platform: Optional[Platforms],
+                     metadata_game: Optional[Any]) -> Game:
+        """
+        Create the game for a discovered entry, filled in from matched metadata
+
+        Args:
+            source: The source being scanned
+            entry: Discovered game entry (title, directory, files, size)
+            platform: Platform from the source config, if any
+            metadata_game: Matched LaunchBox metadata, if any
+
+        Returns:
+            The new, unsaved game
+        """
+        title = entry["title"]
+
+        # Create a new game
+        game = Game(
+            id="",  # ID will be assigned by data handler
+            title=title,
+            source=source.id
+        )
+
+        # Set installation data directly on the game object
+        game.installation_directory = entry["directory"]
+        game.installation_files = entry["files"]
+        game.installation_size = entry["size"]
+
+        # Set platform for ROM_DIRECTORY sources if we have a platform specified
+        if platform:
+            game.platforms = [platform]
+            logger.info(f"Setting platform '{platform.value}' for game '{title}'")
+
+        if metadata_game:
+            try:
+                # If the metadata game name is different from our title, log the match
+                if metadata_game.name.lower() != title.lower():
+                    logger.info(f"Found metadata for '{title}' as '{metadata_game.name}'")
+                else:
+                    logger.info(f"Found metadata for '{title}'")
+
+                # Update game with metadata
+                if metadata_game.description:
+                    game.description = metadata_game.description
+
+                # Add genres if available and valid
+                if metadata_game.genres:
+                    genre_names = [genre.name for genre in metadata_game.genres if hasattr(genre, 'name')]
+                    if genre_names:
+                        logger.info(f"Found genres for '{title}': {genre_names}")
+
+                    # Use metadata provider's mapping method
+                    mapped_genres = self.metadata_provider.map_genres(metadata_game.genres)
+                    if mapped_genres:
+                        game.genres = mapped_genres
+                        logger.debug(f"Mapped {len(mapped_genres)} genres for '{title}'")
+
+                # Extract developer and publisher from companies if available
+                if hasattr(metadata_game, 'companies') and metadata_game.companies:
+                    for company in metadata_game.companies:
+                        if hasattr(company, 'type') and hasattr(company, 'name'):
+                            if company.type.lower() == 'developer' and not game.developer:
+                                game.developer = company.name
+                                logger.info(f"Set developer '{company.name}' for '{title}'")
+                            elif company.type.lower() == 'publisher' and not game.publisher:
+                                game.publisher = company.name
+                                logger.info(f"Set publisher '{company.name}' for '{title}'")
+
+                # Try to map age ratings if available
+                if hasattr(metadata_game, 'rating') and metadata_game.rating:
+                    rating_str = metadata_game.rating
+                    mapped_rating = self.metadata_provider.map_single_age_rating(rating_str)
+                    if mapped_rating:
+                        game.age_ratings = [mapped_rating]
+                        logger.info(f"Mapped metadata rating '{rating_str}' to {mapped_rating.value} for '{title}'")
+                    else:
+                        logger.warning(f"Unable to map metadata age rating '{rating_str}' for '{title}'")
+
+                # Try to extract and map regions if available
+                if hasattr(metadata_game, 'region') and metadata_game.region:
+                    region_str = metadata_game.region
+                    mapped_region = self.metadata_provider.map_single_region(region_str)
+                    if mapped_region:
+                        game.regions = [mapped_region]
+                        logger.info(f"Mapped metadata region '{region_str}' to {mapped_region.value} for '{title}'")
+                    else:
+                        logger.warning(f"Unable to map metadata region '{region_str}' for '{title}'")
+
+
+                # We already set the platform from source config, so we don't override it
+            except Exception as e:
+                logger.error(f"Error applying metadata for '{title}': {e}")
+
+        return game
+
+    def _add_files_to_game(self, game_id: Optional[str], entry: dict):
+        """
+        Add the files of a later entry with the same game key to a game saved earlier in the scan
+
+        Args:
+            game_id: ID of the saved game, or None if the game already existed
+            entry: The later entry
+        """
+        if not game_id:
+            return
+        game = self.data_handler.library_index.get_game(game_id)
+        if not game:
+            return
+        logger.debug(f"Adding files to game: {game.title}, files: {entry['files']}")
+        game.installation_files = list(game.installation_files or []) + list(entry["files"])
+        game.installation_size = (game.installation_size or 0) + (entry["size"] or 0)
+        self.data_handler.save_game(game)
+
+    def _discover_path(self, source: Source, platform: Optional[Platforms], rom_path: RomPath,
+                       entries: Optional[Set[str]] = None):
+        """
+        Discover the games under one ROM path
+
+        Runs on its own thread for each path; paths on the same device take turns
+        (see ResourceLimiter). Each path keeps its own file state cache.
+
+        Args:
+            source: The source being scanned
+            platform: Platform from the source config, if any
+            rom_path: The path to walk
+            entries: Optional names of the entries directly in the path to walk (see scan_changes)
+
+        Yields:
+            Tuple of ((ROM path, game key), entry) for each game, as soon as all of its files are found
+        """
+        source_path = Path(rom_path.path)
+
+        with get_resource_limiter().hold(get_device_key(rom_path.path)):
+            # Directory listings from the previous scan; unchanged directories are not re-read
+            file_cache = FileStateCache.for_source(self.data_handler, source.id, root=rom_path.path)
+            try:
+                # Special handling for Wii U games based on folder structure
+                if platform and platform == Platforms.NINTENDO_WIIU:
+                    logger.info(f"Scanning for Wii U games in directory: {rom_path.path}")
+                    games = self._scan_wiiu_games(source_path, rom_path, file_cache, entries)
+                else:
+                    # Standard file extension based scanning for other platforms
+                    games = self._scan_file_extensions(source_path, rom_path, file_cache, entries)
+                    hash_roms = bool(source.config and source.config.get("hash_roms"))
+                    if hash_roms or self.dat_index.exists():
+                        games = self._identify_games(games, file_cache, hash_roms)
+
+                for game_key, entry in games:
+                    yield (rom_path.path, game_key), entry
+            finally:
+                logger.info(f"File state cache for {source_path}: {file_cache.get_stats()}")
+                file_cache.close()
+
+    def _identify_games(self, games, file_cache: FileStateCache, hash_files: bool):
+        """
+        Identify discovered games by the content hashes of their files
+
+        Games are handled in batches so the files of several games are hashed
+        at once. Files inside archives are identified by the CRC32 and size from
+        the archive's directory, without hashing; loose files are hashed only
+        with hash_files. A game with a file found in the imported DATs gets the
+        dump's name as "dat_name" and its bare title as "match_title", which
+        metadata matching then uses instead of the title taken from the file name.
+
+        Args:
+            games: Iterable of (game key, entry) from a scan of a ROM path
+            file_cache: File state cache of the ROM path, holding the hashes
+            hash_files: Hash loose files (the source's hash_roms setting)
+
+        Yields:
+            The same (game key, entry) tuples
+        """
+        hasher = RomHasher()
+        batch = []
+
+        def identify():
+            states = {}
+            if hash_files:
+                for _, entry in batch:
+                    archives = entry.get("archive_members", {})
+                    for name in entry["files"]:
+                        if name in archives:
+                            continue
+                        path = os.path.join(entry["directory"], name)
+                        try:
+                            st = os.stat(path)
+                        except OSError as e:
+                            logger.warning(f"Error reading {path}: {e}")
+                            continue
+                        states[path] = FileState(path, st.st_size, st.st_mtime_ns, st.st_ino)
+
+            hashes = hasher.hash_files(states.values(), file_cache)
+            file_cache.commit()
+
+            # (CRC32, SHA-1, size) of every file of each game, archive members without SHA-1
+            game_keys = []
+            for _, entry in batch:
+                keys = []
+                archives = entry.get("archive_members", {})
+                for name in entry["files"]:
+                    if name in archives:
+                        keys.extend((m.crc32, None, m.size) for m in archives[name] if m.crc32)
+                    else:
+                        h = hashes.get(os.path.join(entry["directory"], name))
+                        if h:
+                            keys.append((h.crc32, h.sha1, h.size))
+                game_keys.append(keys)
+            if not any(game_keys):
+                return
+
+            try:
+                dat_names = self.dat_index.lookup(key for keys in game_keys for key in keys)
+            except Exception as e:
+                logger.error(f"Error looking up ROM hashes: {e}")
+                return
+
+            for (_, entry), keys in zip(batch, game_keys):
+                dat_name = next((dat_names[key] for key in keys if key in dat_names), None)
+                if dat_name:
+                    logger.debug(f"Identified '{entry['title']}' by hash as '{dat_name}'")
+                    entry["dat_name"] = dat_name
+                    entry["match_title"] = strip_dat_tags(dat_name)
+
+        for game in games:
+            batch.append(game)
+            if len(batch) >= self.HASH_BATCH_SIZE:
+                identify()
+                yield from batch
+                batch = []
+        if batch:
+            identify()
+            yield from batch
+
+        if hash_files:
+            logger.info(f"Hashed {hasher.hashed} ROM files, {hasher.cached} hashes from the cache")
+
+    def _get_archive_roms(self, rom_file, file_cache: FileStateCache,
+                          extensions: List[str]) -> List[ArchiveMember]:
+        """
+        Get the files with one of the wanted extensions inside an archive
+
+        The archive's member listing is cached by the archive's (inode, size,
+        mtime), so an unchanged archive is only opened on the first scan.
+
+        Args:
+            rom_file: The archive, as found by the walker
+            file_cache: File state cache of the ROM path
+            extensions: Wanted file extensions, with the dot
+
+        Returns:
+            The matching members; empty if there are none or the archive can't be read
+        """
+        state = file_cache.get_file(rom_file.path)
+        if state is None:
+            try:
+                st = os.stat(rom_file.path)
+            except OSError as e:
+                logger.warning(f"Error reading {rom_file.path}: {e}")
+                return []
+            state = FileState(rom_file.path, st.st_size, st.st_mtime_ns, st.st_ino)
+
+        cached = file_cache.get_archive_members(state)
+        if cached is not None:
+            members = [ArchiveMember(*member) for member in cached]
+        else:
+            # Unreadable archives are cached as empty so they aren't retried until they change
+            members = read_archive_members(rom_file.path) or []
+            file_cache.store_archive_members(state, [list(member) for member in members])
+
+        wanted = {ext.lower() for ext in extensions}
+        return [member for member in members if get_member_extension(member) in wanted]
+
+    def _scan_wiiu_games(self, source_path: Path, rom_path: RomPath, file_cache: FileStateCache,
+                         entries: Optional[Set[str]] = None):
         """
         Scan for Wii U games by looking for folders with content/meta/code structure
 
         Args:
             source_path: Path to scan
-            game_entries: Dictionary to populate with game entries
             rom_path: Rom path configuration
-            progress_callback: Optional callback for progress updates
+            file_cache: File state cache used for directory listings
+            entries: Optional names of the game folders to check; all folders if None
+
+        Yields:
+            Tuple of (game key, entry) for each game folder
         """
+        found = 0
         try:
             # Get all immediate subdirectories
-            subdirs = [d for d in source_path.iterdir() if d.is_dir()]
-
-            # Initial progress update
-            total_dirs = len(subdirs)
-            if progress_callback and total_dirs > 0:
-                try:
-                    progress_callback(0, total_dirs, "Scanning for Wii U games...")
-                except Exception as e:
-                    logger.error(f"Error with progress callback: {e}")
+            ignore_patterns = rom_path.ignore_patterns or []
+            subdirs = sorted(d for d in source_path.iterdir()
+                             if d.is_dir() and not any(fnmatch.fnmatch(d.name, p) for p in ignore_patterns)
+                             and (entries is None or d.name in entries))
 
             # Process each directory to check if it's a Wii U game
-            for index, game_dir in enumerate(subdirs):
-                # Report progress if callback provided
-                if progress_callback and index % 5 == 0:  # Update every 5 directories
-                    try:
-                        progress_callback(index, total_dirs, f"Checking {game_dir.name}...")
-                    except Exception as e:
-                        logger.error(f"Error with progress callback: {e}")
-
+            for game_dir in subdirs:
                 # Check if this directory has the Wii U game structure
                 # A valid Wii U game folder contains 'content', 'meta', and 'code' subdirectories
-                if (game_dir / "content").is_dir() and (game_dir / "meta").is_dir() and (game_dir / "code").is_dir():
+                game_dir_path = os.path.abspath(game_dir)
+                try:
+                    _, game_subdirs = file_cache.list_dir(game_dir_path)
+                except OSError as e:
+                    logger.warning(f"Error listing {game_dir}: {e}")
+                    continue
+                subdir_names = {os.path.basename(d) for d in game_subdirs}
+                if {"content", "meta", "code"} <= subdir_names:
                     folder_name = game_dir.name
                     game_key = folder_name
 
@@ -317,46 +662,40 @@ class DirectoryScanner(SourceScanner):
                         title = folder_name
                         logger.error(f"Error applying name regex '{name_regex}' to folder '{folder_name}': {e}")
 
-                    # Calculate total size of the game directory
-                    total_size = 0
-                    for root, _, files in os.walk(game_dir):
-                        for file in files:
-                            file_path = Path(root) / file
-                            try:
-                                total_size += file_path.stat().st_size
-                            except Exception as e:
-                                logger.warning(f"Error getting size of {file_path}: {e}")
-
                     logger.debug(f"Found Wii U game: {title} (key: {game_key})")
-                    game_entries[game_key] = {
+                    found += 1
+                    yield game_key, {
                         "title": title,
                         "directory": str(game_dir),
                         "files": ["content", "meta", "code"],  # The main subdirectories
-                        "size": total_size
+                        # Measured in the background by the install size service
+                        "size": None
                     }
 
-            # Final progress update for scanning phase
-            if progress_callback:
-                try:
-                    progress_callback(total_dirs, total_dirs, "Wii U scan complete")
-                except Exception as e:
-                    logger.error(f"Error with final scan progress callback: {e}")
-
-            logger.info(f"Found {len(game_entries)} Wii U games in {source_path}")
+            logger.info(f"Found {found} Wii U games in {source_path}")
 
         except Exception as e:
             logger.error(f"Error scanning Wii U game directories: {e}", exc_info=True)
 
-    def _scan_file_extensions(self, source_path: Path, game_entries: dict, rom_path: RomPath,
-                             progress_callback: Optional[callable] = None) -> None:
+    def _scan_file_extensions(self, source_path: Path, rom_path: RomPath, file_cache: FileStateCache,
+                              entries: Optional[Set[str]] = None):
         """
         Scan for games based on file extensions
 
+        Files arrive from the walker in path order, so a game is complete as soon
+        as the walk moves past it: a subfolder game once the walk leaves the
+        subfolder, a root file game (files "<stem>.<ext>") once a root entry no
+        longer starting with "<stem>." comes along.
+
         Args:
             source_path: Path to scan
-            game_entries: Dictionary to populate with game entries
             rom_path: Rom path configuration
-            progress_callback: Optional callback for progress updates
+            file_cache: File state cache used for directory listings
+            entries: Optional names of the entries directly in source_path to walk; a
+                     file name selects every root file with the same stem
+
+        Yields:
+            Tuple of (game key, entry) for each game, as soon as it is complete
         """
         # Get the list of files matching the specified extensions
         if not rom_path.file_extensions:
@@ -368,27 +707,44 @@ class DirectoryScanner(SourceScanner):
         logger.info(f"Scanning directory source: {rom_path.path}")
         logger.info(f"Using extensions: {extensions}")
 
-        # Get all files first to match extensions in a case-insensitive way
         try:
-            # Use ** pattern to get all files recursively
-            all_files = list(source_path.glob("**/*"))
-
-            # Create lowercase versions of extensions for case-insensitive matching
-            lowercase_extensions = [ext.lower() for ext in extensions]
-
-            # Filter files that have matching extensions (case-insensitive)
-            matched_files = []
-            for file_path in all_files:
-                if file_path.is_file():
-                    file_ext = os.path.splitext(file_path.name)[1].lower()
-                    if file_ext in lowercase_extensions:
-                        matched_files.append(file_path)
-
-            # Process each matching file
-            for file_path in matched_files:
+            # Stream matching files straight into game entries; extensions and ignore
+            # patterns are checked on names while walking, so other files are never stat'ed
+            # Archives are also walked and listed, and count when they hold a matching file,
+            # unless the archives themselves are what the path holds (e.g. "zip" for arcade sets)
+            archive_extensions = []
+            if rom_path.file_extensions:
+                lower_extensions = {ext.lower() for ext in extensions}
+                archive_extensions = [ext for ext in get_archive_extensions() if ext not in lower_extensions]
+
+            walker = RomWalker(source_path, extensions + archive_extensions, rom_path.ignore_patterns,
+                               file_cache, _make_entries_filter(entries))
+
+            # Games still collecting files: root file games by stem, and the current subfolder game
+            open_file_games = {}
+            folder_key = None
+            folder_entry = None
+
+            for rom_file in walker.walk():
+                archive_roms = None
+                if archive_extensions and rom_file.path.lower().endswith(tuple(archive_extensions)):
+                    archive_roms = self._get_archive_roms(rom_file, file_cache, extensions)
+                    if not archive_roms:
+                        continue
+
+                file_path = source_path.joinpath(*rom_file.rel_parts)
+                file_size = rom_file.size
+
                 # Determine if this is a multi-disc game in a subfolder
-                rel_path = file_path.relative_to(source_path)
-                parts = list(rel_path.parts)
+                rel_path = Path(*rom_file.rel_parts)
+                parts = list(rom_file.rel_parts)
+
+                # Hand over the games the walk has moved past
+                for stem in [stem for stem in open_file_games if not parts[0].startswith(stem + ".")]:
+                    yield stem, open_file_games.pop(stem)
+                if folder_key is not None and (len(parts) == 1 or parts[0] != folder_key):
+                    yield folder_key, folder_entry
+                    folder_key = folder_entry = None
 
                 # If file is directly in the root directory, treat as a single game
                 if len(parts) == 1:
@@ -418,20 +774,20 @@ class DirectoryScanner(SourceScanner):
 
                     game_key = file_stem  # Use stem for the dictionary key to avoid duplicates
 
-                    if game_key not in game_entries:
+                    if game_key not in open_file_games:
                         logger.debug(f"Found single-file game: {title} (key: {game_key})")
-                        game_entries[game_key] = {
+                        open_file_games[game_key] = {
                             "title": title,
                             "directory": str(source_path),
                             "files": [str(rel_path)],
-                            "size": file_path.stat().st_size
+                            "size": file_size
                         }
                     else:
                         # This is unlikely but handle it just in case
                         # A game with multiple files at the root with the same name but different extensions
                         logger.debug(f"Adding additional file to single-game: {title} (key: {game_key}), file: {rel_path}")
-                        game_entries[game_key]["files"].append(str(rel_path))
-                        game_entries[game_key]["size"] += file_path.stat().st_size
+                        open_file_games[game_key]["files"].append(str(rel_path))
+                        open_file_games[game_key]["size"] += file_size
 
                 # If file is in a subfolder, treat all files in that subfolder as part of the same game
                 else:
@@ -461,19 +817,31 @@ class DirectoryScanner(SourceScanner):
                         title = folder_name
                         logger.error(f"Error applying name regex '{name_regex}' to folder '{folder_name}': {e}")
 
-                    if game_key not in game_entries:
+                    if game_key != folder_key:
                         logger.debug(f"Found multi-disc game: {title} (key: {game_key}), first file: {rel_to_game_subfolder}")
-                        game_entries[game_key] = {
+                        folder_key = game_key
+                        folder_entry = {
                             "title": title,
                             "directory": str(game_subfolder),  # Use the game subfolder instead of source_path
                             "files": [rel_to_game_subfolder],  # Store path relative to the game subfolder
-                            "size": file_path.stat().st_size
+                            "size": file_size
                         }
                     else:
                         # Add this file to the multi-disc game entry
                         logger.debug(f"Adding disc to multi-disc game: {game_key}, file: {rel_to_game_subfolder}")
-                        game_entries[game_key]["files"].append(rel_to_game_subfolder)
-                        game_entries[game_key]["size"] += file_path.stat().st_size
+                        folder_entry["files"].append(rel_to_game_subfolder)
+                        folder_entry["size"] += file_size
+
+                if archive_roms:
+                    # Remember what the archive holds, for identification by CRC32
+                    entry = open_file_games[game_key] if len(parts) == 1 else folder_entry
+                    entry.setdefault("archive_members", {})[entry["files"][-1]] = archive_roms
+
+            # The walk is done; everything still open is complete
+            if folder_key is not None:
+                yield folder_key, folder_entry
+            for stem, entry in open_file_games.items():
+                yield stem, entry
 
         except Exception as e:
             logger.error(f"Error searching for files with extensions {extensions}: {e}")
@@ -12,7 +12,7 @@ import sys
 from sources.scanner_base import SourceScanner
 from data import Source, Game
 from data_mapping import Platforms, Genres, CompletionStatus, LauncherType
-from cover_fetch import CoverFetcher
+from artwork_service import get_artwork_service
 
 # Import necessary components from the epic_library module
 from sources.epic_library import EpicLibraryClient as EpicLibClientBase
@@ -165,9 +165,8 @@ class EpicLibraryClient(SourceScanner):
 
             # Get existing games from this source
             existing_games_by_title = {}
-            for game in self.data_handler.load_games():
-                if game.source == source.id:
-                    existing_games_by_title[game.title.lower()] = game
+            for game in self.data_handler.library_index.get_source_games(source.id):
+                existing_games_by_title[game.title.lower()] = game
 
             # Update progress
             total_games = len(epic_games)
@@ -325,23 +324,9 @@ class EpicLibraryClient(SourceScanner):
                             if not self.data_handler.update_play_count(game, game.play_count):
                                 logger.warning(f"Failed to save play count for {game.title}")
 
-                        # Download and save the cover image if URL is available
+                        # Queue the cover image for download if URL is available
                         if hasattr(game, 'image') and game.image and source.config.get("download_images", True):
-                            try:
-                                # Use CoverFetcher to download and save the image
-                                cover_fetcher = CoverFetcher(self.data_handler)
-                                success, error = cover_fetcher.fetch_and_save_for_game(
-                                    game.id,
-                                    game.image,
-                                    source_name="Epic"
-                                )
-
-                                if success:
-                                    logger.debug(f"Cover image downloaded and saved successfully for {game.title}")
-                                else:
-                                    logger.warning(f"Failed to download/save cover image for {game.title}: {error}")
-                            except Exception as img_err:
-                                logger.error(f"Error processing cover image for {game.title}: {img_err}")
+                            get_artwork_service(self.data_handler).enqueue(game.id, game.image, "Epic")
 
                         added_count += 1
                     else:
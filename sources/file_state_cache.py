@@ -0,0 +1,360 @@
+import os
+import json
+import hashlib
+import time
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Bump when the tables change; the cache is rebuilt on the next scan
+SCHEMA_VERSION = 2
+
+# Directories modified this recently are listed again even if their mtime matches;
+# a change within the same timestamp tick would otherwise go unnoticed
+RACY_SECONDS = 2.0
+
+
+class FileState(NamedTuple):
+    """The stat fields a rescan compares for a single file"""
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+class FileStateCache:
+    """
+    Persistent per-source cache of file and directory state for ROM directory scans.
+
+    Every directory that is listed is stored with its mtime, the names of its
+    subdirectories and the state (size, mtime, inode) of its files. Adding, removing
+    or renaming an entry changes the directory's mtime, so when the mtime still
+    matches, the cached listing is used and none of the directory's files are
+    stat'ed again. A rescan of an unchanged tree costs one stat per directory.
+
+    Files modified in place (same name, new content) don't change the directory
+    mtime; pass trust_dir_mtime=False to re-list every directory for a full rescan.
+
+    Listings can be restricted with a file filter (e.g. by extension) so files
+    that will never match aren't stat'ed at all. The filter is identified by a
+    key stored with each listing; a listing taken with another filter is a miss.
+
+    Content hashes of ROM files are kept by (inode, size, mtime) rather than
+    path, so a file is hashed once in its lifetime: renaming it keeps its
+    hashes, rewriting it drops them. Archive member listings are kept the same
+    way, so unchanged archives are never reopened. When a listing is replaced,
+    the hashes and archive listings of file states that no listing contains
+    any more are deleted.
+
+    A cache instance uses a single SQLite connection and must only be used from
+    the thread that created it.
+    """
+
+    DB_FILENAME = "file_state.sqlite"
+
+    def __init__(self, db_path: str, trust_dir_mtime: bool = True):
+        """
+        Open (and create if needed) a file state cache
+
+        Args:
+            db_path: Path of the SQLite database
+            trust_dir_mtime: Reuse cached listings of directories whose mtime is unchanged
+        """
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.trust_dir_mtime = trust_dir_mtime
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    @classmethod
+    def for_source(cls, data_handler, source_id: str, root: Optional[str] = None, **kwargs) -> 'FileStateCache':
+        """
+        Open the file state cache of a source (data/sources/<id>/file_state.sqlite)
+
+        Args:
+            data_handler: The data handler instance
+            source_id: ID of the source
+            root: Optional ROM path; each path then gets its own database so
+                  paths can be scanned concurrently without sharing a writer
+
+        Returns:
+            The cache
+        """
+        filename = cls.DB_FILENAME
+        if root:
+            digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+            filename = f"file_state-{digest}.sqlite"
+        db_path = Path(data_handler.sources_dir) / source_id / filename
+        return cls(str(db_path), **kwargs)
+
+    def _create_tables(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Only cached state lives here, so an old layout is simply dropped
+            self.conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS dirs; "
+                                    "DROP TABLE IF EXISTS hashes; DROP TABLE IF EXISTS archives;")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        self.conn.executescript('''
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            dir TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+        CREATE INDEX IF NOT EXISTS idx_files_state ON files(inode, size, mtime_ns);
+
+        CREATE TABLE IF NOT EXISTS dirs (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            scanned_at REAL NOT NULL,
+            filter_key TEXT NOT NULL,
+            subdirs TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS hashes (
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            crc32 TEXT NOT NULL,
+            sha1 TEXT NOT NULL,
+            PRIMARY KEY (inode, size, mtime_ns)
+        );
+
+        CREATE TABLE IF NOT EXISTS archives (
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            members TEXT NOT NULL,
+            PRIMARY KEY (inode, size, mtime_ns)
+        );
+        ''')
+
+    def list_dir(self, path: str, file_filter: Optional[Callable[[str], bool]] = None,
+                 filter_key: str = "") -> Tuple[List[FileState], List[str]]:
+        """
+        List a directory, from the cache if the directory hasn't changed
+
+        Args:
+            path: Absolute path of the directory
+            file_filter: Optional predicate on file names; other files are skipped without a stat
+            filter_key: String identifying file_filter, required when a filter is given
+
+        Returns:
+            Tuple of (states of the files in the directory, paths of its subdirectories)
+
+        Raises:
+            OSError: If the directory can't be stat'ed or listed
+        """
+        dir_stat = os.stat(path)
+
+        if self.trust_dir_mtime:
+            row = self.conn.execute(
+                "SELECT mtime_ns, scanned_at, subdirs, filter_key FROM dirs WHERE path = ?", (path,)
+            ).fetchone()
+            if (row and row[0] == dir_stat.st_mtime_ns and row[1] - row[0] / 1e9 > RACY_SECONDS
+                    and row[3] == filter_key):
+                self.hits += 1
+                files = [FileState(*r) for r in self.conn.execute(
+                    "SELECT path, size, mtime_ns, inode FROM files WHERE dir = ?", (path,)
+                )]
+                subdirs = [os.path.join(path, name) for name in json.loads(row[2])]
+                return files, subdirs
+
+        self.misses += 1
+        files = []
+        subdir_names = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # Like os.walk, symlinked directories aren't followed
+                    if entry.is_dir(follow_symlinks=False):
+                        subdir_names.append(entry.name)
+                    elif (file_filter is None or file_filter(entry.name)) and entry.is_file():
+                        st = entry.stat()
+                        files.append(FileState(entry.path, st.st_size, st.st_mtime_ns, st.st_ino))
+                except OSError as e:
+                    logger.warning(f"Error reading {entry.path}: {e}")
+
+        self._store_listing(path, dir_stat.st_mtime_ns, filter_key, files, subdir_names)
+        return files, [os.path.join(path, name) for name in subdir_names]
+
+    def _store_listing(self, path: str, mtime_ns: int, filter_key: str,
+                       files: List[FileState], subdir_names: List[str]):
+        """Replace the cached listing of a directory"""
+        removed: Set[Tuple[int, int, int]] = set()
+        previous = self.conn.execute("SELECT subdirs FROM dirs WHERE path = ?", (path,)).fetchone()
+        if previous:
+            # Forget subtrees that no longer exist
+            for name in set(json.loads(previous[0])) - set(subdir_names):
+                removed |= self._forget_tree(os.path.join(path, name))
+
+        removed.update(self.conn.execute("SELECT inode, size, mtime_ns FROM files WHERE dir = ?", (path,)))
+        removed -= {(f.inode, f.size, f.mtime_ns) for f in files}
+        self.conn.execute("DELETE FROM files WHERE dir = ?", (path,))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files (path, dir, size, mtime_ns, inode) VALUES (?, ?, ?, ?, ?)",
+            [(f.path, path, f.size, f.mtime_ns, f.inode) for f in files]
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, mtime_ns, scanned_at, filter_key, subdirs) VALUES (?, ?, ?, ?, ?)",
+            (path, mtime_ns, time.time(), filter_key, json.dumps(subdir_names))
+        )
+        self._prune_file_data(removed)
+
+    def _forget_tree(self, path: str) -> Set[Tuple[int, int, int]]:
+        """Remove a directory and everything below it from the cache; returns the states of its files"""
+        # Everything below "path/" sorts between "path/" and "path0" ('0' follows '/')
+        low, high = path + "/", path + "0"
+        states = set(self.conn.execute(
+            "SELECT inode, size, mtime_ns FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, low, high)
+        ))
+        self.conn.execute("DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, low, high))
+        self.conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+        return states
+
+    def _prune_file_data(self, states: Iterable[Tuple[int, int, int]]):
+        """Delete the hashes and archive listings of file states that are no longer in any listing"""
+        rows = [state + state for state in states]
+        if not rows:
+            return
+        for table in ("hashes", "archives"):
+            self.conn.executemany(
+                f"DELETE FROM {table} WHERE inode = ? AND size = ? AND mtime_ns = ? AND NOT EXISTS "
+                f"(SELECT 1 FROM files WHERE inode = ? AND size = ? AND mtime_ns = ?)", rows
+            )
+
+    def get_file(self, path: str) -> Optional[FileState]:
+        """
+        Get the cached state of a file
+
+        Args:
+            path: Absolute path of the file
+
+        Returns:
+            The cached state, or None if the file isn't cached
+        """
+        row = self.conn.execute(
+            "SELECT path, size, mtime_ns, inode FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        return FileState(*row) if row else None
+
+    def get_hashes(self, state: FileState) -> Optional[Tuple[str, str]]:
+        """
+        Get the cached content hashes of a file
+
+        Args:
+            state: Current state of the file
+
+        Returns:
+            Tuple of (CRC32, SHA-1) as hex strings, or None if the file hasn't been hashed
+            in this state
+        """
+        row = self.conn.execute(
+            "SELECT crc32, sha1 FROM hashes WHERE inode = ? AND size = ? AND mtime_ns = ?",
+            (state.inode, state.size, state.mtime_ns)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def store_hashes(self, state: FileState, crc32: str, sha1: str):
+        """
+        Remember the content hashes of a file
+
+        Args:
+            state: State of the file when it was hashed
+            crc32: CRC32 as a hex string
+            sha1: SHA-1 as a hex string
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO hashes (inode, size, mtime_ns, crc32, sha1) VALUES (?, ?, ?, ?, ?)",
+            (state.inode, state.size, state.mtime_ns, crc32, sha1)
+        )
+
+    def get_archive_members(self, state: FileState) -> Optional[List[list]]:
+        """
+        Get the cached member listing of an archive
+
+        Args:
+            state: Current state of the archive file
+
+        Returns:
+            List of [name, size, CRC32] per member, or None if the archive isn't cached in this state
+        """
+        row = self.conn.execute(
+            "SELECT members FROM archives WHERE inode = ? AND size = ? AND mtime_ns = ?",
+            (state.inode, state.size, state.mtime_ns)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store_archive_members(self, state: FileState, members: List[list]):
+        """
+        Remember the member listing of an archive
+
+        Args:
+            state: State of the archive file when it was read
+            members: List of [name, size, CRC32] per member
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO archives (inode, size, mtime_ns, members) VALUES (?, ?, ?, ?)",
+            (state.inode, state.size, state.mtime_ns, json.dumps(members))
+        )
+
+    def tree_size(self, path: str, throttle: Optional[Callable[[], None]] = None) -> int:
+        """
+        Get the total size of the files below a directory, using cached listings
+
+        Args:
+            path: Absolute path of the directory
+            throttle: Optional callable invoked after each directory that had to be listed,
+                      e.g. to limit the rate of listings on a busy disk
+
+        Returns:
+            Total size in bytes
+        """
+        total = 0
+        pending = [path]
+        while pending:
+            current = pending.pop()
+            misses = self.misses
+            try:
+                files, subdirs = self.list_dir(current)
+            except OSError as e:
+                logger.warning(f"Error listing {current}: {e}")
+                continue
+            if throttle and self.misses != misses:
+                throttle()
+            total += sum(f.size for f in files)
+            pending.extend(subdirs)
+        return total
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the directory cache hit and miss counts of this session"""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def commit(self):
+        """Write pending changes to disk"""
+        self.conn.commit()
+
+    def close(self):
+        """Commit and close the database"""
+        if self.conn:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
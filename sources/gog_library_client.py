@@ -23,7 +23,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from sources.scanner_base import SourceScanner
 from data import Source, Game
 from data_mapping import Platforms, Genres, CompletionStatus
-from cover_fetch import CoverFetcher
+from artwork_service import get_artwork_service
 
 # Configure logging
 logging.basicConfig(
@@ -863,9 +863,8 @@ class GogLibraryClient(SourceScanner):
 
             # Get existing games from this source
             existing_games_by_title = {}
-            for game in self.data_handler.load_games():
-                if game.source == source.id:
-                    existing_games_by_title[game.title.lower()] = game
+            for game in self.data_handler.library_index.get_source_games(source.id):
+                existing_games_by_title[game.title.lower()] = game
 
             # Update progress
             total_games = len(gog_games)
@@ -990,23 +989,9 @@ class GogLibraryClient(SourceScanner):
                             except Exception as desc_err:
                                 logger.error(f"Error saving description for {game.title}: {desc_err}")
 
-                        # Download and save the cover image if URL is available
+                        # Queue the cover image for download if URL is available
                         if hasattr(game, 'image') and game.image and source.config.get("download_images", True):
-                            try:
-                                # Use CoverFetcher to download and save the image
-                                cover_fetcher = CoverFetcher(self.data_handler)
-                                success, error = cover_fetcher.fetch_and_save_for_game(
-                                    game.id,
-                                    game.image,
-                                    source_name="GOG"
-                                )
-
-                                if success:
-                                    logger.debug(f"Cover image downloaded and saved successfully for {game.title}")
-                                else:
-                                    logger.warning(f"Failed to download/save cover image for {game.title}: {error}")
-                            except Exception as img_err:
-                                logger.error(f"Error processing cover image for {game.title}: {img_err}")
+                            get_artwork_service(self.data_handler).enqueue(game.id, game.image, "GOG")
 
                         added_count += 1
                         logger.debug(f"Successfully imported GOG game: {game.title} with enhanced metadata")
@@ -1061,10 +1046,7 @@ class GogLibraryClient(SourceScanner):
 
         try:
             # Get existing games from this source
-            existing_games = []
-            for game in self.data_handler.load_games():
-                if game.source == source.id and game.launcher_type == "GOG" and game.launcher_id:
-                    existing_games.append(game)
+            existing_games = list(self.data_handler.library_index.get_by_launcher_id(source.id, "GOG").values())
 
             if not existing_games:
                 logger.info("No existing GOG games found to update playtime")
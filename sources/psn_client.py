@@ -18,7 +18,7 @@ import isodate
 from sources.scanner_base import SourceScanner
 from data import Source, Game
 from data_mapping import Platforms, Genres, CompletionStatus, AgeRatings, Features, Regions
-from cover_fetch import CoverFetcher
+from artwork_service import get_artwork_service
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -620,9 +620,8 @@ class PSNClient(SourceScanner):
 
             # Get existing games from this source
             existing_games_by_title = {}
-            for game in self.data_handler.load_games():
-                if game.source == source.id:
-                    existing_games_by_title[game.title.lower()] = game
+            for game in self.data_handler.library_index.get_source_games(source.id):
+                existing_games_by_title[game.title.lower()] = game
 
             # Update progress
             total_games = len(psn_games)
@@ -1089,23 +1088,9 @@ class PSNClient(SourceScanner):
                                     except Exception as dt_err:
                                         logger.warning(f"Failed to parse first played date for {game.title}: {dt_err}")
 
-                        # Download and save the cover image if URL is available
+                        # Queue the cover image for download if URL is available
                         if hasattr(game, 'image') and game.image and source.config.get("download_images", True):
-                            try:
-                                # Use CoverFetcher to download and save the image
-                                cover_fetcher = CoverFetcher(self.data_handler)
-                                success, error = cover_fetcher.fetch_and_save_for_game(
-                                    game.id,
-                                    game.image,
-                                    source_name="PlayStation"
-                                )
-
-                                if success:
-                                    logger.debug(f"Cover image downloaded and saved successfully for {game.title}")
-                                else:
-                                    logger.warning(f"Failed to download/save cover image for {game.title}: {error}")
-                            except Exception as img_err:
-                                logger.error(f"Error processing cover image for {game.title}: {img_err}")
+                            get_artwork_service(self.data_handler).enqueue(game.id, game.image, "PlayStation")
 
                         added_count += 1
                     else:
@@ -0,0 +1,119 @@
+import os
+import mmap
+import zlib
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sources.file_state_cache import FileState, FileStateCache
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class RomHashes(NamedTuple):
+    """Content hashes of a ROM file, as used by DAT files"""
+    crc32: str  # 8 lowercase hex digits
+    sha1: str
+    size: int
+
+
+def hash_file(path: str, chunk_size: int = 8 * 1024 * 1024) -> RomHashes:
+    """
+    Compute the CRC32 and SHA-1 of a file in one sequential pass
+
+    The file is memory-mapped and fed to both hashes in large slices, so no
+    read buffers are copied and the kernel can read ahead the whole file.
+
+    Args:
+        path: File to hash
+        chunk_size: Bytes handed to the hash functions at a time
+
+    Returns:
+        The hashes
+
+    Raises:
+        OSError: If the file can't be read
+    """
+    crc = 0
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, chunk_size):
+                        chunk = view[offset:offset + chunk_size]
+                        crc = zlib.crc32(chunk, crc)
+                        sha1.update(chunk)
+                        chunk.release()
+                finally:
+                    view.release()
+    return RomHashes(f"{crc & 0xffffffff:08x}", sha1.hexdigest(), size)
+
+
+class RomHasher:
+    """
+    Hashes ROM files on a thread pool, with hashes cached in the file state cache.
+
+    zlib and hashlib release the GIL while hashing large buffers, so threads
+    hash files in parallel without the cost of a process pool. A file whose
+    (inode, size, mtime) is already in the cache is never read again.
+
+    The cache is only touched from the calling thread, as FileStateCache requires.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the hasher
+
+        Args:
+            max_workers: Number of files hashed at once, defaults to the CPU count (at most 4)
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.hashed = 0
+        self.cached = 0
+
+    def hash_files(self, states: Iterable[FileState],
+                   file_cache: Optional[FileStateCache] = None) -> Dict[str, RomHashes]:
+        """
+        Get the hashes of files, hashing those not in the cache
+
+        Args:
+            states: States of the files to hash
+            file_cache: Optional cache to read hashes from and store new ones in
+
+        Returns:
+            Dictionary of file path to hashes; files that couldn't be read are left out
+        """
+        results: Dict[str, RomHashes] = {}
+        to_hash = []
+        for state in states:
+            cached = file_cache.get_hashes(state) if file_cache else None
+            if cached:
+                results[state.path] = RomHashes(cached[0], cached[1], state.size)
+                self.cached += 1
+            else:
+                to_hash.append(state)
+
+        if not to_hash:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(to_hash)),
+                                thread_name_prefix="rom-hash") as pool:
+            futures = [(state, pool.submit(hash_file, state.path)) for state in to_hash]
+            for state, future in futures:
+                try:
+                    hashes = future.result()
+                except OSError as e:
+                    logger.warning(f"Error hashing {state.path}: {e}")
+                    continue
+                results[state.path] = hashes
+                self.hashed += 1
+                if file_cache:
+                    file_cache.store_hashes(state, hashes.crc32, hashes.sha1)
+        return results
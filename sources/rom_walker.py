@@ -0,0 +1,123 @@
+import os
+import json
+import fnmatch
+import logging
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from sources.file_state_cache import FileStateCache
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+
+class RomFile(NamedTuple):
+    """A file found by the walker"""
+    path: str  # Absolute path
+    rel_parts: Tuple[str, ...]  # Path components relative to the walk root
+    size: int
+
+
+class RomWalker:
+    """
+    Streaming depth-first walk of a ROM directory built on os.scandir.
+
+    Files are filtered by extension and ignore patterns while walking, using only
+    the names scandir returns, so non-matching files are never stat'ed and ignored
+    folders are never entered. Sizes come from the DirEntry stat results (or the
+    file state cache). Only the stack of pending directories and the listing of
+    the current directory are held in memory, regardless of the size of the tree.
+
+    Files are yielded in order of their relative path components, so results are
+    stable between scans.
+    """
+
+    def __init__(self, root: str, extensions: Optional[Iterable[str]] = None,
+                 ignore_patterns: Optional[Iterable[str]] = None,
+                 file_cache: Optional[FileStateCache] = None,
+                 top_level_filter: Optional[Callable[[str, bool], bool]] = None):
+        """
+        Initialize the walker
+
+        Args:
+            root: Directory to walk
+            extensions: File extensions to match, with or without the dot (case-insensitive).
+                        All files match if empty.
+            ignore_patterns: fnmatch patterns for file and folder names to skip
+            file_cache: Optional file state cache used to skip unchanged directories
+            top_level_filter: Optional callable(name, is_dir) choosing which entries directly
+                              in root are walked, e.g. to rescan only some games
+        """
+        self.root = os.path.abspath(root)
+        self.extensions = tuple(sorted({f".{ext.lstrip('.').lower()}" for ext in (extensions or [])}))
+        self.ignore_patterns = list(ignore_patterns or [])
+        self.file_cache = file_cache
+        self.top_level_filter = top_level_filter
+        self.dirs_visited = 0
+
+        # Identifies this filter in cached listings
+        self.filter_key = json.dumps([list(self.extensions), sorted(self.ignore_patterns)])
+
+    def is_ignored(self, name: str) -> bool:
+        """Check whether a file or folder name matches an ignore pattern"""
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.ignore_patterns)
+
+    def matches(self, name: str) -> bool:
+        """Check whether a file name should be returned by the walk"""
+        if self.extensions and not name.lower().endswith(self.extensions):
+            return False
+        return not self.is_ignored(name)
+
+    def walk(self) -> Iterator[RomFile]:
+        """
+        Walk the tree
+
+        Yields:
+            RomFile for every matching file, ordered by relative path components
+        """
+        # Stack of files to yield and directories to expand; a directory's entries
+        # are pushed in reverse name order so they pop in name order
+        pending: List[Union[RomFile, Tuple[str, Tuple[str, ...]]]] = [(self.root, ())]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, RomFile):
+                yield item
+                continue
+
+            path, rel_parts = item
+            self.dirs_visited += 1
+            try:
+                files, subdirs = self._list_dir(path)
+            except OSError as e:
+                logger.warning(f"Error listing {path}: {e}")
+                continue
+
+            if not rel_parts and self.top_level_filter is not None:
+                files = [f for f in files if self.top_level_filter(f[0], False)]
+                subdirs = [name for name in subdirs if self.top_level_filter(name, True)]
+
+            children = [(name, RomFile(file_path, rel_parts + (name,), size)) for name, file_path, size in files]
+            children.extend((name, (os.path.join(path, name), rel_parts + (name,)))
+                            for name in subdirs if not self.is_ignored(name))
+            children.sort(key=lambda child: child[0], reverse=True)
+            pending.extend(child for _, child in children)
+
+    def _list_dir(self, path: str) -> Tuple[List[Tuple[str, str, int]], List[str]]:
+        """List matching files as (name, path, size) and subdirectory names of a directory"""
+        if self.file_cache is not None:
+            file_states, subdir_paths = self.file_cache.list_dir(path, self.matches, self.filter_key)
+            files = [(os.path.basename(f.path), f.path, f.size) for f in file_states]
+            return files, [os.path.basename(d) for d in subdir_paths]
+
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # Like os.walk, symlinked directories aren't followed
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif self.matches(entry.name) and entry.is_file():
+                        files.append((entry.name, entry.path, entry.stat().st_size))
+                except OSError as e:
+                    logger.warning(f"Error reading {entry.path}: {e}")
+        return files, subdirs
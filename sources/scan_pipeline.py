@@ -0,0 +1,219 @@
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class StageStats:
+    """Throughput counters of one pipeline stage"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, items_in: int, items_out: int, busy: float, failed: bool = False):
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy_seconds += busy
+            if failed:
+                self.errors += 1
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self) -> float:
+        """Items handled per second of wall time"""
+        elapsed = self.elapsed
+        return self.items_in / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.name}: {self.items_in} in, {self.items_out} out in {self.elapsed:.1f}s "
+                f"({self.rate:.1f}/s, busy {self.busy_seconds:.1f}s on {self.workers} workers, "
+                f"{self.errors} errors)")
+
+
+class _Stage:
+    def __init__(self, name: str, func: Callable[[List[Any]], Optional[Iterable[Any]]],
+                 workers: int, batch_size: int, batch_timeout: float, queue_size: int):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.input = queue.Queue(maxsize=queue_size)
+        self.stats = StageStats(name, self.workers)
+
+
+class ScanPipeline:
+    """
+    A chain of stages connected by bounded queues, each running on its own threads.
+
+    Producers (e.g. one per directory tree) feed items into the first stage. Each
+    stage is called with batches of up to batch_size items and returns the items
+    for the next stage. A batch is handed over as soon as it is full or no new
+    item arrives within batch_timeout, so items flow through while producers are
+    still running. The queues are bounded, so a slow stage blocks the stages
+    before it instead of letting work pile up in memory.
+
+    Exceptions raised by a stage are logged and counted; the batch is dropped and
+    the pipeline keeps going.
+    """
+
+    def __init__(self, name: str, queue_size: int = 256):
+        """
+        Initialize the pipeline
+
+        Args:
+            name: Name used in log messages
+            queue_size: Capacity of each queue between stages
+        """
+        self.name = name
+        self.queue_size = queue_size
+        self.stages: List[_Stage] = []
+        self.producer_stats = StageStats("discover", 0)
+
+    def add_stage(self, name: str, func: Callable[[List[Any]], Optional[Iterable[Any]]],
+                  workers: int = 1, batch_size: int = 1, batch_timeout: float = 0.25) -> 'ScanPipeline':
+        """
+        Append a stage
+
+        Args:
+            name: Stage name, used in statistics
+            func: Called with a list of input items; returns the items for the next stage (or None)
+            workers: Number of threads running func
+            batch_size: Maximum number of items per call
+            batch_timeout: Seconds to wait for more items before calling func with a partial batch
+
+        Returns:
+            The pipeline, for chaining
+        """
+        self.stages.append(_Stage(name, func, workers, batch_size, batch_timeout, self.queue_size))
+        return self
+
+    def run(self, producers: List[Callable[[], Iterable[Any]]]) -> List[StageStats]:
+        """
+        Run producers and all stages until every item has been processed
+
+        Args:
+            producers: Callables returning iterables of items for the first stage,
+                       each run on its own thread
+
+        Returns:
+            Statistics of the producers ("discover") followed by each stage
+        """
+        if not self.stages:
+            raise ValueError("Pipeline has no stages")
+
+        self.producer_stats.workers = len(producers)
+        all_stats = [self.producer_stats] + [stage.stats for stage in self.stages]
+        start = time.monotonic()
+        for stats in all_stats:
+            stats.started = start
+
+        threads = []
+        # Workers of each stage still running; the last one to finish closes the next queue
+        remaining = [len(producers)] + [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+
+        def finish_worker(level: int):
+            with remaining_lock:
+                remaining[level] -= 1
+                last = remaining[level] == 0
+            if last:
+                all_stats[level].finished = time.monotonic()
+                if level < len(self.stages):
+                    next_stage = self.stages[level]
+                    for _ in range(next_stage.workers):
+                        next_stage.input.put(_DONE)
+
+        def run_producer(producer):
+            first = self.stages[0]
+            try:
+                for item in producer():
+                    first.input.put(item)
+                    self.producer_stats.record(1, 1, 0.0)
+            except Exception as e:
+                logger.error(f"{self.name}: error in discover: {e}", exc_info=True)
+                self.producer_stats.record(0, 0, 0.0, failed=True)
+            finally:
+                finish_worker(0)
+
+        def run_stage(level: int, stage: _Stage):
+            next_queue = self.stages[level].input if level < len(self.stages) else None
+            finished = False
+            try:
+                while not finished:
+                    item = stage.input.get()
+                    if item is _DONE:
+                        break
+                    batch = [item]
+                    deadline = time.monotonic() + stage.batch_timeout
+                    while len(batch) < stage.batch_size:
+                        try:
+                            item = stage.input.get(timeout=max(0.0, deadline - time.monotonic()))
+                        except queue.Empty:
+                            break
+                        if item is _DONE:
+                            finished = True
+                            break
+                        batch.append(item)
+
+                    busy_start = time.monotonic()
+                    outputs = []
+                    failed = False
+                    try:
+                        outputs = list(stage.func(batch) or [])
+                    except Exception as e:
+                        logger.error(f"{self.name}: error in {stage.name}: {e}", exc_info=True)
+                        failed = True
+                    stage.stats.record(len(batch), len(outputs), time.monotonic() - busy_start, failed)
+
+                    if next_queue is not None:
+                        for output in outputs:
+                            next_queue.put(output)
+            finally:
+                finish_worker(level)
+
+        for level, stage in enumerate(self.stages, start=1):
+            for index in range(stage.workers):
+                thread = threading.Thread(target=run_stage, args=(level, stage),
+                                          name=f"{self.name}-{stage.name}-{index}", daemon=True)
+                threads.append(thread)
+                thread.start()
+
+        for index, producer in enumerate(producers):
+            thread = threading.Thread(target=run_producer, args=(producer,),
+                                      name=f"{self.name}-discover-{index}", daemon=True)
+            threads.append(thread)
+            thread.start()
+
+        if not producers:
+            # Nothing to discover; close the first stage right away
+            remaining[0] = 1
+            finish_worker(0)
+
+        for thread in threads:
+            thread.join()
+
+        for stats in all_stats:
+            logger.info(f"{self.name}: {stats.summary()}")
+        return all_stats
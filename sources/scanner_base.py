@@ -3,9 +3,9 @@ import os
 import stat
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import Callable, List, Tuple, Optional, Dict, Any
 
-from data import Source
+from data import Game, Source
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -22,6 +22,10 @@ class SourceScanner(ABC):
         """
         self.data_handler = data_handler
 
+        # Optional callable(list of Game), called from the scanning thread as games
+        # are saved, by scanners that add games while the scan is still running
+        self.games_saved_callback: Optional[Callable[[List[Game]], None]] = None
+
     @abstractmethod
     def scan(self, source: Source, progress_callback: Optional[callable] = None) -> Tuple[int, List[str]]:
         """
@@ -15,7 +15,7 @@ from typing import Dict, List, Optional, Tuple, Any, Union
 from data import Source, Game, SourceType
 from data_mapping import Platforms, Genres, CompletionStatus
 from sources.scanner_base import SourceScanner
-from cover_fetch import CoverFetcher
+from artwork_service import get_artwork_service
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -285,7 +285,6 @@ class SteamScanner(SourceScanner):
     def __init__(self, data_handler):
         """Initialize the scanner with a data handler"""
         super().__init__(data_handler)
-        self.cover_fetcher = CoverFetcher(data_handler)
         self.total_games_found = 0  # Track total number of games found during scan
 
     def scan(self, source: Source, progress_callback: Optional[callable] = None) -> Tuple[int, List[str]]:
@@ -327,10 +326,7 @@ class SteamScanner(SourceScanner):
         errors = []
 
         # Get existing games from this source
-        existing_games_by_id = {}
-        for game in self.data_handler.load_games():
-            if game.source == source.id and game.launcher_type == "STEAM":
-                existing_games_by_id[game.launcher_id] = game
+        existing_games_by_id = self.data_handler.library_index.get_by_launcher_id(source.id, "STEAM")
 
         # Combined dictionary of all games (installed + online library)
         all_games = {}
@@ -475,17 +471,13 @@ class SteamScanner(SourceScanner):
                             # Re-save the game to update developer/publisher data
                             self.data_handler.save_game(game)
 
-                        # Try to fetch cover image from Steam CDN
+                        # Queue the cover image from the Steam CDN for download
                         try:
                             artwork = steam_client.get_artwork_urls(app_id)
                             if artwork and "cover" in artwork:
-                                image_url = artwork["cover"]
-                                logger.debug(f"Downloading cover image for '{game_info['title']}' from {image_url}")
-                                success, error = self.cover_fetcher.fetch_and_save_for_game(game.id, image_url, "Steam")
-                                if not success:
-                                    logger.warning(f"{game_info.get('title')} - {error}")
+                                get_artwork_service(self.data_handler).enqueue(game.id, artwork["cover"], "Steam")
                         except Exception as e:
-                            logger.error(f"Error downloading cover image for '{game_info['title']}': {e}")
+                            logger.error(f"Error queueing cover image for '{game_info['title']}': {e}")
 
                         added_count += 1
                     else:
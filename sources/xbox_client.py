@@ -13,7 +13,7 @@ from typing import List, Tuple, Optional, Dict, Any
 from sources.scanner_base import SourceScanner
 from data import Source, Game
 from data_mapping import Platforms, Genres, CompletionStatus, AgeRatings
-from cover_fetch import CoverFetcher
+from artwork_service import get_artwork_service
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -573,8 +573,6 @@ class XboxLibrary(SourceScanner):
                 # We should never get here if the source was properly created
                 # through the UI, as it requires authentication before saving
                 # But just in case, we'll handle it gracefully
-                from threading import Thread
-                from gi.repository import GLib
 
                 # Create an authentication thread with cleaner synchronization
                 import threading
@@ -626,9 +624,8 @@ class XboxLibrary(SourceScanner):
 
             # Get existing games from this source
             existing_games_by_title = {}
-            for game in self.data_handler.load_games():
-                if game.source == source.id:
-                    existing_games_by_title[game.title.lower()] = game
+            for game in self.data_handler.library_index.get_source_games(source.id):
+                existing_games_by_title[game.title.lower()] = game
 
             # Update progress
             total_games = len(xbox_games)
@@ -812,23 +809,9 @@ class XboxLibrary(SourceScanner):
                             else:
                                 logger.debug(f"Saved description for {game.title}")
 
-                        # Download and save the cover image if URL is available
+                        # Queue the cover image for download if URL is available
                         if hasattr(game, 'image') and game.image and source.config.get("download_images", True):
-                            try:
-                                # Use CoverFetcher to download and save the image
-                                cover_fetcher = CoverFetcher(self.data_handler)
-                                success, error = cover_fetcher.fetch_and_save_for_game(
-                                    game.id,
-                                    game.image,
-                                    source_name="Xbox"
-                                )
-
-                                if success:
-                                    logger.debug(f"Cover image downloaded and saved successfully for {game.title}")
-                                else:
-                                    logger.warning(f"Failed to download/save cover image for {game.title}: {error}")
-                            except Exception as img_err:
-                                logger.error(f"Error processing cover image for {game.title}: {img_err}")
+                            get_artwork_service(self.data_handler).enqueue(game.id, game.image, "Xbox")
 
                         added_count += 1
                     else:
@@ -0,0 +1,189 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Gdk', '4.0')
+from gi.repository import Gtk, Gdk, GLib
+
+from data import Game, Runner
+from gtk_data_handler import GtkDataHandler
+from app_state_manager import AppStateManager
+from controllers.common import get_cover_color
+
+# Set up logger
+logger = logging.getLogger(__name__)
+
+# Number of covers decoded ahead of time - roughly what fits in the first screen
+FIRST_SCREEN_COVERS = 40
+
+
+@dataclass
+class StartupResult:
+    """Everything the main window needs, produced by the startup pipeline"""
+    data_handler: Optional[GtkDataHandler] = None
+    app_state_manager: Optional[AppStateManager] = None
+    games: List[Game] = field(default_factory=list)
+    runners: List[Runner] = field(default_factory=list)
+    cover_textures: Dict[str, Gdk.Texture] = field(default_factory=dict)
+    cover_colors: Dict[str, Optional[str]] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[Exception] = None
+
+
+class StartupPipeline:
+    """
+    Loads the library on background workers while the splash screen is visible.
+
+    Stages:
+    1. Library: data handler, app state, games and runners (worker thread)
+    2. Covers: decode covers for the first screen of the grid (worker pool)
+    3. CSS: parse the application stylesheet (main thread, after the splash paints)
+
+    When every stage has finished, on_ready is invoked on the main thread with
+    a StartupResult. Stage durations are recorded in StartupResult.timings.
+    """
+
+    def __init__(self, on_ready: Callable[[StartupResult], None], data_dir: str = "data",
+                 css_path: Optional[str] = None, cover_workers: int = 4,
+                 app_state_manager: Optional[AppStateManager] = None,
+                 first_screen_ids: Optional[List[str]] = None):
+        """
+        Initialize the pipeline
+
+        Args:
+            on_ready: Callback invoked on the main thread with the StartupResult
+            data_dir: The data directory path
+            css_path: Optional path to the application stylesheet
+            cover_workers: Number of threads used to decode first-screen covers
+            app_state_manager: Optional app state manager that is already loaded
+            first_screen_ids: Optional game IDs known to be on the first screen,
+                              e.g. from the grid snapshot
+        """
+        self.on_ready = on_ready
+        self.data_dir = data_dir
+        self.css_path = css_path
+        self.cover_workers = cover_workers
+        self.first_screen_ids = first_screen_ids
+        self.result = StartupResult(app_state_manager=app_state_manager)
+        self._pending = 2  # Background library work + main-thread CSS
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start all stages. Returns immediately."""
+        self._started_at = time.monotonic()
+
+        thread = threading.Thread(target=self._run_background, name="startup-pipeline")
+        thread.daemon = True
+        thread.start()
+
+        # CSS has to be parsed on the main thread; an idle callback runs after
+        # the splash has painted its first frame, overlapping with the workers
+        if self.css_path:
+            GLib.idle_add(self._load_css)
+        else:
+            self._stage_done()
+
+    def _timed(self, stage: str, func, *args):
+        """Run a stage function and record how long it took"""
+        start = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            self.result.timings[stage] = time.monotonic() - start
+
+    def _run_background(self):
+        try:
+            self._timed("library", self._load_library)
+            self._timed("covers", self._decode_first_screen_covers)
+        except Exception as e:
+            logger.error(f"Error in startup pipeline: {e}", exc_info=True)
+            self.result.error = e
+        finally:
+            GLib.idle_add(self._stage_done)
+
+    def _load_library(self):
+        result = self.result
+        result.data_handler = GtkDataHandler(self.data_dir)
+        if result.app_state_manager is None:
+            result.app_state_manager = AppStateManager(self.data_dir)
+        result.games = result.data_handler.load_games()
+        result.runners = result.data_handler.load_runners()
+        logger.info(f"Startup pipeline loaded {len(result.games)} games and {len(result.runners)} runners")
+
+    def _first_screen_games(self) -> List[Game]:
+        """Approximate the games shown on the first screen using the saved view state"""
+        if self.first_screen_ids:
+            games_by_id = {game.id: game for game in self.result.games}
+            return [games_by_id[game_id] for game_id in self.first_screen_ids[:FIRST_SCREEN_COVERS]
+                    if game_id in games_by_id]
+
+        app_state = self.result.app_state_manager
+        show_hidden = app_state.get_show_hidden()
+        search_text = (app_state.get_search_text() or "").lower()
+        sort_field, ascending = app_state.get_sort_state()
+
+        games = [g for g in self.result.games if g.hidden == show_hidden]
+        if search_text:
+            games = [g for g in games if search_text in g.title.lower()]
+
+        sort_keys = {
+            "play_time": lambda g: g.play_time or 0,
+            "play_count": lambda g: g.play_count or 0,
+            "last_played": lambda g: g.last_played or 0,
+            "date_added": lambda g: g.created or 0,
+        }
+        key = sort_keys.get(sort_field, lambda g: g.title.lower())
+        games.sort(key=key, reverse=not ascending)
+        return games[:FIRST_SCREEN_COVERS]
+
+    def _decode_first_screen_covers(self):
+        data_handler = self.result.data_handler
+        games = self._first_screen_games()
+
+        def decode(game):
+            pixbuf = data_handler.load_game_image(game)
+            if not pixbuf:
+                return game.id, None, None
+            return game.id, Gdk.Texture.new_for_pixbuf(pixbuf), get_cover_color(pixbuf)
+
+        with ThreadPoolExecutor(max_workers=self.cover_workers) as pool:
+            for game_id, texture, color in pool.map(decode, games):
+                if texture:
+                    self.result.cover_textures[game_id] = texture
+                    self.result.cover_colors[game_id] = color
+
+    def _load_css(self):
+        start = time.monotonic()
+        try:
+            css = Gtk.CssProvider()
+            css.load_from_path(self.css_path)
+            Gtk.StyleContext.add_provider_for_display(
+                Gdk.Display.get_default(), css,
+                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            )
+        except Exception as e:
+            logger.error(f"Error loading stylesheet {self.css_path}: {e}")
+        self.result.timings["css"] = time.monotonic() - start
+        self._stage_done()
+        return False  # Don't repeat
+
+    def _stage_done(self):
+        """Called on the main thread when a stage group completes"""
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+
+        if finished:
+            self.result.timings["pipeline"] = time.monotonic() - self._started_at
+            self.on_ready(self.result)
+        return False  # Don't repeat
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """Format stage timings as 'stage 12 ms, ...' for logging"""
+    return ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())